@@ -8,10 +8,10 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, event, pool
 
 from src.db import DATABASE_URL, Base
-from src.models import Trip, Participant, Expense, ExpenseSplit  # noqa: F401
+from src.models import Trip, Participant, Expense, ExpenseSplit, TripSnapshot  # noqa: F401
 
 config = context.config
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
@@ -30,6 +30,18 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def _disable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    """Undo the `PRAGMA foreign_keys=ON` that src.db sets on every connection.
+
+    Batch migrations rebuild a SQLite table by copying it and dropping the
+    original; with foreign keys enforced, the drop cascades to the rows of
+    its child tables. Engine listeners run after the class-wide one.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=OFF")
+    cursor.close()
+
+
 def run_migrations_online() -> None:
     """Run migrations in online mode."""
     connectable = engine_from_config(
@@ -37,6 +49,8 @@ def run_migrations_online() -> None:
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
+    if connectable.dialect.name == "sqlite":
+        event.listen(connectable, "connect", _disable_sqlite_foreign_keys)
     with connectable.connect() as connection:
         context.configure(connection=connection, target_metadata=target_metadata)
         with context.begin_transaction():
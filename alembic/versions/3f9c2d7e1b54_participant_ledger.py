@@ -0,0 +1,41 @@
+"""participant balance ledger
+
+Revision ID: 3f9c2d7e1b54
+Revises: 6a1628817fce
+Create Date: 2026-10-17 09:12:44.318205
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2d7e1b54'
+down_revision: Union[str, None] = '6a1628817fce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('participants', sa.Column('total_paid', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False))
+    op.add_column('participants', sa.Column('total_owed', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False))
+    # Backfill the ledger from existing expenses and splits.
+    op.execute(
+        """
+        UPDATE participants SET
+            total_paid = COALESCE((
+                SELECT SUM(expenses.amount) FROM expenses
+                WHERE expenses.paid_by_id = participants.id
+            ), 0),
+            total_owed = COALESCE((
+                SELECT SUM(expense_splits.share_amount) FROM expense_splits
+                WHERE expense_splits.participant_id = participants.id
+            ), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('participants', 'total_owed')
+    op.drop_column('participants', 'total_paid')
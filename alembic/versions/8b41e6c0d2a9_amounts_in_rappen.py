@@ -0,0 +1,44 @@
+"""store amounts as integer rappen
+
+Revision ID: 8b41e6c0d2a9
+Revises: 3f9c2d7e1b54
+Create Date: 2026-10-17 11:40:02.551873
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41e6c0d2a9'
+down_revision: Union[str, None] = '3f9c2d7e1b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, old Numeric column, new BigInteger column, server default)
+_COLUMNS = [
+    ('expenses', 'amount', 'amount_rappen', None),
+    ('expense_splits', 'share_amount', 'share_rappen', None),
+    ('participants', 'total_paid', 'paid_rappen', '0'),
+    ('participants', 'total_owed', 'owed_rappen', '0'),
+]
+
+
+def upgrade() -> None:
+    for table, old, new, default in _COLUMNS:
+        op.add_column(table, sa.Column(new, sa.BigInteger(), server_default=default, nullable=True))
+        op.execute(f"UPDATE {table} SET {new} = CAST(ROUND({old} * 100) AS BIGINT)")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(new, nullable=False)
+            batch_op.drop_column(old)
+
+
+def downgrade() -> None:
+    for table, old, new, default in reversed(_COLUMNS):
+        precision = 12 if table == 'participants' else 10
+        op.add_column(table, sa.Column(old, sa.Numeric(precision=precision, scale=2), server_default=default, nullable=True))
+        op.execute(f"UPDATE {table} SET {old} = {new} / 100.0")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(old, nullable=False)
+            batch_op.drop_column(new)
@@ -0,0 +1,25 @@
+"""index for paginated trip list
+
+Revision ID: a93d5f0c6e27
+Revises: e4f7a2c9b813
+Create Date: 2026-10-17 15:41:36.902113
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93d5f0c6e27'
+down_revision: Union[str, None] = 'e4f7a2c9b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_trips_created_at_id', 'trips', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trips_created_at_id', table_name='trips')
@@ -0,0 +1,128 @@
+"""archive tables for expenses of old closed trips
+
+Revision ID: b7d24e815f03
+Revises: a93d5f0c6e27
+Create Date: 2026-10-17 18:12:40.551208
+
+On PostgreSQL the archive tables can be hash-partitioned by trip:
+
+    alembic -x archive_partitions=16 upgrade head
+
+The partition key must be part of the primary key there, so partitioned
+tables use (trip_id, id).
+
+Archived rows keep their IDs. On SQLite the hot tables are rebuilt with
+AUTOINCREMENT so that IDs of archived rows are never handed out again
+(PostgreSQL sequences never reuse values).
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d24e815f03'
+down_revision: Union[str, None] = 'a93d5f0c6e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        _sqlite_autoincrement(True)
+    op.add_column('trips', sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+
+    partitions = int(context.get_x_argument(as_dictionary=True).get('archive_partitions', 0))
+    if partitions and op.get_bind().dialect.name == 'postgresql':
+        _create_partitioned(partitions)
+    else:
+        op.create_table('archived_expenses',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('trip_id', sa.Integer(), nullable=False),
+        sa.Column('paid_by_id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(length=300), nullable=False),
+        sa.Column('amount_rappen', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['paid_by_id'], ['participants.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_table('archived_expense_splits',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('trip_id', sa.Integer(), nullable=False),
+        sa.Column('expense_id', sa.Integer(), nullable=False),
+        sa.Column('participant_id', sa.Integer(), nullable=False),
+        sa.Column('share_rappen', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['participant_id'], ['participants.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('ix_archived_expenses_trip_id_created_at', 'archived_expenses', ['trip_id', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_archived_expenses_paid_by_id'), 'archived_expenses', ['paid_by_id'], unique=False)
+    op.create_index(op.f('ix_archived_expense_splits_expense_id'), 'archived_expense_splits', ['expense_id'], unique=False)
+    op.create_index(op.f('ix_archived_expense_splits_participant_id'), 'archived_expense_splits', ['participant_id'], unique=False)
+    op.create_index(op.f('ix_archived_expense_splits_trip_id'), 'archived_expense_splits', ['trip_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_archived_expense_splits_trip_id'), table_name='archived_expense_splits')
+    op.drop_index(op.f('ix_archived_expense_splits_participant_id'), table_name='archived_expense_splits')
+    op.drop_index(op.f('ix_archived_expense_splits_expense_id'), table_name='archived_expense_splits')
+    op.drop_index(op.f('ix_archived_expenses_paid_by_id'), table_name='archived_expenses')
+    op.drop_index('ix_archived_expenses_trip_id_created_at', table_name='archived_expenses')
+    op.drop_table('archived_expense_splits')
+    op.drop_table('archived_expenses')
+    op.drop_column('trips', 'archived_at')
+    if op.get_bind().dialect.name == 'sqlite':
+        _sqlite_autoincrement(False)
+
+
+def _sqlite_autoincrement(enabled: bool) -> None:
+    # Dropping the old table during the rebuild would cascade to its
+    # children while foreign keys are enforced. The pragma only takes
+    # effect outside a transaction, so end the one an earlier revision
+    # may have left open (a no-op otherwise).
+    bind = op.get_bind()
+    bind.connection.dbapi_connection.commit()
+    enforced = bind.exec_driver_sql('PRAGMA foreign_keys').scalar()
+    op.execute('PRAGMA foreign_keys=OFF')
+    if bind.exec_driver_sql('PRAGMA foreign_keys').scalar():
+        raise RuntimeError('Could not disable foreign keys for the table rebuild.')
+    for table in ('expenses', 'expense_splits'):
+        with op.batch_alter_table(
+            table, recreate='always', table_kwargs={'sqlite_autoincrement': enabled}
+        ):
+            pass
+    if enforced:
+        op.execute('PRAGMA foreign_keys=ON')
+
+
+def _create_partitioned(partitions: int) -> None:
+    op.execute("""
+        CREATE TABLE archived_expenses (
+            id INTEGER NOT NULL,
+            trip_id INTEGER NOT NULL REFERENCES trips (id) ON DELETE CASCADE,
+            paid_by_id INTEGER NOT NULL REFERENCES participants (id) ON DELETE CASCADE,
+            description VARCHAR(300) NOT NULL,
+            amount_rappen BIGINT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (trip_id, id)
+        ) PARTITION BY HASH (trip_id)
+    """)
+    op.execute("""
+        CREATE TABLE archived_expense_splits (
+            id INTEGER NOT NULL,
+            trip_id INTEGER NOT NULL REFERENCES trips (id) ON DELETE CASCADE,
+            expense_id INTEGER NOT NULL,
+            participant_id INTEGER NOT NULL REFERENCES participants (id) ON DELETE CASCADE,
+            share_rappen BIGINT NOT NULL,
+            PRIMARY KEY (trip_id, id)
+        ) PARTITION BY HASH (trip_id)
+    """)
+    for table in ('archived_expenses', 'archived_expense_splits'):
+        for i in range(partitions):
+            op.execute(
+                f"CREATE TABLE {table}_p{i} PARTITION OF {table} "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})"
+            )
@@ -0,0 +1,25 @@
+"""trip revision counter
+
+Revision ID: c5e8a1f47d30
+Revises: 8b41e6c0d2a9
+Create Date: 2026-10-17 13:05:27.904112
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a1f47d30'
+down_revision: Union[str, None] = '8b41e6c0d2a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('trips', sa.Column('revision', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('trips', 'revision')
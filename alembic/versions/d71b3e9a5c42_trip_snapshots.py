@@ -0,0 +1,36 @@
+"""frozen trip snapshots
+
+Revision ID: d71b3e9a5c42
+Revises: c5e8a1f47d30
+Create Date: 2026-10-17 14:22:51.637408
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd71b3e9a5c42'
+down_revision: Union[str, None] = 'c5e8a1f47d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('trip_snapshots',
+    sa.Column('trip_id', sa.Integer(), nullable=False),
+    sa.Column('expense_count', sa.Integer(), nullable=False),
+    sa.Column('split_count', sa.Integer(), nullable=False),
+    sa.Column('total_rappen', sa.BigInteger(), nullable=False),
+    sa.Column('participants', sa.JSON(), nullable=False),
+    sa.Column('transfers', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('trip_id')
+    )
+    # Existing closed trips are snapshotted with `kostenteiler snapshot backfill`.
+
+
+def downgrade() -> None:
+    op.drop_table('trip_snapshots')
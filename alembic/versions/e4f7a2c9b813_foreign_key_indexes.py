@@ -0,0 +1,31 @@
+"""indexes on foreign keys and expense order
+
+Revision ID: e4f7a2c9b813
+Revises: d71b3e9a5c42
+Create Date: 2026-10-17 15:03:12.418275
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f7a2c9b813'
+down_revision: Union[str, None] = 'd71b3e9a5c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_expenses_trip_id_created_at', 'expenses', ['trip_id', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_expenses_paid_by_id'), 'expenses', ['paid_by_id'], unique=False)
+    op.create_index(op.f('ix_expense_splits_expense_id'), 'expense_splits', ['expense_id'], unique=False)
+    op.create_index(op.f('ix_expense_splits_participant_id'), 'expense_splits', ['participant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_expense_splits_participant_id'), table_name='expense_splits')
+    op.drop_index(op.f('ix_expense_splits_expense_id'), table_name='expense_splits')
+    op.drop_index(op.f('ix_expenses_paid_by_id'), table_name='expenses')
+    op.drop_index('ix_expenses_trip_id_created_at', table_name='expenses')
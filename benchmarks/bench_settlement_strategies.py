@@ -0,0 +1,51 @@
+"""Compare greedy and exact settlement strategies on random balances.
+
+Usage: python -m benchmarks.bench_settlement_strategies [--samples N] [--spread CHF]
+"""
+
+import argparse
+import random
+import time
+
+from src.services.settlement_service import minimize_transfers
+
+
+def random_balances(
+    rng: random.Random, size: int, spread: int
+) -> dict[str, int]:
+    """Return `size` Rappen balances within +-spread CHF, summing to zero.
+
+    Small spreads produce many equal amounts (as on real trips), which is
+    where the exact solver finds zero-sum subgroups the greedy one misses.
+    """
+    rappen = [rng.randint(-spread, spread) * 100 for _ in range(size - 1)]
+    rappen.append(-sum(rappen))
+    return {f"P{i}": r for i, r in enumerate(rappen)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="4,6,8,10,12,14")
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--spread", type=int, default=20, help="Max |balance| in CHF.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'size':>4}  {'strategy':<8} {'avg transfers':>13} {'avg ms':>9} {'max ms':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        samples = [random_balances(rng, size, args.spread) for _ in range(args.samples)]
+        for strategy in ("greedy", "exact"):
+            counts, times = [], []
+            for balances in samples:
+                start = time.perf_counter()
+                counts.append(len(minimize_transfers(balances, strategy)))
+                times.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{size:>4}  {strategy:<8} {sum(counts) / len(counts):>13.2f} "
+                f"{sum(times) / len(times):>9.3f} {max(times):>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
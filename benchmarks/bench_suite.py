@@ -0,0 +1,223 @@
+"""Time the main service operations on synthetic trips.
+
+Usage: python -m benchmarks.bench_suite [--sizes small,medium] [--repeats N]
+       [--postgres-url URL] [--output results.json] [--compare baseline.json]
+
+For every backend and trip size the suite generates a deterministic trip
+(benchmarks.generator) and measures settle, export, list, add and delete:
+wall time over several repeats, plus peak Python memory (tracemalloc) and
+the number of SQL statements of one extra traced run. Results are written
+as JSON so that two runs can be compared with --compare.
+
+SQLite runs on a temporary file. Postgres runs only if a URL is given via
+--postgres-url or KOSTENTEILER_BENCH_POSTGRES_URL; use a scratch database,
+the suite creates the tables there and deletes its trips afterwards.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Optional
+
+import sqlalchemy
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+import src.models  # noqa: F401 -- register all tables on Base.metadata
+from benchmarks.generator import SIZES, TripSize, generate_trip, participant_names
+from src.db import Base
+from src.services import expense_service, settlement_cache, trip_service
+from src.services.export_service import export_trip_csv
+from src.services.settlement_service import calculate_settlements
+
+Operation = Callable[[Session, int], object]
+
+
+@dataclass
+class Result:
+    """Measurements of one operation on one backend and trip size."""
+
+    backend: str
+    size: str
+    operation: str
+    repeats: int
+    median_ms: float
+    min_ms: float
+    peak_kib: float
+    statements: int
+
+
+def run_suite(
+    engine: Engine, backend: str, size: TripSize, repeats: int, seed: int = 42
+) -> list[Result]:
+    """Generate a trip on `engine` and measure every operation on it."""
+    with Session(engine) as session:
+        trip_id = generate_trip(session, size, seed)
+    payer = participant_names(size)[0]
+    added: list[int] = []
+    workdir = tempfile.TemporaryDirectory()
+
+    def settle(session: Session, i: int) -> object:
+        settlement_cache.invalidate(session, trip_id)
+        return calculate_settlements(session, trip_id)
+
+    def export(session: Session, i: int) -> object:
+        return export_trip_csv(session, trip_id, f"{workdir.name}/export_{i}.csv")
+
+    def list_(session: Session, i: int) -> object:
+        return expense_service.list_expenses(session, trip_id)
+
+    def add(session: Session, i: int) -> object:
+        expense = expense_service.add_expense(
+            session, trip_id, payer, Decimal("12.35"), f"Bench {i}"
+        )
+        added.append(expense.id)
+
+    def delete(session: Session, i: int) -> object:
+        return expense_service.delete_expense(session, added.pop())
+
+    operations: dict[str, Operation] = {
+        "settle": settle,
+        "export": export,
+        "list": list_,
+        "add": add,
+        "delete": delete,
+    }
+    try:
+        return [
+            _measure(engine, backend, size.name, name, op, repeats)
+            for name, op in operations.items()
+        ]
+    finally:
+        workdir.cleanup()
+        with Session(engine) as session:
+            trip_service.delete_trip(session, trip_id)
+
+
+def _measure(
+    engine: Engine,
+    backend: str,
+    size: str,
+    name: str,
+    op: Operation,
+    repeats: int,
+) -> Result:
+    """Time `repeats` untraced runs, then trace one more for memory and SQL."""
+    times = []
+    for i in range(repeats):
+        with Session(engine) as session:
+            start = time.perf_counter()
+            op(session, i)
+            times.append((time.perf_counter() - start) * 1000)
+
+    statements = 0
+
+    def count(*args: object) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    tracemalloc.start()
+    try:
+        with Session(engine) as session:
+            op(session, repeats)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        event.remove(engine, "before_cursor_execute", count)
+
+    return Result(
+        backend=backend,
+        size=size,
+        operation=name,
+        repeats=repeats,
+        median_ms=round(statistics.median(times), 3),
+        min_ms=round(min(times), 3),
+        peak_kib=round(peak / 1024, 1),
+        statements=statements,
+    )
+
+
+def backends(postgres_url: Optional[str]) -> list[tuple[str, Engine]]:
+    """Return (name, engine) for SQLite and, if reachable, Postgres."""
+    tmp = Path(tempfile.mkdtemp(prefix="kostenteiler-bench-"))
+    engines = [("sqlite", create_engine(f"sqlite:///{tmp / 'bench.db'}"))]
+    if postgres_url:
+        engine = create_engine(postgres_url)
+        try:
+            with engine.connect():
+                pass
+        except OperationalError as e:
+            print(f"Skipping Postgres: {e.orig}")
+        else:
+            engines.append(("postgres", engine))
+    for _, engine in engines:
+        Base.metadata.create_all(engine)
+    return engines
+
+
+def compare(results: list[dict], baseline: list[dict]) -> None:
+    """Print median time and statement changes against a baseline run."""
+    base = {(r["backend"], r["size"], r["operation"]): r for r in baseline}
+    print(f"\n{'backend':<9}{'size':<8}{'op':<8}{'ms':>10}{'Δ%':>8}{'stmts':>8}{'Δ':>6}")
+    for r in results:
+        old = base.get((r["backend"], r["size"], r["operation"]))
+        if old is None:
+            continue
+        change = (r["median_ms"] / old["median_ms"] - 1) * 100 if old["median_ms"] else 0
+        print(
+            f"{r['backend']:<9}{r['size']:<8}{r['operation']:<8}"
+            f"{r['median_ms']:>10.2f}{change:>+8.1f}"
+            f"{r['statements']:>8}{r['statements'] - old['statements']:>+6}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="small,medium", help=f"Of {', '.join(SIZES)}.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--postgres-url", default=os.getenv("KOSTENTEILER_BENCH_POSTGRES_URL")
+    )
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON.")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'backend':<9}{'size':<8}{'op':<8}{'median ms':>10}{'min ms':>9}"
+          f"{'peak KiB':>10}{'stmts':>7}")
+    for backend, engine in backends(args.postgres_url):
+        for size_name in args.sizes.split(","):
+            for r in run_suite(engine, backend, SIZES[size_name], args.repeats, args.seed):
+                print(f"{r.backend:<9}{r.size:<8}{r.operation:<8}{r.median_ms:>10.2f}"
+                      f"{r.min_ms:>9.2f}{r.peak_kib:>10.1f}{r.statements:>7}")
+                results.append(asdict(r))
+        engine.dispose()
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {args.output}")
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text())["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Deterministic synthetic trips for benchmarks.
+
+The same size and seed always produce the same participants, amounts,
+payers, beneficiaries and dates, so timings of two runs are comparable.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from src.models import Participant, Trip
+from src.services.import_service import import_expenses
+
+START = datetime(2026, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class TripSize:
+    """Shape of a synthetic trip."""
+
+    name: str
+    participants: int
+    expenses: int
+    split_density: float  # Share of participants in each split, 0 < d <= 1.
+
+
+SIZES = {
+    size.name: size
+    for size in (
+        TripSize("small", 6, 200, 0.7),
+        TripSize("medium", 10, 5_000, 0.6),
+        TripSize("large", 40, 50_000, 0.3),
+    )
+}
+
+
+def expense_records(size: TripSize, seed: int = 42) -> Iterator[tuple[int, dict]]:
+    """Yield (line, record) pairs in the format of `import_service.read_rows`."""
+    rng = random.Random(seed)
+    names = participant_names(size)
+    per_split = max(1, round(size.participants * size.split_density))
+    for i in range(size.expenses):
+        yield i + 1, {
+            "paid_by": rng.choice(names),
+            "amount": f"{rng.randint(100, 50_000) / 100:.2f}",
+            "description": f"Expense {i}",
+            "for": sorted(rng.sample(names, per_split)),
+            "date": (START + timedelta(minutes=7 * i)).isoformat(),
+        }
+
+
+def participant_names(size: TripSize) -> list[str]:
+    """Return the participant names of a synthetic trip."""
+    return [f"P{i:03d}" for i in range(size.participants)]
+
+
+def generate_trip(session: Session, size: TripSize, seed: int = 42) -> int:
+    """Create a synthetic trip and return its ID.
+
+    Participants are inserted directly so that sizes above
+    MAX_PARTICIPANTS can be generated; expenses go through the bulk
+    importer, which also maintains the ledger.
+    """
+    trip = Trip(name=f"bench-{size.name}-{seed}")
+    session.add(trip)
+    session.flush()
+    session.add_all(
+        Participant(trip_id=trip.id, name=name) for name in participant_names(size)
+    )
+    session.commit()
+    trip_id = trip.id
+    result = import_expenses(session, trip_id, expense_records(size, seed))
+    if result.rejected:
+        raise RuntimeError(f"Generator produced invalid rows: {result.rejected[:3]}")
+    return trip_id
@@ -1,19 +1,56 @@
-"""CLI entry point using Click."""
+"""CLI entry point using Click.
 
+Services, models and the database layer are imported inside the commands
+that need them, so `--help` and simple commands start quickly.
+"""
+
+import json
+from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
+from typing import TYPE_CHECKING
 
 import click
 
-from src.db import Base, engine, get_session
-from src.services import trip_service, participant_service, expense_service
-from src.services.settlement_service import calculate_settlements
-from src.services.export_service import export_trip_csv
+from src.money import format_chf
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+    from src.services.settlement_service import TripSettlement
+
+
+def get_session() -> "Session":
+    """Return a new DB session, importing the database layer on first use."""
+    from src import db
+
+    return db.get_session()
 
 
 @click.group()
-def cli() -> None:
+@click.option("--profile", is_flag=True, help="Print SQL and ORM statistics of the command.")
+@click.option("--cprofile", is_flag=True, help="With --profile: add cProfile output.")
+@click.option("--tracemalloc", "memory", is_flag=True, help="With --profile: add peak memory.")
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write the profile to a file instead of stderr.",
+)
+@click.pass_context
+def cli(
+    ctx: click.Context,
+    profile: bool,
+    cprofile: bool,
+    memory: bool,
+    profile_output: str | None,
+) -> None:
     """Kostenteiler -- split expenses fairly."""
-    pass
+    if profile or cprofile or memory or profile_output:
+        from src.profiling import Profiler
+
+        profiler = Profiler(cprofile=cprofile, memory=memory)
+        profiler.start()
+        ctx.call_on_close(lambda: profiler.finish(profile_output))
 
 
 # --- Trip commands ---
@@ -30,30 +67,52 @@ def trip() -> None:
 @click.option("--description", "-d", default=None, help="Optional description.")
 def trip_create(name: str, description: str | None) -> None:
     """Create a new trip."""
+    from src.services import trip_service
+
     with get_session() as session:
         t = trip_service.create_trip(session, name, description)
         click.echo(f"Trip #{t.id} '{t.name}' created.")
 
 
 @trip.command("list")
-def trip_list() -> None:
-    """List all trips."""
+@click.option("--limit", type=click.IntRange(min=0), default=50, show_default=True, help="Trips per page (0 = all).")
+@click.option("--after", type=int, default=None, help="Continue after this trip ID.")
+@click.option("--open", "status", flag_value="open", help="Open trips only.")
+@click.option("--closed", "status", flag_value="closed", help="Closed trips only.")
+def trip_list(limit: int, after: int | None, status: str | None) -> None:
+    """List trips, newest first."""
+    from src.services import trip_service
+
     with get_session() as session:
-        trips = trip_service.list_trips(session)
+        try:
+            trips = trip_service.summarize_trips(
+                session, status, limit + 1 if limit else None, after
+            )
+        except ValueError as e:
+            click.echo(f"Error: {e}")
+            return
         if not trips:
-            click.echo("No trips yet.")
+            click.echo("No trips yet." if after is None else "No more trips.")
             return
-        for t in trips:
-            status = "open" if t.is_open else "closed"
-            click.echo(f"  #{t.id}  {t.name} [{status}]")
+        more = bool(limit) and len(trips) > limit
+        for t in trips[:limit or None]:
+            state = "open" if t.is_open else "closed"
+            click.echo(
+                f"  #{t.id}  {t.name} [{state}]  {t.participant_count} participants, "
+                f"{t.expense_count} expenses, {format_chf(t.total_rappen)} CHF"
+            )
+        if more:
+            click.echo(f"More: kostenteiler trip list --after {trips[limit - 1].id}")
 
 
 @trip.command("show")
 @click.argument("trip_id", type=int)
 def trip_show(trip_id: int) -> None:
     """Show trip details."""
+    from src.services import trip_service
+
     with get_session() as session:
-        t = trip_service.get_trip(session, trip_id)
+        t = trip_service.get_trip_summary(session, trip_id)
         if not t:
             click.echo(f"Trip {trip_id} not found.")
             return
@@ -61,14 +120,17 @@ def trip_show(trip_id: int) -> None:
         click.echo(f"Trip #{t.id}: {t.name} [{status}]")
         if t.description:
             click.echo(f"  {t.description}")
-        click.echo(f"  Participants: {len(t.participants)}")
-        click.echo(f"  Expenses: {len(t.expenses)}")
+        click.echo(f"  Participants: {t.participant_count}")
+        click.echo(f"  Expenses: {t.expense_count}")
+        click.echo(f"  Total: {format_chf(t.total_rappen)} CHF")
 
 
 @trip.command("close")
 @click.argument("trip_id", type=int)
 def trip_close(trip_id: int) -> None:
     """Close a trip."""
+    from src.services import trip_service
+
     with get_session() as session:
         try:
             t = trip_service.close_trip(session, trip_id)
@@ -82,6 +144,8 @@ def trip_close(trip_id: int) -> None:
 @click.confirmation_option(prompt="Are you sure you want to delete this trip?")
 def trip_delete(trip_id: int) -> None:
     """Delete a trip and all its data."""
+    from src.services import trip_service
+
     with get_session() as session:
         try:
             name = trip_service.delete_trip(session, trip_id)
@@ -90,6 +154,22 @@ def trip_delete(trip_id: int) -> None:
             click.echo(f"Error: {e}")
 
 
+@trip.command("purge")
+@click.option("--closed-before", required=True, type=click.DateTime(["%Y-%m-%d"]), help="Delete trips closed before this date.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=500, show_default=True, help="Trips per transaction.")
+@click.confirmation_option(prompt="Are you sure you want to delete these trips and all their data?")
+def trip_purge(closed_before: datetime, batch_size: int) -> None:
+    """Delete all trips closed before a date, in batches."""
+    from src.services import trip_service
+
+    with get_session() as session:
+        result = trip_service.purge_trips(session, closed_before, batch_size)
+    click.echo(
+        f"Purged {result.trips} trip(s) in {result.batches} batch(es) "
+        f"({result.elapsed:.2f}s)."
+    )
+
+
 # --- Participant commands ---
 
 
@@ -104,6 +184,8 @@ def participant() -> None:
 @click.argument("name")
 def participant_add(trip_id: int, name: str) -> None:
     """Add a participant to a trip."""
+    from src.services import participant_service
+
     with get_session() as session:
         try:
             p = participant_service.add_participant(session, trip_id, name)
@@ -116,6 +198,8 @@ def participant_add(trip_id: int, name: str) -> None:
 @click.argument("trip_id", type=int)
 def participant_list(trip_id: int) -> None:
     """List participants of a trip."""
+    from src.services import participant_service
+
     with get_session() as session:
         parts = participant_service.list_participants(session, trip_id)
         if not parts:
@@ -144,6 +228,8 @@ def expense_add(
     trip_id: int, paid_by: str, amount: str, description: str, for_names: str | None
 ) -> None:
     """Add an expense to a trip."""
+    from src.services import expense_service
+
     try:
         amt = Decimal(amount)
     except InvalidOperation:
@@ -152,12 +238,20 @@ def expense_add(
 
     names = [n.strip() for n in for_names.split(",")] if for_names else None
 
+    state = click.get_current_context().obj
     with get_session() as session:
         try:
+            participant_ids = None
+            if state is not None and state.trip_id == trip_id:
+                participant_ids = state.participant_ids(session)
             exp = expense_service.add_expense(
-                session, trip_id, paid_by, amt, description, names
+                session, trip_id, paid_by, amt, description, names, participant_ids
             )
-            split_info = ", ".join(s.participant.name for s in exp.splits)
+            if participant_ids is not None:
+                by_id = {pid: name for name, pid in participant_ids.items()}
+                split_info = ", ".join(by_id[s.participant_id] for s in exp.splits)
+            else:
+                split_info = ", ".join(s.participant.name for s in exp.splits)
             click.echo(
                 f"Expense #{exp.id}: {exp.description} ({exp.amount:.2f} CHF) "
                 f"paid by {paid_by}, split among [{split_info}]."
@@ -166,29 +260,88 @@ def expense_add(
             click.echo(f"Error: {e}")
 
 
+@expense.command("import")
+@click.argument("trip_id", type=int)
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None,
+    help="Input format (default: from file extension).",
+)
+@click.option("--batch-size", type=int, default=1000, help="Rows per transaction.")
+def expense_import(trip_id: int, file: str, fmt: str | None, batch_size: int) -> None:
+    """Bulk-import expenses from a CSV or JSONL file."""
+    from src.services import import_service
+
+    with get_session() as session:
+        try:
+            rows = import_service.read_rows(file, fmt)
+            result = import_service.import_expenses(session, trip_id, rows, batch_size)
+        except ValueError as e:
+            click.echo(f"Error: {e}")
+            return
+        for r in result.rejected:
+            click.echo(f"  Line {r.line}: {r.error}", err=True)
+        click.echo(
+            f"Imported {result.imported} expense(s), rejected {len(result.rejected)} "
+            f"in {result.elapsed:.2f}s ({result.rows_per_second:.0f} rows/s)."
+        )
+
+
 @expense.command("list")
 @click.argument("trip_id", type=int)
-def expense_list(trip_id: int) -> None:
+@click.option(
+    "--format", "fmt", type=click.Choice(["table", "ndjson"]), default="table", show_default=True,
+    help="ndjson: stream one JSON object per expense.",
+)
+def expense_list(trip_id: int, fmt: str) -> None:
     """List all expenses for a trip."""
+    from src.money import format_chf
+    from src.services.export_service import iter_expense_rows, write_ndjson
+
     with get_session() as session:
-        expenses = expense_service.list_expenses(session, trip_id)
-        if not expenses:
-            click.echo("No expenses yet.")
+        rows = iter_expense_rows(session, trip_id)
+        if fmt == "ndjson":
+            write_ndjson(
+                ({"type": "expense", "trip_id": trip_id, **row.to_dict()}
+                 for row in rows),
+                click.get_text_stream("stdout"),
+            )
             return
-        for exp in expenses:
-            split_names = ", ".join(s.participant.name for s in exp.splits)
+        empty = True
+        for row in rows:
+            empty = False
             click.echo(
-                f"  #{exp.id}  {exp.description}: {exp.amount:.2f} CHF "
-                f"(paid by {exp.paid_by_participant.name}, for: {split_names})"
+                f"  #{row.id}  {row.description}: {format_chf(row.amount_rappen)} CHF "
+                f"(paid by {row.paid_by}, for: {', '.join(row.split_among)})"
             )
+        if empty:
+            click.echo("No expenses yet.")
 
 
 @expense.command("edit")
-@click.argument("expense_id", type=int)
+@click.argument("expense_ids", type=int, nargs=-1)
+@click.option("--trip", "trip_id", type=int, default=None, help="Edit the matching expenses of this trip.")
+@click.option("--payer", default=None, help="Filter: paid by this participant.")
+@click.option("--since", type=click.DateTime(["%Y-%m-%d"]), default=None, help="Filter: created on or after this date.")
+@click.option("--until", type=click.DateTime(["%Y-%m-%d"]), default=None, help="Filter: created on or before this date.")
+@click.option("--match", default=None, help="Filter: description LIKE pattern, e.g. 'Taxi%'.")
 @click.option("--amount", type=str, default=None, help="New amount.")
 @click.option("--description", "-d", default=None, help="New description.")
-def expense_edit(expense_id: int, amount: str | None, description: str | None) -> None:
-    """Edit an existing expense."""
+@click.option("--for", "for_names", default=None, help='Re-split among comma-separated names, or "all".')
+def expense_edit(
+    expense_ids: tuple[int, ...],
+    trip_id: int | None,
+    payer: str | None,
+    since: datetime | None,
+    until: datetime | None,
+    match: str | None,
+    amount: str | None,
+    description: str | None,
+    for_names: str | None,
+) -> None:
+    """Edit one or more expenses, by ID or by filter."""
+    from src.services import expense_service
+
     amt = None
     if amount:
         try:
@@ -197,10 +350,25 @@ def expense_edit(expense_id: int, amount: str | None, description: str | None) -
             click.echo(f"Error: '{amount}' is not a valid amount.")
             return
 
+    split_among = None
+    if for_names:
+        split_among = [] if for_names == "all" else [n.strip() for n in for_names.split(",")]
+
     with get_session() as session:
         try:
-            exp = expense_service.edit_expense(session, expense_id, amt, description)
-            click.echo(f"Expense #{exp.id} updated: {exp.description} ({exp.amount:.2f} CHF).")
+            count = expense_service.edit_expenses(
+                session,
+                list(expense_ids),
+                trip_id=trip_id,
+                paid_by_name=payer,
+                since=since,
+                until=until + timedelta(days=1) if until else None,
+                description_like=match,
+                amount=amt,
+                description=description,
+                split_among=split_among,
+            )
+            click.echo(f"Updated {count} expense(s).")
         except ValueError as e:
             click.echo(f"Error: {e}")
 
@@ -210,6 +378,8 @@ def expense_edit(expense_id: int, amount: str | None, description: str | None) -
 @click.confirmation_option(prompt="Delete this expense?")
 def expense_delete(expense_id: int) -> None:
     """Delete an expense."""
+    from src.services import expense_service
+
     with get_session() as session:
         try:
             desc = expense_service.delete_expense(session, expense_id)
@@ -218,41 +388,442 @@ def expense_delete(expense_id: int) -> None:
             click.echo(f"Error: {e}")
 
 
+# --- Ledger commands ---
+
+
+@cli.group()
+def ledger() -> None:
+    """Maintain the per-participant balance ledger."""
+    pass
+
+
+@ledger.command("rebuild")
+@click.argument("trip_id", type=int, required=False)
+def ledger_rebuild(trip_id: int | None) -> None:
+    """Recompute the ledger from raw splits (all trips if omitted)."""
+    from src.services import ledger_service
+
+    with get_session() as session:
+        count = ledger_service.rebuild_ledger(session, trip_id)
+        click.echo(f"Ledger rebuilt for {count} participant(s).")
+
+
+@ledger.command("verify")
+@click.argument("trip_id", type=int, required=False)
+def ledger_verify(trip_id: int | None) -> None:
+    """Check the ledger against raw splits (all trips if omitted)."""
+    from src.services import ledger_service
+
+    with get_session() as session:
+        drifts = ledger_service.verify_ledger(session, trip_id)
+        if not drifts:
+            click.echo("Ledger is consistent.")
+            return
+        click.echo("Ledger drift found:")
+        for d in drifts:
+            click.echo(
+                f"  Trip #{d.trip_id} {d.name}: "
+                f"paid {format_chf(d.stored_paid)} (actual {format_chf(d.actual_paid)}), "
+                f"owed {format_chf(d.stored_owed)} (actual {format_chf(d.actual_owed)})"
+            )
+        raise SystemExit(1)
+
+
+# --- Snapshot commands ---
+
+
+@cli.group()
+def snapshot() -> None:
+    """Manage frozen settlements of closed trips."""
+    pass
+
+
+@snapshot.command("backfill")
+def snapshot_backfill() -> None:
+    """Create snapshots for closed trips that have none."""
+    from src.services import snapshot_service
+
+    with get_session() as session:
+        count = snapshot_service.backfill_snapshots(session)
+        click.echo(f"Created {count} snapshot(s).")
+
+
+@snapshot.command("verify")
+@click.argument("trip_id", type=int, required=False)
+def snapshot_verify(trip_id: int | None) -> None:
+    """Check snapshots against the live data (all if omitted)."""
+    from src.services import snapshot_service
+
+    with get_session() as session:
+        mismatches = snapshot_service.verify_snapshots(session, trip_id)
+        if not mismatches:
+            click.echo("Snapshots are consistent.")
+            return
+        click.echo("Snapshot mismatch found:")
+        for m in mismatches:
+            click.echo(f"  Trip #{m.trip_id} {m.field}: {m.stored} (actual {m.actual})")
+        raise SystemExit(1)
+
+
 # --- Settle & Export ---
 
 
 @cli.command()
-@click.argument("trip_id", type=int)
-def settle(trip_id: int) -> None:
-    """Show settlement for a trip."""
+@click.argument("trip_id", type=int, required=False)
+@click.option(
+    "--strategy", type=click.Choice(["greedy", "exact", "auto"]), default="greedy", show_default=True,
+    help="Transfer minimisation: greedy, exact minimum, or exact with greedy fallback.",
+)
+@click.option(
+    "--large", is_flag=True,
+    help="Use the vectorized NumPy engine for very large groups (greedy only).",
+)
+@click.option("--all", "all_trips", is_flag=True, help="Settle every trip.")
+@click.option("--open", "status", flag_value="open", help="With --all: open trips only.")
+@click.option("--closed", "status", flag_value="closed", help="With --all: closed trips only.")
+@click.option(
+    "--format", "fmt", type=click.Choice(["table", "json", "ndjson"]), default="table",
+    help="Output format (json: one object per trip and line; ndjson: one object per transfer).",
+)
+@click.option("--workers", type=int, default=None, help="With --all: worker processes.")
+@click.option(
+    "--from-dump", "dump_file", type=click.Path(exists=True, dir_okay=False), default=None,
+    help="Settle the trips of a dump file without the database (TRIP_ID optional).",
+)
+def settle(
+    trip_id: int | None,
+    strategy: str,
+    large: bool,
+    all_trips: bool,
+    status: str | None,
+    fmt: str,
+    workers: int | None,
+    dump_file: str | None,
+) -> None:
+    """Show settlement for a trip, or for all trips with --all."""
+    if dump_file:
+        from src.services.dump_service import settle_dump
+
+        try:
+            for result in settle_dump(dump_file, trip_id, strategy):
+                _echo_settlement(result, fmt)
+        except ValueError as e:
+            click.echo(f"Error: {e}")
+        return
+    from src.services import trip_service
+    from src.services.settlement_service import (
+        TripSettlement,
+        calculate_settlements,
+        settle_trips,
+    )
+    from src.services.vector_settlement import calculate_settlements_vectorized
+
+    if all_trips == (trip_id is not None):
+        click.echo("Error: give either a TRIP_ID or --all.")
+        return
+    if large and (all_trips or strategy != "greedy"):
+        click.echo("Error: --large only supports a single trip and the greedy strategy.")
+        return
+
     with get_session() as session:
-        transfers = calculate_settlements(session, trip_id)
-        if not transfers:
-            click.echo("All settled -- no transfers needed.")
+        if all_trips:
+            closed = {"open": False, "closed": True}.get(status)
+            try:
+                for result in settle_trips(session, closed, strategy, workers):
+                    _echo_settlement(result, fmt)
+            except ValueError as e:
+                click.echo(f"Error: {e}")
             return
-        click.echo("Settlements:")
-        for t in transfers:
-            click.echo(f"  {t.from_name} -> {t.to_name}: {t.amount:.2f} CHF")
+        try:
+            if large:
+                transfers = calculate_settlements_vectorized(session, trip_id)
+            else:
+                transfers = calculate_settlements(session, trip_id, strategy)
+        except (RuntimeError, ValueError) as e:
+            click.echo(f"Error: {e}")
+            return
+        t = trip_service.get_trip(session, trip_id) if fmt != "table" else None
+        _echo_settlement(TripSettlement(trip_id, t.name if t else "", transfers), fmt)
+
+
+def _echo_settlement(result: "TripSettlement", fmt: str) -> None:
+    """Print one trip's settlement as a table block or JSON lines."""
+    if fmt == "ndjson":
+        from src.services.export_service import write_ndjson
+
+        write_ndjson(
+            ({"type": "transfer", "trip_id": result.trip_id, **t.to_dict()}
+             for t in result.transfers),
+            click.get_text_stream("stdout"),
+        )
+        return
+    if fmt == "json":
+        click.echo(json.dumps({
+            "trip_id": result.trip_id,
+            "trip": result.trip_name,
+            "transfers": [t.to_dict() for t in result.transfers],
+        }))
+        return
+    if result.trip_name:
+        click.echo(f"Trip #{result.trip_id}: {result.trip_name}")
+    if not result.transfers:
+        click.echo("All settled -- no transfers needed.")
+        return
+    click.echo("Settlements:")
+    for t in result.transfers:
+        click.echo(f"  {t.from_name} -> {t.to_name}: {format_chf(t.amount_rappen)} CHF")
 
 
 @cli.command()
 @click.argument("trip_id", type=int)
-@click.option("--output", "-o", default=None, help="Output CSV path.")
-def export(trip_id: int, output: str | None) -> None:
-    """Export trip to CSV."""
+@click.option(
+    "--format", "fmt", type=click.Choice(["table", "json", "csv"]), default="table",
+    help="Output format.",
+)
+@click.option("--top", type=int, default=5, show_default=True, help="Number of largest expenses.")
+def report(trip_id: int, fmt: str, top: int) -> None:
+    """Show trip statistics: totals per participant and day, largest expenses."""
+    import sys
+
+    from src.services import report_service
+
+    with get_session() as session:
+        try:
+            r = report_service.trip_report(session, trip_id, top)
+        except ValueError as e:
+            click.echo(f"Error: {e}")
+            return
+
+    if fmt == "json":
+        click.echo(json.dumps(report_service.report_to_dict(r)))
+        return
+    if fmt == "csv":
+        report_service.write_report_csv(r, sys.stdout)
+        return
+
+    click.echo(f"Trip #{r.trip_id}: {r.trip_name}")
+    click.echo(f"  Total: {format_chf(r.total_rappen)} CHF in {r.expense_count} expenses")
+    click.echo("Participants:")
+    for p in r.participants:
+        click.echo(
+            f"  {p.name:<15} paid {format_chf(p.paid_rappen):>10}  "
+            f"owed {format_chf(p.owed_rappen):>10}  "
+            f"balance {format_chf(p.balance_rappen):>10}  "
+            f"({p.expenses_paid} paid, {p.paid_share:.0%} of total)"
+        )
+    click.echo("Spend per day:")
+    for d in r.days:
+        click.echo(
+            f"  {d.day:%Y-%m-%d}  {d.expense_count:>4} expenses  "
+            f"{format_chf(d.total_rappen):>10} CHF  "
+            f"(running {format_chf(d.running_total_rappen)} CHF)"
+        )
+    click.echo("Largest expenses:")
+    for e in r.largest:
+        click.echo(
+            f"  {e.rank}. #{e.id} {e.description}: "
+            f"{format_chf(e.amount_rappen)} CHF (paid by {e.paid_by})"
+        )
+
+
+@cli.command()
+@click.argument("trip_id", type=int, required=False)
+@click.option("--output", "--out", "-o", default=None, help='Output CSV path, or "-" for stdout. With --all: a directory or a .zip file.')
+@click.option("--gzip", "compress", is_flag=True, help="Write a gzip-compressed file (single-trip CSV only).")
+@click.option(
+    "--format", "fmt", type=click.Choice(["csv", "ndjson", "parquet", "arrow"]), default="csv", show_default=True,
+    help="ndjson: stream expense, split and transfer objects to stdout (or --output). "
+    "parquet/arrow: normalized tables as a dataset partitioned by trip (needs pyarrow).",
+)
+@click.option("--all", "all_trips", is_flag=True, help="Export every closed trip, one CSV each.")
+@click.option("--closed-since", type=click.DateTime(["%Y-%m-%d"]), default=None, help="With --all: closed on or after this date.")
+@click.option("--closed-until", type=click.DateTime(["%Y-%m-%d"]), default=None, help="With --all: closed on or before this date.")
+@click.option("--workers", type=click.IntRange(min=1), default=4, show_default=True, help="With --all: writer threads.")
+def export(
+    trip_id: int | None,
+    output: str | None,
+    compress: bool,
+    fmt: str,
+    all_trips: bool,
+    closed_since: datetime | None,
+    closed_until: datetime | None,
+    workers: int,
+) -> None:
+    """Export trip to CSV or Parquet/Arrow, or all closed trips with --all."""
+    from src.services import trip_service
+    from src.services.export_service import export_trip_csv, export_trips
+
+    if all_trips == (trip_id is not None):
+        raise click.UsageError("Give either TRIP_ID or --all.")
+    if compress and (all_trips or fmt != "csv" or output == "-"):
+        raise click.UsageError(
+            "--gzip only applies to a single-trip CSV file; "
+            "pipe stdout through gzip or use a .zip output with --all."
+        )
+    if closed_until:
+        closed_until += timedelta(days=1)
     with get_session() as session:
+        if fmt == "ndjson":
+            _export_ndjson(session, trip_id, output, closed_since, closed_until)
+            return
+        if fmt != "csv":
+            from src.services.columnar_export import export_columnar
+
+            try:
+                summary = export_columnar(
+                    session,
+                    output or (f"trip_{trip_id}_{fmt}" if trip_id else f"export_{fmt}"),
+                    fmt,
+                    trip_ids=None if all_trips else [trip_id],
+                    closed_since=closed_since,
+                    closed_until=closed_until,
+                )
+            except (ValueError, RuntimeError) as e:
+                click.echo(f"Error: {e}")
+                return
+            tables = ", ".join(f"{n} {summary.rows.get(n, 0)}" for n in ("expenses", "splits", "transfers"))
+            click.echo(
+                f"Exported {summary.trips} trips ({tables} rows) "
+                f"to {summary.path} in {summary.elapsed:.2f}s"
+            )
+            return
+        if all_trips:
+            summary = export_trips(
+                session,
+                output or "export",
+                closed_since=closed_since,
+                closed_until=closed_until,
+                max_workers=workers,
+            )
+            click.echo(
+                f"Exported {summary.trips} trips ({summary.rows} rows) "
+                f"to {summary.path} in {summary.elapsed:.2f}s"
+            )
+            return
         t = trip_service.get_trip(session, trip_id)
         if not t:
             click.echo(f"Trip {trip_id} not found.")
             return
         path = output or f"trip_{trip_id}_{t.name.replace(' ', '_')}.csv"
+        if compress and not path.endswith(".gz"):
+            path += ".gz"
         result = export_trip_csv(session, trip_id, path)
-        click.echo(f"Exported to {result}")
+        if result != "-":
+            click.echo(f"Exported to {result}")
+
+
+def _export_ndjson(
+    session: "Session",
+    trip_id: int | None,
+    output: str | None,
+    closed_since: datetime | None,
+    closed_until: datetime | None,
+) -> None:
+    """Stream one trip, or all closed trips in the range, as NDJSON."""
+    from src.services import trip_service
+    from src.services.export_service import (
+        closed_trips_query,
+        iter_ndjson_records,
+        write_ndjson,
+    )
+
+    if trip_id is not None:
+        if not trip_service.get_trip(session, trip_id):
+            click.echo(f"Trip {trip_id} not found.", err=True)
+            return
+        trip_ids = [trip_id]
+    else:
+        trip_ids = list(session.scalars(closed_trips_query(closed_since, closed_until)))
+    records = iter_ndjson_records(session, trip_ids)
+    if output and output != "-":
+        with open(output, "w", encoding="utf-8") as f:
+            count = write_ndjson(records, f)
+        click.echo(f"Exported {count} records to {output}", err=True)
+    else:
+        write_ndjson(records, click.get_text_stream("stdout"))
+
+
+@cli.command()
+@click.argument("trip_ids", type=int, nargs=-1, required=True)
+@click.argument("file", type=click.Path(dir_okay=False, writable=True))
+def dump(trip_ids: tuple[int, ...], file: str) -> None:
+    """Write trips to a compact binary dump file."""
+    from src.services.dump_service import dump_trips
+
+    with get_session() as session:
+        try:
+            s = dump_trips(session, list(trip_ids), file)
+        except ValueError as e:
+            click.echo(f"Error: {e}")
+            return
+    click.echo(
+        f"Dumped {s.trips} trip(s), {s.participants} participants, {s.expenses} expenses, "
+        f"{s.splits} splits to {s.path} ({s.size} bytes)"
+    )
+
+
+@cli.command()
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+def restore(file: str) -> None:
+    """Restore the trips of a dump file as new trips."""
+    from src.services.dump_service import restore_dump
+
+    with get_session() as session:
+        try:
+            trip_map = restore_dump(session, file)
+        except ValueError as e:
+            click.echo(f"Error: {e}")
+            return
+    for old, new in trip_map.items():
+        click.echo(f"Restored trip #{old} as #{new}")
+
+
+@cli.command()
+@click.option("--older-than", "older_than", required=True, type=click.IntRange(min=0), help="Archive trips closed more than this many days ago.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=100, show_default=True, help="Trips per transaction.")
+def archive(older_than: int, batch_size: int) -> None:
+    """Move expenses of old closed trips to the archive tables."""
+    from src.services.archive_service import archive_trips
+
+    with get_session() as session:
+        result = archive_trips(session, older_than, batch_size)
+    click.echo(
+        f"Archived {result.trips} trip(s), {result.expenses} expenses, "
+        f"{result.splits} splits ({result.elapsed:.2f}s)."
+    )
+
+
+@cli.command()
+@click.argument("trip_id", type=int, required=False)
+def shell(trip_id: int | None) -> None:
+    """Interactive shell; TRIP_ID becomes the active trip."""
+    from src.shell import run_shell
+
+    run_shell(cli, trip_id)
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to bind.")
+@click.option("--port", type=int, default=8000, show_default=True, help="TCP port.")
+def serve(host: str, port: int) -> None:
+    """Serve trips, expenses and settlements as a JSON HTTP API."""
+    import asyncio
+
+    from src.server import serve as run_server
+
+    click.echo(f"Serving on http://{host}:{port} (Ctrl+C to stop)")
+    try:
+        asyncio.run(run_server(host, port))
+    except KeyboardInterrupt:
+        pass
 
 
 def init_db() -> None:
     """Create all tables."""
-    Base.metadata.create_all(engine)
+    import src.models  # noqa: F401
+    from src.db import Base, get_engine
+
+    Base.metadata.create_all(get_engine())
 
 
 if __name__ == "__main__":
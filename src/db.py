@@ -1,19 +1,43 @@
-"""Database engine and session configuration."""
+"""Database engine and session configuration.
+
+The engine and session factory are created on first use, so importing this
+module (or the models) does not read `.env` or connect anywhere.
+
+SQLite only enforces foreign keys -- and so the ON DELETE CASCADE that trip
+deletion relies on -- when asked per connection; every SQLite connection
+opened by any engine gets `PRAGMA foreign_keys=ON`. Alembic's migration
+engine switches it off again (see alembic/env.py): batch migrations rebuild
+tables, and dropping the old copy would cascade to the child rows.
+"""
 
 import os
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
 
-load_dotenv()
+# Async driver used by `kostenteiler serve` for each sync backend.
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
 
-DATABASE_URL = os.getenv(
-    "DATABASE_URL", "postgresql://localhost:5432/kostenteiler"
-)
+# DBAPI connection classes of pysqlite and the aiosqlite adapter.
+_SQLITE_CONNECTION_MODULES = ("sqlite3", "sqlalchemy.dialects.sqlite.aiosqlite")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_async_engine: Optional["AsyncEngine"] = None
+_async_session_factory: Optional["async_sessionmaker"] = None
+
+
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    if type(dbapi_connection).__module__ not in _SQLITE_CONNECTION_MODULES:
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
 
 
 class Base(DeclarativeBase):
@@ -22,6 +46,78 @@ class Base(DeclarativeBase):
     pass
 
 
-def get_session() -> sessionmaker:
+def get_database_url() -> str:
+    """Return DATABASE_URL from the environment or `.env`."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("DATABASE_URL", "postgresql://localhost:5432/kostenteiler")
+
+
+def get_engine() -> Engine:
+    """Return the process-wide engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(get_database_url())
+    return _engine
+
+
+def get_session_factory() -> sessionmaker:
+    """Return the process-wide session factory, creating it on first use."""
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(bind=get_engine())
+    return _session_factory
+
+
+def get_session() -> Session:
     """Return a new database session."""
-    return SessionLocal()
+    return get_session_factory()()
+
+
+def get_async_database_url() -> str:
+    """Return DATABASE_URL with its driver replaced by the async one."""
+    from sqlalchemy import make_url
+
+    url = make_url(get_database_url())
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+def get_async_engine() -> "AsyncEngine":
+    """Return the process-wide async engine, creating it on first use."""
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        _async_engine = create_async_engine(get_async_database_url())
+    return _async_engine
+
+
+def get_async_session_factory() -> "async_sessionmaker":
+    """Return the async session factory, creating it on first use.
+
+    Sessions keep loaded attributes after commit: an expired attribute
+    cannot be lazily refreshed outside `AsyncSession.run_sync`.
+    """
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(), expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+def __getattr__(name: str) -> object:
+    """Keep `engine`, `SessionLocal` and `DATABASE_URL` importable lazily."""
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_session_factory()
+    if name == "DATABASE_URL":
+        return get_database_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
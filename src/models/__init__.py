@@ -3,5 +3,16 @@
 from src.models.trip import Trip
 from src.models.participant import Participant
 from src.models.expense import Expense, ExpenseSplit
+from src.models.snapshot import TripSnapshot
+from src.models.archive import ArchivedExpense, ArchivedExpenseSplit, EXPENSE_TIERS
 
-__all__ = ["Trip", "Participant", "Expense", "ExpenseSplit"]
+__all__ = [
+    "Trip",
+    "Participant",
+    "Expense",
+    "ExpenseSplit",
+    "TripSnapshot",
+    "ArchivedExpense",
+    "ArchivedExpenseSplit",
+    "EXPENSE_TIERS",
+]
@@ -0,0 +1,59 @@
+"""Archive tier: expenses and splits of archived (closed, old) trips.
+
+`kostenteiler archive` moves the rows of old closed trips here so that the
+hot `expenses` and `expense_splits` tables and their indexes only grow with
+active trips. The columns mirror the hot tables, keep the original IDs and
+are read-only; readers query both tiers with the same code through
+`EXPENSE_TIERS`.
+
+Archived splits carry their trip ID and have no foreign key to archived
+expenses: both tables cascade from `trips`, which lets PostgreSQL partition
+them by trip (see the archive migration).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db import Base
+
+
+class ArchivedExpense(Base):
+    """An expense of an archived trip."""
+
+    __tablename__ = "archived_expenses"
+    __table_args__ = (
+        Index("ix_archived_expenses_trip_id_created_at", "trip_id", "created_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    trip_id: Mapped[int] = mapped_column(ForeignKey("trips.id", ondelete="CASCADE"))
+    paid_by_id: Mapped[int] = mapped_column(
+        ForeignKey("participants.id", ondelete="CASCADE"), index=True
+    )
+    description: Mapped[str] = mapped_column(String(300))
+    amount_rappen: Mapped[int] = mapped_column(BigInteger)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class ArchivedExpenseSplit(Base):
+    """A split of an archived expense."""
+
+    __tablename__ = "archived_expense_splits"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    trip_id: Mapped[int] = mapped_column(
+        ForeignKey("trips.id", ondelete="CASCADE"), index=True
+    )
+    expense_id: Mapped[int] = mapped_column(Integer, index=True)
+    participant_id: Mapped[int] = mapped_column(
+        ForeignKey("participants.id", ondelete="CASCADE"), index=True
+    )
+    share_rappen: Mapped[int] = mapped_column(BigInteger)
+
+
+from src.models.expense import Expense, ExpenseSplit  # noqa: E402
+
+# (expense model, split model) of the hot and the archive tier.
+EXPENSE_TIERS = ((Expense, ExpenseSplit), (ArchivedExpense, ArchivedExpenseSplit))
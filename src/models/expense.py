@@ -3,24 +3,31 @@
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import DateTime, ForeignKey, Numeric, String, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db import Base
+from src.money import from_rappen
 
 
 class Expense(Base):
     """An expense paid by one participant for one or more participants."""
 
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Per-trip listing/export order; also serves every trip_id lookup.
+        Index("ix_expenses_trip_id_created_at", "trip_id", "created_at", "id"),
+        # IDs move to the archive tier unchanged and must never be reused.
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     trip_id: Mapped[int] = mapped_column(ForeignKey("trips.id", ondelete="CASCADE"))
     paid_by_id: Mapped[int] = mapped_column(
-        ForeignKey("participants.id", ondelete="CASCADE")
+        ForeignKey("participants.id", ondelete="CASCADE"), index=True
     )
     description: Mapped[str] = mapped_column(String(300))
-    amount: Mapped[Decimal] = mapped_column(Numeric(10, 2))
+    amount_rappen: Mapped[int] = mapped_column(BigInteger)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -30,27 +37,38 @@ class Expense(Base):
         back_populates="expenses_paid"
     )
     splits: Mapped[list["ExpenseSplit"]] = relationship(
-        back_populates="expense", cascade="all, delete-orphan"
+        back_populates="expense", cascade="all, delete-orphan", passive_deletes=True
     )
 
+    @property
+    def amount(self) -> Decimal:
+        """Return the amount in CHF."""
+        return from_rappen(self.amount_rappen)
+
 
 class ExpenseSplit(Base):
     """A single participant's share of an expense."""
 
     __tablename__ = "expense_splits"
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
     expense_id: Mapped[int] = mapped_column(
-        ForeignKey("expenses.id", ondelete="CASCADE")
+        ForeignKey("expenses.id", ondelete="CASCADE"), index=True
     )
     participant_id: Mapped[int] = mapped_column(
-        ForeignKey("participants.id", ondelete="CASCADE")
+        ForeignKey("participants.id", ondelete="CASCADE"), index=True
     )
-    share_amount: Mapped[Decimal] = mapped_column(Numeric(10, 2))
+    share_rappen: Mapped[int] = mapped_column(BigInteger)
 
     expense: Mapped["Expense"] = relationship(back_populates="splits")
     participant: Mapped["Participant"] = relationship(back_populates="splits")
 
+    @property
+    def share_amount(self) -> Decimal:
+        """Return the share in CHF."""
+        return from_rappen(self.share_rappen)
+
 
 from src.models.trip import Trip  # noqa: E402
 from src.models.participant import Participant  # noqa: E402
@@ -1,9 +1,12 @@
 """Participant model."""
 
-from sqlalchemy import ForeignKey, String, UniqueConstraint
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, ForeignKey, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db import Base
+from src.money import from_rappen
 
 
 class Participant(Base):
@@ -17,10 +20,37 @@ class Participant(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     trip_id: Mapped[int] = mapped_column(ForeignKey("trips.id", ondelete="CASCADE"))
     name: Mapped[str] = mapped_column(String(100))
+    paid_rappen: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0"
+    )
+    owed_rappen: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0"
+    )
 
     trip: Mapped["Trip"] = relationship(back_populates="participants")
-    expenses_paid: Mapped[list["Expense"]] = relationship(back_populates="paid_by_participant")
-    splits: Mapped[list["ExpenseSplit"]] = relationship(back_populates="participant")
+    # "all": never null out the non-nullable foreign keys of loaded children;
+    # the database cascade deletes them together with the participant.
+    expenses_paid: Mapped[list["Expense"]] = relationship(
+        back_populates="paid_by_participant", passive_deletes="all"
+    )
+    splits: Mapped[list["ExpenseSplit"]] = relationship(
+        back_populates="participant", passive_deletes="all"
+    )
+
+    @property
+    def total_paid(self) -> Decimal:
+        """Return the ledger total paid in CHF."""
+        return from_rappen(self.paid_rappen)
+
+    @property
+    def total_owed(self) -> Decimal:
+        """Return the ledger total owed in CHF."""
+        return from_rappen(self.owed_rappen)
+
+    @property
+    def balance(self) -> Decimal:
+        """Return the ledger balance (paid - owed) in CHF."""
+        return from_rappen(self.paid_rappen - self.owed_rappen)
 
 
 from src.models.trip import Trip  # noqa: E402
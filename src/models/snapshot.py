@@ -0,0 +1,35 @@
+"""TripSnapshot model."""
+
+from datetime import datetime
+
+from sqlalchemy import JSON, BigInteger, DateTime, ForeignKey, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.db import Base
+
+
+class TripSnapshot(Base):
+    """Frozen settlement of a closed trip.
+
+    `participants` holds [name, paid Rappen, owed Rappen] per participant and
+    `transfers` the greedy settlement as [from, to, Rappen] rows.
+    """
+
+    __tablename__ = "trip_snapshots"
+
+    trip_id: Mapped[int] = mapped_column(
+        ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True
+    )
+    expense_count: Mapped[int] = mapped_column(Integer)
+    split_count: Mapped[int] = mapped_column(Integer)
+    total_rappen: Mapped[int] = mapped_column(BigInteger)
+    participants: Mapped[list] = mapped_column(JSON)
+    transfers: Mapped[list] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    trip: Mapped["Trip"] = relationship(back_populates="snapshot")
+
+
+from src.models.trip import Trip  # noqa: E402
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, String, func
+from sqlalchemy import DateTime, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db import Base
@@ -13,6 +13,10 @@ class Trip(Base):
     """A trip that groups participants and expenses."""
 
     __tablename__ = "trips"
+    __table_args__ = (
+        # Keyset pagination of `trip list` (newest first).
+        Index("ix_trips_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(200))
@@ -23,12 +27,22 @@ class Trip(Base):
     closed_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    revision: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # Set when the trip's expenses were moved to the archive tables.
+    archived_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
+    # Children are removed by the ON DELETE CASCADE foreign keys; the ORM
+    # does not load them just to delete them row by row.
     participants: Mapped[list["Participant"]] = relationship(
-        back_populates="trip", cascade="all, delete-orphan"
+        back_populates="trip", cascade="all, delete-orphan", passive_deletes=True
     )
     expenses: Mapped[list["Expense"]] = relationship(
-        back_populates="trip", cascade="all, delete-orphan"
+        back_populates="trip", cascade="all, delete-orphan", passive_deletes=True
+    )
+    snapshot: Mapped[Optional["TripSnapshot"]] = relationship(
+        back_populates="trip", cascade="all, delete-orphan", passive_deletes=True
     )
 
     @property
@@ -39,3 +53,4 @@ class Trip(Base):
 
 from src.models.participant import Participant  # noqa: E402
 from src.models.expense import Expense  # noqa: E402
+from src.models.snapshot import TripSnapshot  # noqa: E402
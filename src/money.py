@@ -0,0 +1,60 @@
+"""Money helpers -- amounts are stored and computed as integer Rappen.
+
+1 CHF = 100 Rappen. Decimal CHF values only appear at the service boundary
+(CLI input, model properties, output formatting).
+"""
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Union
+
+# Largest accepted amount in CHF; keeps Rappen amounts and their sums far
+# inside the BIGINT range.
+MAX_AMOUNT = Decimal("1000000000")
+
+
+def to_rappen(amount: Union[Decimal, int, str]) -> int:
+    """Convert a CHF amount to integer Rappen, rounding half up to 0.01.
+
+    Raises:
+        ValueError: If the amount is not a finite number or exceeds
+            MAX_AMOUNT in absolute value.
+    """
+    try:
+        value = Decimal(amount)
+    except InvalidOperation:
+        raise ValueError(f"'{amount}' is not a valid amount.") from None
+    if not value.is_finite():
+        raise ValueError(f"'{amount}' is not a valid amount.")
+    if abs(value) > MAX_AMOUNT:
+        raise ValueError(f"'{amount}' exceeds the maximum of {MAX_AMOUNT} CHF.")
+    try:
+        return int((value * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f"'{amount}' is not a valid amount.") from None
+
+
+def from_rappen(rappen: int) -> Decimal:
+    """Convert integer Rappen to a CHF Decimal with two places."""
+    return Decimal(rappen).scaleb(-2)
+
+
+def format_chf(rappen: int) -> str:
+    """Format integer Rappen as a CHF string, e.g. 3335 -> "33.35"."""
+    sign = "-" if rappen < 0 else ""
+    francs, cents = divmod(abs(rappen), 100)
+    return f"{sign}{francs}.{cents:02d}"
+
+
+def round_rappen_to_05(rappen: int) -> int:
+    """Round integer Rappen to the nearest 5 Rappen, halves away from zero."""
+    return split_rappen(rappen, 1)
+
+
+def split_rappen(total: int, parts: int) -> int:
+    """Return total / parts rounded to the nearest 5 Rappen.
+
+    Integer equivalent of `round_to_05(amount / parts)`: halves round away
+    from zero, like Decimal's ROUND_HALF_UP.
+    """
+    share = (2 * abs(total) + 5 * parts) // (10 * parts) * 5
+    return share if total >= 0 else -share
@@ -0,0 +1,156 @@
+"""Per-command profiling for `kostenteiler --profile`.
+
+Counts and times every SQL statement through SQLAlchemy engine events
+(grouped by normalized SQL), counts ORM object loads per model, and can
+additionally run cProfile and tracemalloc around the command. The
+summary goes to stderr or to a file when the command finishes.
+"""
+
+import cProfile
+import io
+import pstats
+import re
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import click
+from sqlalchemy import Engine, event
+
+from src.db import Base
+
+TOP_N = 15
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, literals, placeholders and IN lists of a statement."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _IN_LIST.sub("(...)", sql)
+
+
+@dataclass
+class StatementStats:
+    """Executions and cumulative time of one normalized statement."""
+
+    count: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class Profiler:
+    """Collects SQL, ORM, CPU and memory statistics of one command."""
+
+    cprofile: bool = False
+    memory: bool = False
+    statements: dict[str, StatementStats] = field(
+        default_factory=lambda: defaultdict(StatementStats)
+    )
+    loads: Counter = field(default_factory=Counter)
+    wall: float = 0.0
+    peak_bytes: int = 0
+    _started: float = 0.0
+    _profile: Optional[cProfile.Profile] = None
+    _snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def start(self) -> None:
+        """Attach the event listeners and start the optional profilers."""
+        event.listen(Engine, "before_cursor_execute", self._before_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_execute)
+        event.listen(Base, "load", self._on_load, propagate=True)
+        if self.memory:
+            tracemalloc.start(10)
+        if self.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._started = time.perf_counter()
+
+    def stop(self) -> None:
+        """Stop all profilers and detach the event listeners."""
+        self.wall = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+        if self.memory:
+            _, self.peak_bytes = tracemalloc.get_traced_memory()
+            self._snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        event.remove(Engine, "before_cursor_execute", self._before_execute)
+        event.remove(Engine, "after_cursor_execute", self._after_execute)
+        event.remove(Base, "load", self._on_load)
+
+    def report(self) -> str:
+        """Return the summary as text."""
+        sql_seconds = sum(s.seconds for s in self.statements.values())
+        sql_count = sum(s.count for s in self.statements.values())
+        lines = [
+            "=== Profile ===",
+            f"Wall time: {self.wall * 1000:.1f} ms",
+            f"SQL: {sql_count} statements, {sql_seconds * 1000:.1f} ms "
+            f"({len(self.statements)} distinct)",
+        ]
+        by_time = sorted(self.statements.items(), key=lambda kv: -kv[1].seconds)
+        for sql, stats in by_time[:TOP_N]:
+            lines.append(
+                f"  {stats.count:>5}x {stats.seconds * 1000:>9.2f} ms  {_shorten(sql)}"
+            )
+        lines.append(f"ORM loads: {sum(self.loads.values())}")
+        for name, count in self.loads.most_common():
+            lines.append(f"  {count:>7}  {name}")
+
+        from src.services import settlement_cache
+
+        cache = settlement_cache.stats()
+        lines.append(
+            f"Settlement cache: {cache['hits']} hits, {cache['misses']} misses"
+        )
+
+        if self._profile is not None:
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).sort_stats(
+                "cumulative"
+            ).print_stats(TOP_N * 2)
+            lines += ["", "=== cProfile (cumulative) ===", out.getvalue().strip()]
+        if self._snapshot is not None:
+            lines += [
+                "",
+                f"=== Memory: peak {self.peak_bytes / 1024:.1f} KiB ===",
+            ]
+            for stat in self._snapshot.statistics("lineno")[:TOP_N]:
+                lines.append(f"  {stat}")
+        return "\n".join(lines) + "\n"
+
+    def finish(self, output: Optional[str] = None) -> None:
+        """Stop profiling and write the report to `output` or stderr."""
+        self.stop()
+        text = self.report()
+        if output:
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            click.echo(text, err=True, nl=False)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["profile_start"].pop()
+        stats = self.statements[normalize_sql(statement)]
+        stats.count += 1
+        stats.seconds += elapsed
+
+    def _on_load(self, target, context) -> None:
+        self.loads[type(target).__name__] += 1
+
+
+def _shorten(sql: str, width: int = 100) -> str:
+    return sql if len(sql) <= width else sql[: width - 3] + "..."
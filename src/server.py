@@ -0,0 +1,328 @@
+"""Local JSON HTTP API (`kostenteiler serve`).
+
+A small asyncio HTTP/1.1 server without extra dependencies. Every request
+opens an `AsyncSession` on the shared async engine and calls
+`services.async_service`, so concurrent requests share one connection
+pool instead of one thread or process each.
+
+Endpoints:
+    GET    /trips
+    POST   /trips                        {"name", "description"?}
+    GET    /trips/<id>
+    POST   /trips/<id>/close
+    DELETE /trips/<id>
+    GET    /trips/<id>/participants
+    POST   /trips/<id>/participants      {"name"}
+    GET    /trips/<id>/expenses
+    POST   /trips/<id>/expenses          {"paid_by", "amount", "description", "for"?}
+    GET    /trips/<id>/settlement[?strategy=greedy|exact|auto]
+    GET    /trips/<id>/export
+"""
+
+import asyncio
+import json
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+from http import HTTPStatus
+from typing import Awaitable, Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.services import async_service
+
+MAX_BODY_BYTES = 1_000_000
+
+logger = logging.getLogger(__name__)
+
+Response = tuple[int, object]
+
+# JSON names of the Python types a body field may have.
+_JSON_TYPES = {str: "a string", int: "a number", float: "a number", list: "a list"}
+Handler = Callable[..., Awaitable[Response]]
+
+
+class HttpError(Exception):
+    """An error answered with a JSON body and the given status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def list_trips(session: AsyncSession, body: dict, query: dict) -> Response:
+    return HTTPStatus.OK, await async_service.list_trips(session)
+
+
+async def create_trip(session: AsyncSession, body: dict, query: dict) -> Response:
+    name = _require(body, "name")
+    description = _optional(body, "description")
+    trip = await async_service.create_trip(session, name, description)
+    return HTTPStatus.CREATED, trip
+
+
+async def show_trip(
+    session: AsyncSession, body: dict, query: dict, trip_id: int
+) -> Response:
+    trip = await async_service.get_trip(session, trip_id)
+    if trip is None:
+        raise HttpError(HTTPStatus.NOT_FOUND, f"Trip {trip_id} not found.")
+    return HTTPStatus.OK, trip
+
+
+async def close_trip(
+    session: AsyncSession, body: dict, query: dict, trip_id: int
+) -> Response:
+    return HTTPStatus.OK, await async_service.close_trip(session, trip_id)
+
+
+async def delete_trip(
+    session: AsyncSession, body: dict, query: dict, trip_id: int
+) -> Response:
+    name = await async_service.delete_trip(session, trip_id)
+    return HTTPStatus.OK, {"deleted": name}
+
+
+async def list_participants(
+    session: AsyncSession, body: dict, query: dict, trip_id: int
+) -> Response:
+    await show_trip(session, body, query, trip_id)
+    return HTTPStatus.OK, await async_service.list_participants(session, trip_id)
+
+
+async def add_participant(
+    session: AsyncSession, body: dict, query: dict, trip_id: int
+) -> Response:
+    name = _require(body, "name")
+    participant = await async_service.add_participant(session, trip_id, name)
+    return HTTPStatus.CREATED, participant
+
+
+async def list_expenses(
+    session: AsyncSession, body: dict, query: dict, trip_id: int
+) -> Response:
+    await show_trip(session, body, query, trip_id)
+    return HTTPStatus.OK, await async_service.list_expenses(session, trip_id)
+
+
+async def add_expense(
+    session: AsyncSession, body: dict, query: dict, trip_id: int
+) -> Response:
+    raw_amount = _require(body, "amount", (str, int, float))
+    try:
+        amount = Decimal(str(raw_amount))
+    except InvalidOperation:
+        raise HttpError(
+            HTTPStatus.BAD_REQUEST, f"'{raw_amount}' is not a valid amount."
+        ) from None
+    for_names = _optional(body, "for", (str, list))
+    if isinstance(for_names, str):
+        for_names = [n.strip() for n in for_names.split(",")]
+    elif for_names is not None and not all(isinstance(n, str) for n in for_names):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Field 'for' must be a list of names.")
+    expense = await async_service.add_expense(
+        session,
+        trip_id,
+        _require(body, "paid_by"),
+        amount,
+        _require(body, "description"),
+        for_names or None,
+    )
+    return HTTPStatus.CREATED, expense
+
+
+async def settlement(
+    session: AsyncSession, body: dict, query: dict, trip_id: int
+) -> Response:
+    await show_trip(session, body, query, trip_id)
+    strategy = query.get("strategy", "greedy")
+    transfers = await async_service.calculate_settlements(session, trip_id, strategy)
+    return HTTPStatus.OK, {"trip_id": trip_id, "transfers": transfers}
+
+
+async def export(
+    session: AsyncSession, body: dict, query: dict, trip_id: int
+) -> Response:
+    await show_trip(session, body, query, trip_id)
+    return HTTPStatus.OK, await async_service.export_trip(session, trip_id)
+
+
+ROUTES: list[tuple[str, re.Pattern, Handler]] = [
+    (method, re.compile(pattern), handler)
+    for method, pattern, handler in [
+        ("GET", r"/trips", list_trips),
+        ("POST", r"/trips", create_trip),
+        ("GET", r"/trips/(\d+)", show_trip),
+        ("POST", r"/trips/(\d+)/close", close_trip),
+        ("DELETE", r"/trips/(\d+)", delete_trip),
+        ("GET", r"/trips/(\d+)/participants", list_participants),
+        ("POST", r"/trips/(\d+)/participants", add_participant),
+        ("GET", r"/trips/(\d+)/expenses", list_expenses),
+        ("POST", r"/trips/(\d+)/expenses", add_expense),
+        ("GET", r"/trips/(\d+)/settlement", settlement),
+        ("GET", r"/trips/(\d+)/export", export),
+    ]
+]
+
+
+async def dispatch(
+    session_factory: async_sessionmaker, method: str, target: str, raw_body: bytes
+) -> Response:
+    """Route one request to its handler and return (status, JSON payload).
+
+    Business errors (ValueError from the services) become 400, unknown
+    trips on read endpoints 404. Other exceptions propagate; the
+    connection handler answers them with 500.
+    """
+    url = urlsplit(target)
+    path = url.path.rstrip("/") or "/"
+    query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+    allowed = False
+    for route_method, pattern, handler in ROUTES:
+        match = pattern.fullmatch(path)
+        if not match:
+            continue
+        if route_method != method:
+            allowed = True
+            continue
+        try:
+            body = _parse_body(raw_body)
+            async with session_factory() as session:
+                return await handler(
+                    session, body, query, *(int(g) for g in match.groups())
+                )
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+    if allowed:
+        return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed."}
+    return HTTPStatus.NOT_FOUND, {"error": f"No endpoint {path}."}
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    session_factory: Optional[async_sessionmaker] = None,
+    ready: Optional[Callable[[asyncio.AbstractServer], None]] = None,
+) -> None:
+    """Serve the API until cancelled.
+
+    Args:
+        host: Interface to bind.
+        port: TCP port; 0 picks a free one.
+        session_factory: Async session factory; defaults to the one of
+            `src.db` (built from DATABASE_URL).
+        ready: Called with the listening server once it accepts connections.
+    """
+    engine = None
+    if session_factory is None:
+        from src.db import get_async_engine, get_async_session_factory
+
+        engine = get_async_engine()
+        session_factory = get_async_session_factory()
+
+    async def on_connection(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    return
+                status, payload = await dispatch(session_factory, *request)
+            except HttpError as e:
+                status, payload = e.status, {"error": str(e)}
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except Exception:
+                logger.exception("Unhandled error while answering a request.")
+                status = HTTPStatus.INTERNAL_SERVER_ERROR
+                payload = {"error": "Internal server error."}
+            _write_response(writer, status, payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(on_connection, host, port)
+    try:
+        async with server:
+            if ready is not None:
+                ready(server)
+            await server.serve_forever()
+    finally:
+        if engine is not None:
+            await engine.dispose()
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[tuple[str, str, bytes]]:
+    """Read one request; return (method, target, body) or None on EOF."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line.") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    raw_length = headers.get("content-length") or "0"
+    if not (raw_length.isascii() and raw_length.isdigit()):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length header.")
+    length = int(raw_length)
+    if length > MAX_BODY_BYTES:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, body
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: object) -> None:
+    body = json.dumps(payload).encode()
+    reason = HTTPStatus(status).phrase
+    writer.write(
+        f"HTTP/1.1 {int(status)} {reason}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n".encode("latin-1")
+        + body
+    )
+
+
+def _parse_body(raw_body: bytes) -> dict:
+    if not raw_body:
+        return {}
+    try:
+        body = json.loads(raw_body)
+    except json.JSONDecodeError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON.") from None
+    if not isinstance(body, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object.")
+    return body
+
+
+def _require(body: dict, key: str, types: tuple[type, ...] = (str,)) -> object:
+    if body.get(key) in (None, ""):
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Missing field '{key}'.")
+    return _optional(body, key, types)
+
+
+def _optional(body: dict, key: str, types: tuple[type, ...] = (str,)) -> object:
+    """Return a body field or None; a value of another JSON type is a 400."""
+    value = body.get(key)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, types)):
+        expected = " or ".join(dict.fromkeys(_JSON_TYPES[t] for t in types))
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Field '{key}' must be {expected}.")
+    return value
@@ -0,0 +1,135 @@
+"""Archive service -- move old closed trips to the archive tables.
+
+Archiving copies a trip's expenses and splits into `archived_expenses` and
+`archived_expense_splits` with INSERT ... SELECT, deletes them from the hot
+tables and stamps `Trip.archived_at`. Trips, participants (with their
+ledger) and snapshots stay in place, so settlements and trip summaries
+need no archive access at all; readers of raw expenses query both tiers.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from src.models import (
+    ArchivedExpense,
+    ArchivedExpenseSplit,
+    Expense,
+    ExpenseSplit,
+    Trip,
+    TripSnapshot,
+)
+from src.services.snapshot_service import build_snapshot
+
+ARCHIVE_BATCH_SIZE = 100
+
+
+@dataclass
+class ArchiveResult:
+    """Outcome of an archive run."""
+
+    trips: int
+    expenses: int
+    splits: int
+    elapsed: float
+
+
+def archive_trips(
+    session: Session,
+    older_than_days: int,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> ArchiveResult:
+    """Move closed trips older than `older_than_days` to the archive tier.
+
+    Works in batches of `batch_size` trips, one transaction each: closed
+    trips without a snapshot get one first (it is built from the rows that
+    are about to move), then each table is copied and deleted with one
+    set-based statement.
+
+    Raises:
+        ValueError: If `older_than_days` is negative.
+    """
+    if older_than_days < 0:
+        raise ValueError("The age in days must not be negative.")
+    start = time.perf_counter()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    result = ArchiveResult(trips=0, expenses=0, splits=0, elapsed=0.0)
+    while True:
+        trip_ids = list(session.scalars(
+            select(Trip.id)
+            .where(
+                Trip.closed_at.is_not(None),
+                Trip.closed_at < cutoff,
+                Trip.archived_at.is_(None),
+            )
+            .order_by(Trip.id)
+            .limit(batch_size)
+        ))
+        if not trip_ids:
+            break
+        expenses, splits = _archive_batch(session, trip_ids)
+        session.commit()
+        result.trips += len(trip_ids)
+        result.expenses += expenses
+        result.splits += splits
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _archive_batch(session: Session, trip_ids: list[int]) -> tuple[int, int]:
+    """Move the expenses and splits of trips. Returns the moved row counts."""
+    missing = session.scalars(
+        select(Trip.id)
+        .outerjoin(TripSnapshot, TripSnapshot.trip_id == Trip.id)
+        .where(Trip.id.in_(trip_ids), TripSnapshot.trip_id.is_(None))
+    ).all()
+    for trip_id in missing:
+        session.add(build_snapshot(session, trip_id))
+    session.flush()
+
+    expense_ids = select(Expense.id).where(Expense.trip_id.in_(trip_ids))
+    splits = session.execute(
+        insert(ArchivedExpenseSplit).from_select(
+            ["id", "trip_id", "expense_id", "participant_id", "share_rappen"],
+            select(
+                ExpenseSplit.id,
+                Expense.trip_id,
+                ExpenseSplit.expense_id,
+                ExpenseSplit.participant_id,
+                ExpenseSplit.share_rappen,
+            )
+            .join(Expense, Expense.id == ExpenseSplit.expense_id)
+            .where(Expense.trip_id.in_(trip_ids)),
+        )
+    ).rowcount
+    expenses = session.execute(
+        insert(ArchivedExpense).from_select(
+            ["id", "trip_id", "paid_by_id", "description", "amount_rappen", "created_at"],
+            select(
+                Expense.id,
+                Expense.trip_id,
+                Expense.paid_by_id,
+                Expense.description,
+                Expense.amount_rappen,
+                Expense.created_at,
+            ).where(Expense.trip_id.in_(trip_ids)),
+        )
+    ).rowcount
+    session.execute(
+        delete(ExpenseSplit).where(ExpenseSplit.expense_id.in_(expense_ids)),
+        execution_options={"synchronize_session": False},
+    )
+    session.execute(
+        delete(Expense).where(Expense.trip_id.in_(trip_ids)),
+        execution_options={"synchronize_session": False},
+    )
+    session.execute(
+        update(Trip)
+        .where(Trip.id.in_(trip_ids))
+        .values(archived_at=datetime.now(timezone.utc)),
+        execution_options={"synchronize_session": False},
+    )
+    return expenses, splits
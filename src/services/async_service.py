@@ -0,0 +1,176 @@
+"""Async service layer for the HTTP server.
+
+Each function runs the matching sync service inside
+`AsyncSession.run_sync`, which executes it on the async engine's
+connection through a greenlet -- no thread per call, and all concurrent
+requests share the async engine's pool. Results are converted to plain
+dicts inside the same call, because relationships cannot be lazy-loaded
+once control is back in async code.
+"""
+
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.models import Expense, Participant, Trip
+from src.money import format_chf
+from src.services import (
+    expense_service,
+    export_service,
+    participant_service,
+    settlement_service,
+    trip_service,
+)
+
+
+async def create_trip(
+    session: AsyncSession, name: str, description: Optional[str] = None
+) -> dict:
+    """Create a trip."""
+    def run(s: Session) -> dict:
+        return trip_to_dict(trip_service.create_trip(s, name, description))
+
+    return await session.run_sync(run)
+
+
+async def list_trips(session: AsyncSession) -> list[dict]:
+    """Return all trips, newest first."""
+    def run(s: Session) -> list[dict]:
+        return [trip_to_dict(t) for t in trip_service.list_trips(s)]
+
+    return await session.run_sync(run)
+
+
+async def get_trip(session: AsyncSession, trip_id: int) -> Optional[dict]:
+    """Return a trip, or None."""
+    def run(s: Session) -> Optional[dict]:
+        trip = trip_service.get_trip(s, trip_id)
+        return trip_to_dict(trip) if trip else None
+
+    return await session.run_sync(run)
+
+
+async def close_trip(session: AsyncSession, trip_id: int) -> dict:
+    """Close a trip. Raises ValueError like `trip_service.close_trip`."""
+    def run(s: Session) -> dict:
+        return trip_to_dict(trip_service.close_trip(s, trip_id))
+
+    return await session.run_sync(run)
+
+
+async def delete_trip(session: AsyncSession, trip_id: int) -> str:
+    """Delete a trip. Returns its name."""
+    return await session.run_sync(trip_service.delete_trip, trip_id)
+
+
+async def add_participant(session: AsyncSession, trip_id: int, name: str) -> dict:
+    """Add a participant to a trip."""
+    def run(s: Session) -> dict:
+        return participant_to_dict(
+            participant_service.add_participant(s, trip_id, name)
+        )
+
+    return await session.run_sync(run)
+
+
+async def list_participants(session: AsyncSession, trip_id: int) -> list[dict]:
+    """Return the participants of a trip."""
+    def run(s: Session) -> list[dict]:
+        return [
+            participant_to_dict(p)
+            for p in participant_service.list_participants(s, trip_id)
+        ]
+
+    return await session.run_sync(run)
+
+
+async def add_expense(
+    session: AsyncSession,
+    trip_id: int,
+    paid_by_name: str,
+    amount: Decimal,
+    description: str,
+    for_names: Optional[list[str]] = None,
+) -> dict:
+    """Add an expense, split equally among participants."""
+    def run(s: Session) -> dict:
+        return expense_to_dict(expense_service.add_expense(
+            s, trip_id, paid_by_name, amount, description, for_names
+        ))
+
+    return await session.run_sync(run)
+
+
+async def list_expenses(session: AsyncSession, trip_id: int) -> list[dict]:
+    """Return the expenses of a trip in creation order."""
+    def run(s: Session) -> list[dict]:
+        return [
+            row.to_dict()
+            for row in export_service.iter_expense_rows(s, trip_id)
+        ]
+
+    return await session.run_sync(run)
+
+
+async def calculate_settlements(
+    session: AsyncSession, trip_id: int, strategy: str = "greedy"
+) -> list[dict]:
+    """Return the settlement transfers of a trip."""
+    def run(s: Session) -> list[dict]:
+        transfers = settlement_service.calculate_settlements(s, trip_id, strategy)
+        return [t.to_dict() for t in transfers]
+
+    return await session.run_sync(run)
+
+
+async def export_trip(session: AsyncSession, trip_id: int) -> dict:
+    """Return the expenses and settlement of a trip, like the CSV export."""
+    def run(s: Session) -> dict:
+        return {
+            "expenses": [
+                row.to_dict()
+                for row in export_service.iter_expense_rows(s, trip_id)
+            ],
+            "settlements": [
+                t.to_dict()
+                for t in settlement_service.calculate_settlements(s, trip_id)
+            ],
+        }
+
+    return await session.run_sync(run)
+
+
+def trip_to_dict(trip: Trip) -> dict:
+    """Serialize a trip for the JSON API."""
+    return {
+        "id": trip.id,
+        "name": trip.name,
+        "description": trip.description,
+        "created_at": trip.created_at.isoformat() if trip.created_at else None,
+        "closed_at": trip.closed_at.isoformat() if trip.closed_at else None,
+        "open": trip.is_open,
+    }
+
+
+def participant_to_dict(participant: Participant) -> dict:
+    """Serialize a participant with its ledger totals."""
+    return {
+        "id": participant.id,
+        "name": participant.name,
+        "paid": format_chf(participant.paid_rappen),
+        "owed": format_chf(participant.owed_rappen),
+    }
+
+
+def expense_to_dict(expense: Expense) -> dict:
+    """Serialize an expense with payer and beneficiary names."""
+    return {
+        "id": expense.id,
+        "description": expense.description,
+        "amount": format_chf(expense.amount_rappen),
+        "paid_by": expense.paid_by_participant.name,
+        "split_among": [split.participant.name for split in expense.splits],
+        "created_at": expense.created_at.isoformat(),
+    }
@@ -0,0 +1,308 @@
+"""Columnar export for analytics (requires pyarrow).
+
+Writes three normalized tables -- expenses, splits and transfers -- as a
+Parquet or Arrow IPC dataset partitioned by trip ID:
+
+    <out>/expenses/trip_id=<id>/part-0.parquet
+    <out>/splits/trip_id=<id>/part-0.parquet
+    <out>/transfers/trip_id=<id>/part-0.parquet    (.arrow for Arrow IPC)
+
+Rows are read from the database in chunks through a server-side cursor
+and handed to the dataset writer as record batches, so memory use is
+bounded by the chunk size and not by the number of trips or expenses.
+Amounts stay integer Rappen; timestamps are UTC. Archived trips are read
+from the archive tables like any other trip.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import Select, select, union_all
+from sqlalchemy.orm import Session, aliased
+
+from src.models import EXPENSE_TIERS, Participant, Trip
+from src.services.settlement_service import settle_trip_batch
+
+FORMATS = ("parquet", "arrow")
+CHUNK_SIZE = 10_000
+SETTLEMENT_BATCH = 50
+QUEUE_SIZE = 4
+SORT_COLUMNS = 3
+
+
+@dataclass
+class ColumnarSummary:
+    """Outcome of a columnar export."""
+
+    path: str
+    trips: int = 0
+    rows: dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+def export_columnar(
+    session: Session,
+    output_dir: str,
+    fmt: str = "parquet",
+    trip_ids: Optional[list[int]] = None,
+    closed_since: Optional[datetime] = None,
+    closed_until: Optional[datetime] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> ColumnarSummary:
+    """Write the expense, split and transfer tables of trips as a dataset.
+
+    Args:
+        session: DB session.
+        output_dir: Dataset root directory; existing partitions of the
+            exported trips are replaced.
+        fmt: "parquet" or "arrow" (Arrow IPC files).
+        trip_ids: Trips to export. If omitted, all closed trips, optionally
+            limited by `closed_since` (inclusive) and `closed_until`
+            (exclusive).
+        chunk_size: Rows per database fetch and record batch.
+
+    Returns:
+        The dataset path, the number of trips and the rows per table.
+
+    Raises:
+        ValueError: If the format is unknown or a given trip does not exist.
+        RuntimeError: If pyarrow is not installed.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Use one of: {', '.join(FORMATS)}.")
+    pa, ds = _import_pyarrow()
+    start = time.perf_counter()
+
+    trips = select(Trip.id).order_by(Trip.id)
+    if trip_ids is not None:
+        trips = trips.where(Trip.id.in_(trip_ids))
+    else:
+        trips = trips.where(Trip.closed_at.is_not(None))
+        if closed_since is not None:
+            trips = trips.where(Trip.closed_at >= closed_since)
+        if closed_until is not None:
+            trips = trips.where(Trip.closed_at < closed_until)
+    selected = list(session.scalars(trips))
+    if trip_ids is not None:
+        missing = sorted(set(trip_ids) - set(selected))
+        if missing:
+            raise ValueError(f"Trip {missing[0]} not found.")
+
+    schemas = _schemas(pa)
+    root = Path(output_dir)
+    summary = ColumnarSummary(path=str(root.resolve()), trips=len(selected))
+    if not selected:
+        summary.elapsed = time.perf_counter() - start
+        return summary
+
+    selected_ids = trips.with_only_columns(Trip.id).order_by(None)
+    tables = {
+        "expenses": _chunks(
+            session, _tiered(_expenses_select, selected_ids), chunk_size
+        ),
+        "splits": _chunks(
+            session, _tiered(_splits_select, selected_ids), chunk_size
+        ),
+        "transfers": _transfer_chunks(session, selected, chunk_size),
+    }
+
+    for name, chunks in tables.items():
+        schema = schemas[name]
+        batches = (
+            pa.RecordBatch.from_arrays(
+                [pa.array(col, type=f.type) for col, f in zip(chunk, schema)],
+                schema=schema,
+            )
+            for chunk in _count_rows(chunks, summary.rows, name)
+        )
+        _write_from_thread(
+            batches,
+            lambda source: ds.write_dataset(
+                source,
+                root / name,
+                schema=schema,
+                format="parquet" if fmt == "parquet" else "ipc",
+                partitioning=ds.partitioning(
+                    pa.schema([schema.field("trip_id")]), flavor="hive"
+                ),
+                max_partitions=len(selected) + 1,
+                existing_data_behavior="delete_matching",
+            ),
+        )
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def _tiered(build: Callable, trip_ids: Select) -> Select:
+    """UNION ALL of `build(expense, split, trip_ids)` over both expense tiers.
+
+    The last `SORT_COLUMNS` columns of each arm are the sort key; they are
+    ordered by but not selected.
+    """
+    arms = [build(expense, split, trip_ids) for expense, split in EXPENSE_TIERS]
+    tiers = union_all(*arms).subquery()
+    return select(*tiers.c[:-SORT_COLUMNS]).order_by(*tiers.c[-SORT_COLUMNS:])
+
+
+def _expenses_select(expense, split, trip_ids: Select) -> Select:
+    payer = aliased(Participant)
+    return (
+        select(
+            expense.trip_id,
+            expense.id,
+            expense.description,
+            expense.amount_rappen,
+            payer.name,
+            expense.created_at,
+            expense.trip_id.label("sort_trip"),
+            expense.created_at.label("sort_time"),
+            expense.id.label("sort_id"),
+        )
+        .join(payer, payer.id == expense.paid_by_id)
+        .where(expense.trip_id.in_(trip_ids))
+    )
+
+
+def _splits_select(expense, split, trip_ids: Select) -> Select:
+    beneficiary = aliased(Participant)
+    return (
+        select(
+            expense.trip_id,
+            split.expense_id,
+            beneficiary.name,
+            split.share_rappen,
+            expense.trip_id.label("sort_trip"),
+            split.expense_id.label("sort_expense"),
+            split.id.label("sort_id"),
+        )
+        .join(expense, expense.id == split.expense_id)
+        .join(beneficiary, beneficiary.id == split.participant_id)
+        .where(expense.trip_id.in_(trip_ids))
+    )
+
+
+def _write_from_thread(batches: Iterator, write: Callable[[Iterator], None]) -> None:
+    """Run `write` on a thread that consumes `batches` via a bounded queue.
+
+    The dataset writer pulls its input from its own threads, but database
+    connections (SQLite in particular) must stay on the calling thread, so
+    the batches are produced here and handed over at most `QUEUE_SIZE` at
+    a time.
+    """
+    handoff: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    done = object()
+    errors: list[BaseException] = []
+
+    def source() -> Iterator:
+        while (item := handoff.get()) is not done:
+            yield item
+
+    def run() -> None:
+        try:
+            write(source())
+        except BaseException as e:  # noqa: BLE001 -- re-raised below
+            errors.append(e)
+
+    writer = threading.Thread(target=run, name="columnar-export")
+    writer.start()
+    try:
+        for batch in batches:
+            while writer.is_alive():
+                try:
+                    handoff.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if errors:
+                break
+    finally:
+        while writer.is_alive():
+            try:
+                handoff.put(done, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        writer.join()
+    if errors:
+        raise errors[0]
+
+
+def _chunks(
+    session: Session, stmt: Select, chunk_size: int
+) -> Iterator[list[tuple]]:
+    """Yield the columns of `stmt` in chunks of at most `chunk_size` rows."""
+    result = session.execute(stmt.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        yield list(zip(*rows))
+
+
+def _transfer_chunks(
+    session: Session, trip_ids: list[int], chunk_size: int
+) -> Iterator[list[tuple]]:
+    """Yield transfer columns, settling `SETTLEMENT_BATCH` trips per query."""
+    rows: list[tuple] = []
+    for i in range(0, len(trip_ids), SETTLEMENT_BATCH):
+        batch = trip_ids[i:i + SETTLEMENT_BATCH]
+        settlements = settle_trip_batch(session, batch)
+        for trip_id in batch:
+            rows.extend(
+                (trip_id, t.from_name, t.to_name, t.amount_rappen)
+                for t in settlements[trip_id]
+            )
+        if len(rows) >= chunk_size:
+            yield list(zip(*rows))
+            rows = []
+    if rows:
+        yield list(zip(*rows))
+
+
+def _count_rows(
+    chunks: Iterator[list[tuple]], counts: dict[str, int], name: str
+) -> Iterator[list[tuple]]:
+    counts[name] = 0
+    for chunk in chunks:
+        counts[name] += len(chunk[0])
+        yield chunk
+
+
+def _schemas(pa) -> dict:
+    utc = pa.timestamp("us", tz="UTC")
+    return {
+        "expenses": pa.schema([
+            ("trip_id", pa.int64()),
+            ("expense_id", pa.int64()),
+            ("description", pa.string()),
+            ("amount_rappen", pa.int64()),
+            ("paid_by", pa.string()),
+            ("created_at", utc),
+        ]),
+        "splits": pa.schema([
+            ("trip_id", pa.int64()),
+            ("expense_id", pa.int64()),
+            ("participant", pa.string()),
+            ("share_rappen", pa.int64()),
+        ]),
+        "transfers": pa.schema([
+            ("trip_id", pa.int64()),
+            ("from_name", pa.string()),
+            ("to_name", pa.string()),
+            ("amount_rappen", pa.int64()),
+        ]),
+    }
+
+
+def _import_pyarrow():
+    """Import pyarrow and its dataset module or raise a helpful error."""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise RuntimeError(
+            "Parquet/Arrow export requires pyarrow: pip install pyarrow"
+        ) from None
+    return pyarrow, pyarrow.dataset
@@ -0,0 +1,489 @@
+"""Dump service -- compact binary trip dumps, restore and offline settlement.
+
+A dump holds trips with their participants, expenses and splits in a
+columnar little-endian layout:
+
+    header      magic "KTDUMP", version, section count
+    directory   per section: name, byte offset, row count
+    strings     interned UTF-8 table: int64 end offsets, then the bytes
+    trips, participants, expenses, splits
+                one contiguous column per field, int64 (IDs, Rappen,
+                UTC microseconds) or int32 (string index), 8-byte aligned
+
+Names and descriptions are stored once and referenced by index; -1 marks
+NULL. Columns are read as zero-copy memoryviews over a memory map, so
+`settle_dump` needs neither the database nor a full parse of the file.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+from sqlalchemy import insert, select, union_all
+from sqlalchemy.orm import Session
+
+from src.models import EXPENSE_TIERS, Expense, ExpenseSplit, Participant, Trip
+from src.money import round_rappen_to_05
+from src.services.settlement_service import TripSettlement, minimize_transfers
+from src.services.snapshot_service import build_snapshot
+
+MAGIC = b"KTDUMP"
+VERSION = 1
+NULL = -1
+NULL_TIME = -(2**63)
+
+_HEADER = struct.Struct("<6sHI")
+_ENTRY = struct.Struct("<16sQQ")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_LITTLE = sys.byteorder == "little"
+
+# Column name and array typecode per table, in file order.
+TABLES: dict[str, tuple[tuple[str, str], ...]] = {
+    "trips": (
+        ("id", "q"), ("name", "i"), ("description", "i"),
+        ("created_at", "q"), ("closed_at", "q"),
+    ),
+    "participants": (
+        ("id", "q"), ("trip_id", "q"), ("name", "i"),
+        ("paid_rappen", "q"), ("owed_rappen", "q"),
+    ),
+    "expenses": (
+        ("id", "q"), ("trip_id", "q"), ("paid_by_id", "q"),
+        ("amount_rappen", "q"), ("description", "i"), ("created_at", "q"),
+    ),
+    "splits": (
+        ("expense_id", "q"), ("participant_id", "q"), ("share_rappen", "q"),
+    ),
+}
+_STRINGS = "strings"
+
+
+@dataclass
+class DumpSummary:
+    """Rows and bytes written to or restored from a dump."""
+
+    path: str
+    trips: int
+    participants: int
+    expenses: int
+    splits: int
+    size: int = 0
+
+
+def dump_trips(session: Session, trip_ids: list[int], path: str) -> DumpSummary:
+    """Write trips with all their rows to a binary dump file.
+
+    Raises:
+        ValueError: If a trip does not exist.
+    """
+    found = set(session.scalars(select(Trip.id).where(Trip.id.in_(trip_ids))))
+    missing = [t for t in trip_ids if t not in found]
+    if missing:
+        raise ValueError(f"Trip {missing[0]} not found.")
+
+    strings = _StringTable()
+    columns = {
+        table: {name: array(code) for name, code in spec}
+        for table, spec in TABLES.items()
+    }
+    queries = {
+        "trips": select(
+            Trip.id, Trip.name, Trip.description, Trip.created_at, Trip.closed_at
+        ).where(Trip.id.in_(trip_ids)).order_by(Trip.id),
+        "participants": select(
+            Participant.id, Participant.trip_id, Participant.name,
+            Participant.paid_rappen, Participant.owed_rappen,
+        ).where(Participant.trip_id.in_(trip_ids)).order_by(Participant.id),
+        "expenses": union_all(*(
+            select(
+                expense.id, expense.trip_id, expense.paid_by_id, expense.amount_rappen,
+                expense.description, expense.created_at,
+            ).where(expense.trip_id.in_(trip_ids))
+            for expense, _ in EXPENSE_TIERS
+        )).order_by("id"),
+        "splits": union_all(*(
+            select(
+                split.expense_id, split.participant_id, split.share_rappen,
+                split.id.label("split_id"),
+            ).join(expense, expense.id == split.expense_id)
+            .where(expense.trip_id.in_(trip_ids))
+            for expense, split in EXPENSE_TIERS
+        )).order_by("split_id"),
+    }
+    for table, stmt in queries.items():
+        spec = TABLES[table]
+        targets = [columns[table][name] for name, _ in spec]
+        encoders = [_encoder(name, code, strings) for name, code in spec]
+        for row in session.execute(stmt.execution_options(yield_per=10_000)):
+            for target, encode, value in zip(targets, encoders, row):
+                target.append(encode(value))
+
+    sections = [(_STRINGS, len(strings.values), strings.to_bytes())]
+    for table, spec in TABLES.items():
+        data = b"".join(_aligned(_le_bytes(columns[table][name])) for name, _ in spec)
+        sections.append((table, len(columns[table][spec[0][0]]), data))
+
+    offset = _HEADER.size + _ENTRY.size * len(sections)
+    header = [_HEADER.pack(MAGIC, VERSION, len(sections))]
+    for name, rows, data in sections:
+        header.append(_ENTRY.pack(name.encode(), offset, rows))
+        offset += len(data)
+    with open(path, "wb") as f:
+        f.write(b"".join(header))
+        for _, _, data in sections:
+            f.write(data)
+
+    counts = {name: rows for name, rows, _ in sections}
+    return DumpSummary(
+        path=path,
+        trips=counts["trips"],
+        participants=counts["participants"],
+        expenses=counts["expenses"],
+        splits=counts["splits"],
+        size=offset,
+    )
+
+
+def restore_dump(session: Session, path: str) -> dict[int, int]:
+    """Insert the trips of a dump as new trips in one transaction.
+
+    Rows get fresh IDs, so a dump can be restored into a database that
+    already holds the original trips. Each table is one bulk INSERT;
+    closed trips get their snapshot rebuilt.
+
+    Returns:
+        Mapping of dumped trip ID to restored trip ID.
+
+    Raises:
+        ValueError: If the file is not a valid dump.
+    """
+    with TripDump(path) as dump:
+        t = dump.table("trips")
+        trip_map = _insert_returning(session, Trip, [
+            {
+                "name": dump.string(t["name"][i]),
+                "description": dump.string(t["description"][i]),
+                "created_at": _decode_time(t["created_at"][i]),
+                "closed_at": _decode_time(t["closed_at"][i]),
+            }
+            for i in range(dump.rows("trips"))
+        ], t["id"])
+
+        p = dump.table("participants")
+        participant_map = _insert_returning(session, Participant, [
+            {
+                "trip_id": trip_map[p["trip_id"][i]],
+                "name": dump.string(p["name"][i]),
+                "paid_rappen": p["paid_rappen"][i],
+                "owed_rappen": p["owed_rappen"][i],
+            }
+            for i in range(dump.rows("participants"))
+        ], p["id"])
+
+        e = dump.table("expenses")
+        expense_map = _insert_returning(session, Expense, [
+            {
+                "trip_id": trip_map[e["trip_id"][i]],
+                "paid_by_id": participant_map[e["paid_by_id"][i]],
+                "amount_rappen": e["amount_rappen"][i],
+                "description": dump.string(e["description"][i]),
+                "created_at": _decode_time(e["created_at"][i]),
+            }
+            for i in range(dump.rows("expenses"))
+        ], e["id"])
+
+        s = dump.table("splits")
+        splits = [
+            {
+                "expense_id": expense_map[s["expense_id"][i]],
+                "participant_id": participant_map[s["participant_id"][i]],
+                "share_rappen": s["share_rappen"][i],
+            }
+            for i in range(dump.rows("splits"))
+        ]
+        if splits:
+            session.execute(insert(ExpenseSplit), splits)
+
+        closed = [
+            trip_map[t["id"][i]]
+            for i in range(dump.rows("trips"))
+            if t["closed_at"][i] != NULL_TIME
+        ]
+    for trip_id in closed:
+        session.add(build_snapshot(session, trip_id))
+    session.commit()
+    return trip_map
+
+
+def settle_dump(
+    path: str, trip_id: Optional[int] = None, strategy: str = "greedy"
+) -> Iterator[TripSettlement]:
+    """Settle the trips of a dump without a database.
+
+    Balances are summed from the memory-mapped expense and split columns,
+    rounded to 5 Rappen and minimised like `calculate_settlements`.
+
+    Raises:
+        ValueError: If the file is not a valid dump or lacks `trip_id`.
+    """
+    with TripDump(path) as dump:
+        t = dump.table("trips")
+        trip_ids = [t["id"][i] for i in range(dump.rows("trips"))]
+        if trip_id is not None and trip_id not in trip_ids:
+            raise ValueError(f"Trip {trip_id} not in dump.")
+
+        p = dump.table("participants")
+        totals: dict[int, int] = {}
+        by_trip: dict[int, list[int]] = {tid: [] for tid in trip_ids}
+        for i in range(dump.rows("participants")):
+            totals[p["id"][i]] = 0
+            by_trip[p["trip_id"][i]].append(i)
+
+        e = dump.table("expenses")
+        for payer, amount in zip(e["paid_by_id"], e["amount_rappen"]):
+            totals[payer] += amount
+        s = dump.table("splits")
+        for participant, share in zip(s["participant_id"], s["share_rappen"]):
+            totals[participant] -= share
+
+        results = []
+        for i, tid in enumerate(trip_ids):
+            if trip_id is not None and tid != trip_id:
+                continue
+            balances = {
+                dump.string(p["name"][j]): round_rappen_to_05(totals[p["id"][j]])
+                for j in by_trip[tid]
+            }
+            results.append(TripSettlement(
+                tid,
+                dump.string(t["name"][i]),
+                minimize_transfers(balances, strategy) if balances else [],
+            ))
+    yield from results
+
+
+class TripDump:
+    """Read-only, memory-mapped view of a dump file.
+
+    Columns are memoryviews into the map and are only valid until
+    `close()`; use the dump as a context manager.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a kostenteiler dump.") from None
+        self._views: list[memoryview] = []
+        self._sections: dict[str, tuple[int, int]] = {}
+        self._cache: dict[int, Optional[str]] = {}
+        try:
+            magic, version, count = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a kostenteiler dump.")
+            if version != VERSION:
+                raise ValueError(f"Unsupported dump version {version}.")
+            for i in range(count):
+                name, offset, rows = _ENTRY.unpack_from(
+                    self._map, _HEADER.size + i * _ENTRY.size
+                )
+                self._sections[name.rstrip(b"\0").decode()] = (offset, rows)
+            if set(self._sections) != {_STRINGS, *TABLES}:
+                raise ValueError(f"{path} is missing dump sections.")
+            offset, rows = self._sections[_STRINGS]
+            self._string_ends = self._column(offset, "q", rows)
+            self._string_base = offset + _align(8 * rows)
+            self._validate()
+        except struct.error:
+            self.close()
+            raise ValueError("Truncated dump file.") from None
+        except ValueError:
+            self.close()
+            raise
+
+    def __enter__(self) -> "TripDump":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def rows(self, table: str) -> int:
+        """Return the row count of a table or of the string table."""
+        return self._sections[table][1]
+
+    def table(self, table: str) -> dict[str, memoryview]:
+        """Return the columns of a table as typed memoryviews."""
+        offset, rows = self._sections[table]
+        columns = {}
+        for name, code in TABLES[table]:
+            columns[name] = self._column(offset, code, rows)
+            offset += _align(array(code).itemsize * rows)
+        return columns
+
+    def string(self, index: int) -> Optional[str]:
+        """Return an interned string, or None for NULL."""
+        if index == NULL:
+            return None
+        if index not in self._cache:
+            start = self._string_ends[index - 1] if index else 0
+            end = self._string_ends[index]
+            base = self._string_base
+            try:
+                self._cache[index] = self._map[base + start:base + end].decode("utf-8")
+            except UnicodeDecodeError:
+                raise ValueError("Corrupt dump file: invalid UTF-8 string.") from None
+        return self._cache[index]
+
+    def close(self) -> None:
+        """Release all column views and unmap the file."""
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def _validate(self) -> None:
+        """Check the string table, string indexes and the references.
+
+        One pass over the ID columns, so that readers can index the columns
+        and map IDs without further checks.
+
+        Raises:
+            ValueError: If the dump is truncated or inconsistent.
+        """
+        end = 0
+        for next_end in self._string_ends:
+            if next_end < end:
+                raise ValueError("Corrupt dump file: invalid string table.")
+            end = next_end
+        if self._string_base + end > len(self._map):
+            raise ValueError("Truncated dump file.")
+
+        strings = self.rows(_STRINGS)
+        tables = {table: self.table(table) for table in TABLES}
+        for table, spec in TABLES.items():
+            for name, code in spec:
+                if code == "i" and any(
+                    not NULL <= index < strings for index in tables[table][name]
+                ):
+                    raise ValueError(
+                        f"Corrupt dump file: invalid string in {table}.{name}."
+                    )
+
+        ids = {}
+        for table in ("trips", "participants", "expenses"):
+            ids[table] = set(tables[table]["id"])
+            if len(ids[table]) != self.rows(table):
+                raise ValueError(f"Corrupt dump file: duplicate IDs in {table}.")
+        for table, column, target in (
+            ("participants", "trip_id", "trips"),
+            ("expenses", "trip_id", "trips"),
+            ("expenses", "paid_by_id", "participants"),
+            ("splits", "expense_id", "expenses"),
+            ("splits", "participant_id", "participants"),
+        ):
+            if not ids[target].issuperset(tables[table][column]):
+                raise ValueError(
+                    f"Corrupt dump file: {table}.{column} references missing {target}."
+                )
+
+    def _column(self, offset: int, code: str, rows: int):
+        size = array(code).itemsize * rows
+        if offset + size > len(self._map):
+            raise ValueError("Truncated dump file.")
+        raw = memoryview(self._map)[offset:offset + size]
+        self._views.append(raw)
+        if _LITTLE:
+            view = raw.cast(code)
+            self._views.append(view)
+            return view
+        column = array(code, raw.tobytes())
+        column.byteswap()
+        return column
+
+
+class _StringTable:
+    """Interns strings and serializes them as end offsets plus UTF-8 bytes."""
+
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+        self.values: list[bytes] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NULL
+        index = self.index.get(value)
+        if index is None:
+            index = self.index[value] = len(self.values)
+            self.values.append(value.encode("utf-8"))
+        return index
+
+    def to_bytes(self) -> bytes:
+        ends = array("q")
+        end = 0
+        for value in self.values:
+            end += len(value)
+            ends.append(end)
+        return _aligned(_le_bytes(ends)) + _aligned(b"".join(self.values))
+
+
+def _insert_returning(session: Session, model, rows: list[dict], old_ids) -> dict[int, int]:
+    """Bulk insert `rows` and map the dumped IDs to the new ones.
+
+    RETURNING in parameter order is batched on PostgreSQL; SQLite has no
+    insert sentinel, so SQLAlchemy runs it row by row there.
+    """
+    if not rows:
+        return {}
+    new_ids = session.scalars(
+        insert(model).returning(model.id, sort_by_parameter_order=True), rows
+    ).all()
+    return dict(zip(old_ids, new_ids))
+
+
+def _encoder(name: str, code: str, strings: _StringTable):
+    if code == "i":
+        return strings.add
+    if name.endswith("_at"):
+        return _encode_time
+    return int
+
+
+def _encode_time(value: Optional[datetime]) -> int:
+    """UTC microseconds since the epoch; naive values are taken as UTC."""
+    if value is None:
+        return NULL_TIME
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _decode_time(value: int) -> Optional[datetime]:
+    if value == NULL_TIME:
+        return None
+    try:
+        return _EPOCH + timedelta(microseconds=value)
+    except OverflowError:
+        raise ValueError("Corrupt dump file: invalid timestamp.") from None
+
+
+def _le_bytes(column: array) -> bytes:
+    if not _LITTLE:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _align(size: int) -> int:
+    return (size + 7) // 8 * 8
+
+
+def _aligned(data: bytes) -> bytes:
+    return data + b"\0" * (_align(len(data)) - len(data))
@@ -1,12 +1,16 @@
 """Expense service for CRUD operations."""
 
+from datetime import datetime
 from decimal import ROUND_HALF_UP, Decimal
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, insert, select, update
 from sqlalchemy.orm import Session
 
 from src.models import Expense, ExpenseSplit, Participant, Trip
+from src.money import split_rappen, to_rappen
+from src.services.ledger_service import apply_deltas
+from src.services.trip_service import bump_revision
 
 
 def round_to_05(amount: Decimal) -> Decimal:
@@ -21,6 +25,7 @@ def add_expense(
     amount: Decimal,
     description: str,
     for_names: Optional[list[str]] = None,
+    participant_ids: Optional[dict[str, int]] = None,
 ) -> Expense:
     """Add an expense, split equally among participants.
 
@@ -31,6 +36,8 @@ def add_expense(
         amount: Total amount in CHF.
         description: What the expense is for.
         for_names: List of participant names to split among. None = all.
+        participant_ids: Optional name -> ID map of the trip's participants
+            (e.g. cached by the shell); skips the participant lookups.
 
     Returns:
         The created Expense.
@@ -41,38 +48,54 @@ def add_expense(
     if not trip.is_open:
         raise ValueError(f"Trip '{trip.name}' is closed.")
 
-    payer = _get_participant(session, trip_id, paid_by_name)
-
-    if for_names:
-        beneficiaries = [_get_participant(session, trip_id, n) for n in for_names]
+    if participant_ids is None:
+        payer_id = _get_participant(session, trip_id, paid_by_name).id
+        if for_names:
+            beneficiary_ids = [
+                _get_participant(session, trip_id, n).id for n in for_names
+            ]
+        else:
+            beneficiary_ids = list(
+                session.execute(
+                    select(Participant.id).where(Participant.trip_id == trip_id)
+                ).scalars()
+            )
     else:
-        beneficiaries = list(
-            session.execute(
-                select(Participant).where(Participant.trip_id == trip_id)
-            ).scalars()
-        )
+        payer_id = _lookup_participant(participant_ids, paid_by_name)
+        if for_names:
+            beneficiary_ids = [
+                _lookup_participant(participant_ids, n) for n in for_names
+            ]
+        else:
+            beneficiary_ids = list(participant_ids.values())
 
-    if not beneficiaries:
+    if not beneficiary_ids:
         raise ValueError("No participants to split the expense among.")
 
+    amount_rappen = to_rappen(amount)
     expense = Expense(
         trip_id=trip_id,
-        paid_by_id=payer.id,
+        paid_by_id=payer_id,
         description=description,
-        amount=amount,
+        amount_rappen=amount_rappen,
     )
     session.add(expense)
     session.flush()
 
-    share = round_to_05(amount / len(beneficiaries))
-    for participant in beneficiaries:
+    share = split_rappen(amount_rappen, len(beneficiary_ids))
+    deltas = {payer_id: (amount_rappen, 0)}
+    for participant_id in beneficiary_ids:
         split = ExpenseSplit(
             expense_id=expense.id,
-            participant_id=participant.id,
-            share_amount=share,
+            participant_id=participant_id,
+            share_rappen=share,
         )
         session.add(split)
+        paid, owed = deltas.get(participant_id, (0, 0))
+        deltas[participant_id] = (paid, owed + share)
 
+    apply_deltas(session, deltas)
+    bump_revision(session, trip_id)
     session.commit()
     session.refresh(expense)
     return expense
@@ -83,26 +106,186 @@ def edit_expense(
     expense_id: int,
     amount: Optional[Decimal] = None,
     description: Optional[str] = None,
+    split_among: Optional[list[str]] = None,
 ) -> Expense:
-    """Edit an existing expense. Recalculates splits if amount changes."""
-    expense = session.get(Expense, expense_id)
-    if not expense:
-        raise ValueError(f"Expense {expense_id} not found.")
-    if not expense.trip.is_open:
+    """Edit an existing expense. Recalculates splits if amount changes.
+
+    See `edit_expenses` for the arguments.
+    """
+    edit_expenses(
+        session,
+        [expense_id],
+        amount=amount,
+        description=description,
+        split_among=split_among,
+    )
+    return session.get(Expense, expense_id)
+
+
+def edit_expenses(
+    session: Session,
+    expense_ids: Optional[list[int]] = None,
+    trip_id: Optional[int] = None,
+    paid_by_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    description_like: Optional[str] = None,
+    amount: Optional[Decimal] = None,
+    description: Optional[str] = None,
+    split_among: Optional[list[str]] = None,
+) -> int:
+    """Edit many expenses with set-based statements in one transaction.
+
+    Expenses are selected by ID and/or by the filters of one trip; all
+    filters are combined with AND. The selected expenses get the new amount
+    and description with one UPDATE. Their splits are re-split with one
+    DELETE and one executemany INSERT, or, if only the amount changes, get
+    new shares with one executemany UPDATE. The ledger is adjusted by
+    deltas, like single edits.
+
+    Args:
+        session: DB session.
+        expense_ids: IDs of the expenses to edit.
+        trip_id: Trip whose expenses to edit; required without IDs.
+        paid_by_name: Filter: paid by this participant.
+        since: Filter: created at or after this time.
+        until: Filter: created before this time.
+        description_like: Filter: description matches this LIKE pattern
+            (case-insensitive).
+        amount: New amount in CHF.
+        description: New description.
+        split_among: Names to re-split among; an empty list means all
+            participants of the trip, None keeps the current beneficiaries.
+
+    Returns:
+        The number of edited expenses.
+
+    Raises:
+        ValueError: If nothing is to change, an ID or beneficiary does not
+            exist, or an expense belongs to a closed trip.
+    """
+    if amount is None and description is None and split_among is None:
+        raise ValueError("Nothing to change.")
+    if not expense_ids and trip_id is None:
+        raise ValueError("Select expenses by ID or by trip.")
+
+    stmt = (
+        select(
+            Expense.id,
+            Expense.trip_id,
+            Expense.paid_by_id,
+            Expense.amount_rappen,
+            Trip.closed_at,
+        )
+        .join(Trip, Trip.id == Expense.trip_id)
+        .order_by(Expense.id)
+    )
+    filtered = False
+    if expense_ids:
+        stmt = stmt.where(Expense.id.in_(expense_ids))
+    if trip_id is not None:
+        stmt = stmt.where(Expense.trip_id == trip_id)
+    if paid_by_name is not None:
+        stmt = stmt.join(Participant, Participant.id == Expense.paid_by_id).where(
+            Participant.name == paid_by_name
+        )
+        filtered = True
+    if since is not None:
+        stmt = stmt.where(Expense.created_at >= since)
+        filtered = True
+    if until is not None:
+        stmt = stmt.where(Expense.created_at < until)
+        filtered = True
+    if description_like is not None:
+        stmt = stmt.where(Expense.description.ilike(description_like))
+        filtered = True
+    targets = session.execute(stmt).all()
+
+    if expense_ids and not filtered:
+        found = {t.id for t in targets}
+        missing = [i for i in expense_ids if i not in found]
+        if missing:
+            raise ValueError(f"Expense {missing[0]} not found.")
+    if not targets:
+        return 0
+    if any(t.closed_at is not None for t in targets):
         raise ValueError("Cannot edit expenses on a closed trip.")
 
-    if description is not None:
-        expense.description = description
+    ids = [t.id for t in targets]
+    new_amount = to_rappen(amount) if amount is not None else None
+    old_splits: dict[int, list[tuple[int, int]]] = {i: [] for i in ids}
+    for expense_id, participant_id, share in session.execute(
+        select(
+            ExpenseSplit.expense_id,
+            ExpenseSplit.participant_id,
+            ExpenseSplit.share_rappen,
+        ).where(ExpenseSplit.expense_id.in_(ids))
+    ):
+        old_splits[expense_id].append((participant_id, share))
 
-    if amount is not None:
-        expense.amount = amount
-        share = round_to_05(amount / len(expense.splits))
-        for split in expense.splits:
-            split.share_amount = share
+    if split_among is not None:
+        beneficiaries = _beneficiary_ids(
+            session, {t.trip_id for t in targets}, split_among
+        )
+        new_splits = {}
+        for t in targets:
+            pids = beneficiaries[t.trip_id]
+            total = t.amount_rappen if new_amount is None else new_amount
+            share = split_rappen(total, len(pids))
+            new_splits[t.id] = [(pid, share) for pid in pids]
+        session.execute(delete(ExpenseSplit).where(ExpenseSplit.expense_id.in_(ids)))
+        session.execute(insert(ExpenseSplit), [
+            {"expense_id": eid, "participant_id": pid, "share_rappen": share}
+            for eid, splits in new_splits.items()
+            for pid, share in splits
+        ])
+    elif new_amount is not None:
+        new_splits = {
+            eid: [(pid, split_rappen(new_amount, len(splits))) for pid, _ in splits]
+            for eid, splits in old_splits.items()
+        }
+        session.execute(
+            update(ExpenseSplit.__table__)
+            .where(ExpenseSplit.__table__.c.expense_id == bindparam("eid"))
+            .values(share_rappen=bindparam("share")),
+            [
+                {"eid": eid, "share": splits[0][1]}
+                for eid, splits in new_splits.items()
+                if splits
+            ],
+        )
+    else:
+        new_splits = old_splits
 
+    values = {}
+    if new_amount is not None:
+        values["amount_rappen"] = new_amount
+    if description is not None:
+        values["description"] = description
+    if values:
+        session.execute(
+            update(Expense)
+            .where(Expense.id.in_(ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    deltas: dict[int, tuple[int, int]] = {}
+    for t in targets:
+        if new_amount is not None:
+            paid, owed = deltas.get(t.paid_by_id, (0, 0))
+            deltas[t.paid_by_id] = (paid + new_amount - t.amount_rappen, owed)
+        for pid, share in old_splits[t.id]:
+            paid, owed = deltas.get(pid, (0, 0))
+            deltas[pid] = (paid, owed - share)
+        for pid, share in new_splits[t.id]:
+            paid, owed = deltas.get(pid, (0, 0))
+            deltas[pid] = (paid, owed + share)
+    apply_deltas(session, deltas)
+    for trip in sorted({t.trip_id for t in targets}):
+        bump_revision(session, trip)
     session.commit()
-    session.refresh(expense)
-    return expense
+    return len(ids)
 
 
 def delete_expense(session: Session, expense_id: int) -> str:
@@ -113,13 +296,23 @@ def delete_expense(session: Session, expense_id: int) -> str:
     if not expense.trip.is_open:
         raise ValueError("Cannot delete expenses on a closed trip.")
     desc = expense.description
+    deltas = {expense.paid_by_id: (-expense.amount_rappen, 0)}
+    for split in expense.splits:
+        paid, owed = deltas.get(split.participant_id, (0, 0))
+        deltas[split.participant_id] = (paid, owed - split.share_rappen)
+    apply_deltas(session, deltas)
+    bump_revision(session, expense.trip_id)
     session.delete(expense)
     session.commit()
     return desc
 
 
 def list_expenses(session: Session, trip_id: int) -> list[Expense]:
-    """Return all expenses for a trip."""
+    """Return all expenses of a trip as ORM objects.
+
+    Only reads the hot tables; `export_service.iter_expense_rows` also
+    covers archived trips.
+    """
     return list(
         session.execute(
             select(Expense)
@@ -141,3 +334,37 @@ def _get_participant(
     if not p:
         raise ValueError(f"Participant '{name}' not found in this trip.")
     return p
+
+
+def _beneficiary_ids(
+    session: Session, trip_ids: set[int], names: list[str]
+) -> dict[int, list[int]]:
+    """Resolve beneficiary names (empty = everyone) to IDs for each trip."""
+    names = list(dict.fromkeys(names))
+    stmt = (
+        select(Participant.trip_id, Participant.name, Participant.id)
+        .where(Participant.trip_id.in_(trip_ids))
+        .order_by(Participant.id)
+    )
+    if names:
+        stmt = stmt.where(Participant.name.in_(names))
+    by_trip: dict[int, dict[str, int]] = {trip_id: {} for trip_id in trip_ids}
+    for trip_id, name, pid in session.execute(stmt):
+        by_trip[trip_id][name] = pid
+
+    result = {}
+    for trip_id, participants in by_trip.items():
+        if names:
+            result[trip_id] = [_lookup_participant(participants, n) for n in names]
+        else:
+            result[trip_id] = list(participants.values())
+        if not result[trip_id]:
+            raise ValueError("No participants to split the expense among.")
+    return result
+
+
+def _lookup_participant(participant_ids: dict[str, int], name: str) -> int:
+    """Get a participant ID from a name -> ID map or raise."""
+    if name not in participant_ids:
+        raise ValueError(f"Participant '{name}' not found in this trip.")
+    return participant_ids[name]
@@ -1,13 +1,104 @@
-"""CSV export service."""
+"""Export service -- CSV files and NDJSON streams of trips."""
 
 import csv
+import gzip
 import io
+import json
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import groupby
 from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator, Optional, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, select, union_all
+from sqlalchemy.orm import Session, aliased
 
-from src.services.expense_service import list_expenses
-from src.services.settlement_service import calculate_settlements
+from src.models import EXPENSE_TIERS, Participant, Trip
+from src.money import format_chf
+from src.services.settlement_service import (
+    Transfer,
+    calculate_settlements,
+    settle_trip_batch,
+)
+
+STDOUT = "-"
+NDJSON_FLUSH_EVERY = 100
+
+
+@dataclass
+class ExpenseRow:
+    """A flattened expense with payer and beneficiary names."""
+
+    id: int
+    description: str
+    amount_rappen: int
+    paid_by: str
+    split_among: list[str]
+    created_at: datetime
+    shares: list[int] = field(default_factory=list)  # Rappen, per split_among
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable representation."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "amount": format_chf(self.amount_rappen),
+            "paid_by": self.paid_by,
+            "split_among": self.split_among,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+def iter_expense_rows(
+    session: Session, trip_id: int, batch_size: int = 1000
+) -> Iterator[ExpenseRow]:
+    """Stream the expenses of a trip in creation order.
+
+    Expenses, splits and participant names come from a single joined query
+    read through a server-side cursor, so memory use does not grow with the
+    number of expenses and no relationship is lazy-loaded per row.
+    """
+    for _, row in iter_trips_expense_rows(session, [trip_id], batch_size):
+        yield row
+
+
+def iter_trips_expense_rows(
+    session: Session, trip_ids: list[int], batch_size: int = 1000
+) -> Iterator[tuple[int, ExpenseRow]]:
+    """Stream (trip ID, expense) pairs of several trips with one query.
+
+    The query reads the hot and the archive tables (UNION ALL), so archived
+    trips are exported like any other. Rows are ordered by trip ID (in the
+    order of `trip_ids` only if that is sorted) and then by creation order
+    within each trip.
+    """
+    stmt = (
+        union_all(*(
+            _expense_rows_select(expense, split, trip_ids)
+            for expense, split in EXPENSE_TIERS
+        ))
+        .order_by("trip_id", "created_at", "id", "split_id")
+        .execution_options(yield_per=batch_size)
+    )
+    rows = session.execute(stmt)
+    for _, group in groupby(rows, key=lambda row: row[0]):
+        group = list(group)
+        exp_id, description, amount_rappen, created_at, paid_by, _, trip_id, _, _ = group[0]
+        yield trip_id, ExpenseRow(
+            id=exp_id,
+            description=description,
+            amount_rappen=amount_rappen,
+            paid_by=paid_by,
+            split_among=[row[5] for row in group if row[5] is not None],
+            created_at=created_at,
+            shares=[row[7] for row in group if row[5] is not None],
+        )
 
 
 def export_trip_csv(
@@ -15,41 +106,267 @@ def export_trip_csv(
 ) -> str:
     """Export trip expenses and settlements to CSV.
 
+    Rows are written as they are read from the database. Use "-" as the
+    path to write to stdout; a ".gz" suffix writes a gzip-compressed file.
+
     Args:
         session: DB session.
         trip_id: Trip ID.
         output_path: File path for the CSV.
 
     Returns:
-        The absolute path of the written file.
+        The absolute path of the written file, or "-" for stdout.
     """
-    expenses = list_expenses(session, trip_id)
-    settlements = calculate_settlements(session, trip_id)
-
-    path = Path(output_path)
-    with path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-
-        # Expenses section
-        writer.writerow(["=== Expenses ==="])
-        writer.writerow(["ID", "Description", "Amount (CHF)", "Paid by", "Split among", "Date"])
-        for exp in expenses:
-            split_names = ", ".join(s.participant.name for s in exp.splits)
-            writer.writerow([
-                exp.id,
-                exp.description,
-                f"{exp.amount:.2f}",
-                exp.paid_by_participant.name,
-                split_names,
-                exp.created_at.strftime("%Y-%m-%d %H:%M"),
-            ])
-
-        writer.writerow([])
-
-        # Settlement section
-        writer.writerow(["=== Settlements ==="])
-        writer.writerow(["From", "To", "Amount (CHF)"])
-        for t in settlements:
-            writer.writerow([t.from_name, t.to_name, f"{t.amount:.2f}"])
-
-    return str(path.resolve())
+    with _open_output(output_path) as f:
+        write_trip_csv(
+            f,
+            iter_expense_rows(session, trip_id),
+            lambda: calculate_settlements(session, trip_id),
+        )
+
+    if output_path == STDOUT:
+        return STDOUT
+    return str(Path(output_path).resolve())
+
+
+def _expense_rows_select(expense, split, trip_ids: list[int]) -> Select:
+    """Flattened expense/split rows of one tier (hot or archive)."""
+    payer = aliased(Participant)
+    beneficiary = aliased(Participant)
+    stmt = (
+        select(
+            expense.id.label("id"),
+            expense.description,
+            expense.amount_rappen,
+            expense.created_at.label("created_at"),
+            payer.name.label("paid_by"),
+            beneficiary.name.label("beneficiary"),
+            expense.trip_id.label("trip_id"),
+            split.share_rappen,
+            split.id.label("split_id"),
+        )
+        .join(payer, payer.id == expense.paid_by_id)
+        .outerjoin(split, split.expense_id == expense.id)
+        .outerjoin(beneficiary, beneficiary.id == split.participant_id)
+    )
+    if len(trip_ids) == 1:
+        return stmt.where(expense.trip_id == trip_ids[0])
+    return stmt.where(expense.trip_id.in_(trip_ids))
+
+
+def write_trip_csv(
+    f: IO[str],
+    expenses: Iterable[ExpenseRow],
+    transfers: Union[Iterable[Transfer], Callable[[], Iterable[Transfer]]],
+) -> int:
+    """Write the two-section trip CSV. Returns the number of data rows.
+
+    `transfers` may be a callable so that the settlement is only computed
+    after the expenses have been streamed.
+    """
+    writer = csv.writer(f)
+    rows = 0
+
+    # Expenses section
+    writer.writerow(["=== Expenses ==="])
+    writer.writerow(["ID", "Description", "Amount (CHF)", "Paid by", "Split among", "Date"])
+    for exp in expenses:
+        writer.writerow([
+            exp.id,
+            exp.description,
+            format_chf(exp.amount_rappen),
+            exp.paid_by,
+            ", ".join(exp.split_among),
+            exp.created_at.strftime("%Y-%m-%d %H:%M"),
+        ])
+        rows += 1
+
+    writer.writerow([])
+
+    # Settlement section
+    writer.writerow(["=== Settlements ==="])
+    writer.writerow(["From", "To", "Amount (CHF)"])
+    for t in transfers() if callable(transfers) else transfers:
+        writer.writerow([t.from_name, t.to_name, format_chf(t.amount_rappen)])
+        rows += 1
+    return rows
+
+
+@dataclass
+class ExportSummary:
+    """Outcome of a multi-trip export."""
+
+    path: str
+    trips: int = 0
+    rows: int = 0
+    elapsed: float = 0.0
+
+
+def export_trips(
+    session: Session,
+    output_path: str,
+    closed_since: Optional[datetime] = None,
+    closed_until: Optional[datetime] = None,
+    batch_size: int = 50,
+    max_workers: int = 4,
+) -> ExportSummary:
+    """Export one CSV per closed trip into a directory or a .zip archive.
+
+    Trips are processed in batches: the expenses of a batch come from one
+    streamed query and the settlements from one snapshot query (plus one
+    ledger query for closed trips without a snapshot). The CSV files are
+    rendered and written by a thread pool while the next batch is read.
+
+    Args:
+        session: DB session.
+        output_path: Target directory, or a path ending in ".zip".
+        closed_since: Only trips closed at or after this time.
+        closed_until: Only trips closed before this time.
+        batch_size: Trips per database batch.
+        max_workers: Writer threads.
+
+    Returns:
+        The absolute output path with the number of trips and data rows.
+    """
+    start = time.perf_counter()
+    trips = session.execute(closed_trips_query(closed_since, closed_until)).all()
+
+    summary = ExportSummary(path=str(Path(output_path).resolve()))
+    with _archive_writer(output_path) as write, ThreadPoolExecutor(max_workers) as pool:
+        pending: list[Future] = []
+        for i in range(0, len(trips), batch_size):
+            batch = trips[i:i + batch_size]
+            trip_ids = [trip_id for trip_id, _ in batch]
+            expenses: dict[int, list[ExpenseRow]] = {trip_id: [] for trip_id in trip_ids}
+            for trip_id, row in iter_trips_expense_rows(session, trip_ids):
+                expenses[trip_id].append(row)
+            transfers = settle_trip_batch(session, trip_ids)
+
+            submitted = [
+                pool.submit(
+                    _render_and_write, write, trip_file_name(trip_id, name),
+                    expenses[trip_id], transfers[trip_id],
+                )
+                for trip_id, name in batch
+            ]
+            # Keep at most two batches in memory: wait for the previous one.
+            summary.rows += sum(f.result() for f in pending)
+            pending = submitted
+        summary.rows += sum(f.result() for f in pending)
+
+    summary.trips = len(trips)
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def closed_trips_query(
+    closed_since: Optional[datetime] = None, closed_until: Optional[datetime] = None
+) -> Select:
+    """Select (ID, name) of closed trips, `closed_until` exclusive."""
+    stmt = select(Trip.id, Trip.name).where(Trip.closed_at.is_not(None)).order_by(Trip.id)
+    if closed_since is not None:
+        stmt = stmt.where(Trip.closed_at >= closed_since)
+    if closed_until is not None:
+        stmt = stmt.where(Trip.closed_at < closed_until)
+    return stmt
+
+
+def iter_ndjson_records(
+    session: Session, trip_ids: list[int], batch_size: int = 50
+) -> Iterator[dict]:
+    """Stream expense, split and transfer records of trips for NDJSON output.
+
+    Each batch of trips is one streamed expense query followed by one
+    settlement batch, so records are produced while the cursor is read and
+    nothing is accumulated beyond a batch's transfers.
+    """
+    for i in range(0, len(trip_ids), batch_size):
+        batch = trip_ids[i:i + batch_size]
+        for trip_id, row in iter_trips_expense_rows(session, batch):
+            record = row.to_dict()
+            del record["split_among"]
+            yield {"type": "expense", "trip_id": trip_id, **record}
+            for name, share in zip(row.split_among, row.shares):
+                yield {
+                    "type": "split",
+                    "trip_id": trip_id,
+                    "expense_id": row.id,
+                    "participant": name,
+                    "share": format_chf(share),
+                }
+        settlements = settle_trip_batch(session, batch)
+        for trip_id in batch:
+            for t in settlements[trip_id]:
+                yield {"type": "transfer", "trip_id": trip_id, **t.to_dict()}
+
+
+def write_ndjson(
+    records: Iterable[dict], f: IO[str], flush_every: int = NDJSON_FLUSH_EVERY
+) -> int:
+    """Write one JSON object per line, flushing every `flush_every` lines.
+
+    Returns:
+        The number of records written.
+    """
+    count = 0
+    for count, record in enumerate(records, 1):
+        f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n")
+        if count % flush_every == 0:
+            f.flush()
+    f.flush()
+    return count
+
+
+def trip_file_name(trip_id: int, name: str) -> str:
+    """Return the default CSV file name of a trip."""
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+    return f"trip_{trip_id}_{safe}.csv"
+
+
+def _render_and_write(
+    write: Callable[[str, str], None],
+    file_name: str,
+    expenses: list[ExpenseRow],
+    transfers: list[Transfer],
+) -> int:
+    buffer = io.StringIO(newline="")
+    rows = write_trip_csv(buffer, expenses, transfers)
+    write(file_name, buffer.getvalue())
+    return rows
+
+
+@contextmanager
+def _archive_writer(output_path: str) -> Iterator[Callable[[str, str], None]]:
+    """Yield a thread-safe `write(file name, text)` for a directory or zip."""
+    if output_path.endswith(".zip"):
+        lock = threading.Lock()
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            def write(file_name: str, text: str) -> None:
+                data = text.encode("utf-8")
+                with lock:
+                    zf.writestr(file_name, data)
+
+            yield write
+    else:
+        directory = Path(output_path)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        def write(file_name: str, text: str) -> None:
+            (directory / file_name).write_text(text, encoding="utf-8", newline="")
+
+        yield write
+
+
+@contextmanager
+def _open_output(output_path: str) -> Iterator[IO[str]]:
+    """Open stdout, a gzip file or a plain file for CSV writing."""
+    if output_path == STDOUT:
+        yield sys.stdout
+        sys.stdout.flush()
+    elif output_path.endswith(".gz"):
+        with gzip.open(output_path, "wt", newline="", encoding="utf-8") as f:
+            yield f
+    else:
+        with open(output_path, "w", newline="", encoding="utf-8") as f:
+            yield f
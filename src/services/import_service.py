@@ -0,0 +1,244 @@
+"""Bulk import service for expenses from CSV or JSONL files."""
+
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from src.models import Expense, ExpenseSplit, Participant, Trip
+from src.money import split_rappen, to_rappen
+from src.services.ledger_service import apply_deltas
+from src.services.trip_service import bump_revision
+
+# A CSV row, a JSONL line, or the error of a line that could not be read.
+Record = Union[dict, str, ValueError]
+
+
+@dataclass
+class RejectedRow:
+    """An input row that could not be imported."""
+
+    line: int
+    error: str
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk import."""
+
+    imported: int = 0
+    rejected: list[RejectedRow] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Return the import throughput."""
+        total = self.imported + len(self.rejected)
+        return total / self.elapsed if self.elapsed else 0.0
+
+
+def read_rows(path: str, fmt: str | None = None) -> Iterator[tuple[int, Record]]:
+    """Stream (line number, record) pairs from a CSV or JSONL file.
+
+    CSV records are dicts keyed by the header row. JSONL records are the raw
+    line text so that malformed JSON is rejected per row, not per file. A
+    row that is not valid UTF-8 or that the csv module cannot parse is
+    yielded as a ValueError, so it is rejected like any other bad row.
+    """
+    fmt = fmt or ("csv" if Path(path).suffix.lower() == ".csv" else "jsonl")
+    # Undecodable bytes become lone surrogates instead of aborting the read.
+    with open(path, newline="", encoding="utf-8", errors="surrogateescape") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            while True:
+                try:
+                    record = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as e:
+                    # DictReader.line_num only advances on success.
+                    yield reader.reader.line_num, ValueError(f"Invalid CSV: {e}.")
+                    continue
+                texts = [v for v in record.values() if isinstance(v, str)]
+                yield reader.line_num, _checked_utf8(record, texts)
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_no, _checked_utf8(line, [line])
+
+
+def _checked_utf8(record: Record, texts: list[str]) -> Record:
+    """Return the record, or a ValueError if a text holds undecodable bytes."""
+    try:
+        for text in texts:
+            text.encode("utf-8")
+    except UnicodeEncodeError:
+        return ValueError("Line is not valid UTF-8.")
+    return record
+
+
+def import_expenses(
+    session: Session,
+    trip_id: int,
+    rows: Iterable[tuple[int, Record]],
+    batch_size: int = 1000,
+) -> ImportResult:
+    """Import expenses in batches, splitting each equally.
+
+    Each record needs `paid_by`, `amount` and `description`; `for` (names,
+    comma-separated or a list; empty = all) and `date` (ISO format) are
+    optional. Participant names are resolved once up front. Every batch is
+    inserted with multi-row INSERTs and committed on its own; invalid rows
+    are collected in the result instead of aborting the import.
+
+    Raises:
+        ValueError: If the trip does not exist or is closed.
+    """
+    trip = session.get(Trip, trip_id)
+    if not trip:
+        raise ValueError(f"Trip {trip_id} not found.")
+    if not trip.is_open:
+        raise ValueError(f"Trip '{trip.name}' is closed.")
+
+    participant_ids = dict(
+        session.execute(
+            select(Participant.name, Participant.id)
+            .where(Participant.trip_id == trip_id)
+            .order_by(Participant.id)
+        ).all()
+    )
+
+    result = ImportResult()
+    start = time.perf_counter()
+    batch: list[tuple[dict, list[int]]] = []
+    for line_no, record in rows:
+        try:
+            batch.append(_parse_record(record, trip_id, participant_ids))
+        except (ValueError, TypeError, KeyError, ArithmeticError) as e:
+            result.rejected.append(RejectedRow(line=line_no, error=str(e)))
+            continue
+        if len(batch) >= batch_size:
+            result.imported += _insert_batch(session, trip_id, batch)
+            batch = []
+    if batch:
+        result.imported += _insert_batch(session, trip_id, batch)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _parse_record(
+    record: Record, trip_id: int, participant_ids: dict[str, int]
+) -> tuple[dict, list[int]]:
+    """Validate a record and return expense values plus beneficiary IDs."""
+    if isinstance(record, ValueError):
+        raise record
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}.") from None
+        if not isinstance(record, dict):
+            raise ValueError("Expected a JSON object.")
+
+    paid_by = _text(record, "paid_by")
+    if paid_by not in participant_ids:
+        raise ValueError(f"Participant '{paid_by}' not found in this trip.")
+
+    raw_amount = record.get("amount", "")
+    if isinstance(raw_amount, bool) or not isinstance(raw_amount, (str, int, float)):
+        raise ValueError("'amount' must be a string or a number.")
+    raw_amount = str(raw_amount).strip()
+    amount_rappen = to_rappen(raw_amount)
+    if Decimal(raw_amount) * 100 != amount_rappen:
+        raise ValueError(f"'{raw_amount}' is not a valid amount.")
+
+    description = _text(record, "description")
+    if not description:
+        raise ValueError("Description is required.")
+    if len(description) > 300:
+        raise ValueError("Description is longer than 300 characters.")
+
+    for_names = record.get("for") or []
+    if isinstance(for_names, str):
+        for_names = [n.strip() for n in for_names.split(",") if n.strip()]
+    elif not isinstance(for_names, list) or not all(
+        isinstance(n, str) for n in for_names
+    ):
+        raise ValueError("'for' must be a list of names or a comma-separated string.")
+    if not for_names or for_names == ["all"]:
+        beneficiary_ids = list(participant_ids.values())
+    else:
+        missing = [n for n in for_names if n not in participant_ids]
+        if missing:
+            raise ValueError(f"Participant '{missing[0]}' not found in this trip.")
+        beneficiary_ids = [participant_ids[n] for n in for_names]
+    if not beneficiary_ids:
+        raise ValueError("No participants to split the expense among.")
+
+    raw_date = record.get("date")
+    if raw_date is not None and not isinstance(raw_date, str):
+        raise ValueError("'date' must be an ISO date string.")
+    created_at = (
+        datetime.fromisoformat(raw_date) if raw_date else datetime.now(timezone.utc)
+    )
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+
+    values = {
+        "trip_id": trip_id,
+        "paid_by_id": participant_ids[paid_by],
+        "description": description,
+        "amount_rappen": amount_rappen,
+        "created_at": created_at,
+    }
+    return values, beneficiary_ids
+
+
+def _text(record: dict, key: str) -> str:
+    """Return the stripped string field `key`; missing or null is ""."""
+    value = record.get(key)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"'{key}' must be a string.")
+    return value.strip()
+
+
+def _insert_batch(
+    session: Session, trip_id: int, batch: list[tuple[dict, list[int]]]
+) -> int:
+    """Insert one batch of expenses and their splits, then commit."""
+    expense_ids = session.execute(
+        insert(Expense).returning(Expense.id, sort_by_parameter_order=True),
+        [values for values, _ in batch],
+    ).scalars().all()
+
+    splits = []
+    deltas: dict[int, tuple[int, int]] = {}
+    for expense_id, (values, beneficiary_ids) in zip(expense_ids, batch):
+        payer_id = values["paid_by_id"]
+        paid, owed = deltas.get(payer_id, (0, 0))
+        deltas[payer_id] = (paid + values["amount_rappen"], owed)
+
+        share = split_rappen(values["amount_rappen"], len(beneficiary_ids))
+        for participant_id in beneficiary_ids:
+            splits.append({
+                "expense_id": expense_id,
+                "participant_id": participant_id,
+                "share_rappen": share,
+            })
+            paid, owed = deltas.get(participant_id, (0, 0))
+            deltas[participant_id] = (paid, owed + share)
+
+    session.execute(insert(ExpenseSplit), splits)
+    apply_deltas(session, deltas)
+    bump_revision(session, trip_id)
+    session.commit()
+    return len(batch)
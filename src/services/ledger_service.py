@@ -0,0 +1,137 @@
+"""Ledger service -- per-participant running totals of paid and owed."""
+
+import operator
+from dataclasses import dataclass
+from functools import reduce
+from typing import Optional
+
+from sqlalchemy import BigInteger, bindparam, cast, func, select, update
+from sqlalchemy.orm import Session
+
+from src.models import EXPENSE_TIERS, Participant, Trip
+
+_participants = Participant.__table__
+
+
+@dataclass
+class LedgerDrift:
+    """A participant whose stored ledger differs from the raw splits."""
+
+    trip_id: int
+    name: str
+    stored_paid: int
+    actual_paid: int
+    stored_owed: int
+    actual_owed: int
+
+
+def apply_deltas(
+    session: Session, deltas: dict[int, tuple[int, int]]
+) -> None:
+    """Add (paid, owed) Rappen deltas to the ledger of each participant ID.
+
+    Runs as one executemany UPDATE in the caller's transaction; the caller
+    is responsible for committing.
+    """
+    params = [
+        {"pid": pid, "paid": paid, "owed": owed}
+        for pid, (paid, owed) in deltas.items()
+        if paid or owed
+    ]
+    if not params:
+        return
+    session.execute(
+        update(_participants)
+        .where(_participants.c.id == bindparam("pid"))
+        .values(
+            paid_rappen=_participants.c.paid_rappen + bindparam("paid"),
+            owed_rappen=_participants.c.owed_rappen + bindparam("owed"),
+        ),
+        params,
+    )
+
+
+def rebuild_ledger(session: Session, trip_id: Optional[int] = None) -> int:
+    """Recompute the ledger from expenses and splits. Returns rows updated."""
+    stmt = update(_participants).values(
+        paid_rappen=_raw_paid(), owed_rappen=_raw_owed()
+    )
+    bump = update(Trip).values(revision=Trip.revision + 1)
+    if trip_id is not None:
+        stmt = stmt.where(_participants.c.trip_id == trip_id)
+        bump = bump.where(Trip.id == trip_id)
+    result = session.execute(stmt)
+    session.execute(bump)
+    session.commit()
+    return result.rowcount
+
+
+def compute_totals(session: Session, trip_id: int) -> list[tuple[str, int, int]]:
+    """Return (name, paid, owed) per participant, computed from raw splits."""
+    return [
+        tuple(row)
+        for row in session.execute(
+            select(Participant.name, _raw_paid(), _raw_owed())
+            .where(Participant.trip_id == trip_id)
+            .order_by(Participant.id)
+        )
+    ]
+
+
+def verify_ledger(
+    session: Session, trip_id: Optional[int] = None
+) -> list[LedgerDrift]:
+    """Compare the stored ledger against the raw splits and return drifts.
+
+    Raw rows of both the hot and the archive tier are counted.
+    """
+    stmt = (
+        select(
+            Participant.trip_id,
+            Participant.name,
+            Participant.paid_rappen,
+            Participant.owed_rappen,
+            _raw_paid(),
+            _raw_owed(),
+        )
+        .order_by(Participant.trip_id, Participant.id)
+    )
+    if trip_id is not None:
+        stmt = stmt.where(Participant.trip_id == trip_id)
+
+    drifts = []
+    for row in session.execute(stmt):
+        tid, name, stored_paid, stored_owed, actual_paid, actual_owed = row
+        if stored_paid != actual_paid or stored_owed != actual_owed:
+            drifts.append(LedgerDrift(
+                trip_id=tid,
+                name=name,
+                stored_paid=stored_paid,
+                actual_paid=actual_paid,
+                stored_owed=stored_owed,
+                actual_owed=actual_owed,
+            ))
+    return drifts
+
+
+def _raw_paid():
+    """Correlated subquery: total paid by the participant in the outer row.
+
+    SUM(bigint) is numeric on PostgreSQL, hence the cast back to BIGINT.
+    """
+    return cast(reduce(operator.add, (
+        select(func.coalesce(func.sum(expense.amount_rappen), 0))
+        .where(expense.paid_by_id == _participants.c.id)
+        .scalar_subquery()
+        for expense, _ in EXPENSE_TIERS
+    )), BigInteger)
+
+
+def _raw_owed():
+    """Correlated subquery: total owed by the participant in the outer row."""
+    return cast(reduce(operator.add, (
+        select(func.coalesce(func.sum(split.share_rappen), 0))
+        .where(split.participant_id == _participants.c.id)
+        .scalar_subquery()
+        for _, split in EXPENSE_TIERS
+    )), BigInteger)
@@ -1,11 +1,17 @@
 """Participant service for CRUD operations."""
 
+import os
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from src.models import Participant, Trip
+from src.services.trip_service import bump_revision
+
+# Groups are capped at 10 people by default; set KOSTENTEILER_MAX_PARTICIPANTS
+# to allow large groups (see `vector_settlement` for the matching engine).
+MAX_PARTICIPANTS = int(os.getenv("KOSTENTEILER_MAX_PARTICIPANTS", "10"))
 
 
 def add_participant(session: Session, trip_id: int, name: str) -> Participant:
@@ -15,8 +21,13 @@ def add_participant(session: Session, trip_id: int, name: str) -> Participant:
         raise ValueError(f"Trip {trip_id} not found.")
     if not trip.is_open:
         raise ValueError(f"Trip '{trip.name}' is closed.")
-    if len(trip.participants) >= 10:
-        raise ValueError("Maximum of 10 participants per trip.")
+    count = session.execute(
+        select(func.count())
+        .select_from(Participant)
+        .where(Participant.trip_id == trip_id)
+    ).scalar_one()
+    if count >= MAX_PARTICIPANTS:
+        raise ValueError(f"Maximum of {MAX_PARTICIPANTS} participants per trip.")
 
     existing = session.execute(
         select(Participant).where(
@@ -28,6 +39,7 @@ def add_participant(session: Session, trip_id: int, name: str) -> Participant:
 
     participant = Participant(trip_id=trip_id, name=name)
     session.add(participant)
+    bump_revision(session, trip_id)
     session.commit()
     session.refresh(participant)
     return participant
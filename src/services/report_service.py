@@ -0,0 +1,306 @@
+"""Report service -- per-trip statistics computed in SQL.
+
+A report needs two statements: one over the participants (ledger totals,
+expense counts per payer and the trip total as a window sum) and one over
+the expenses (spend per day with a running total, UNION ALL the largest
+expenses ranked by a window function). Both read the expenses of the hot
+and the archive tier as one UNION ALL. Only aggregated rows reach
+Python, and no ORM objects are built, so the cost on the Python side does
+not grow with the number of expenses.
+"""
+
+import csv
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from typing import IO
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    Integer,
+    String,
+    Subquery,
+    cast,
+    func,
+    literal,
+    select,
+    union_all,
+)
+from sqlalchemy.orm import Session
+
+from src.models import EXPENSE_TIERS, Participant, Trip
+from src.money import format_chf
+
+TOP_EXPENSES = 5
+
+
+@dataclass
+class ParticipantStats:
+    """Totals of one participant."""
+
+    name: str
+    paid_rappen: int
+    owed_rappen: int
+    expenses_paid: int
+    paid_share: float
+
+    @property
+    def balance_rappen(self) -> int:
+        """Return paid minus owed."""
+        return self.paid_rappen - self.owed_rappen
+
+
+@dataclass
+class DayStats:
+    """Spend of one calendar day."""
+
+    day: date
+    expense_count: int
+    total_rappen: int
+    running_total_rappen: int
+
+
+@dataclass
+class LargeExpense:
+    """One of the largest expenses of a trip."""
+
+    rank: int
+    id: int
+    description: str
+    amount_rappen: int
+    paid_by: str
+    created_at: datetime
+
+
+@dataclass
+class TripReport:
+    """Statistics of one trip."""
+
+    trip_id: int
+    trip_name: str
+    total_rappen: int
+    expense_count: int
+    participants: list[ParticipantStats]
+    days: list[DayStats]
+    largest: list[LargeExpense]
+
+
+def trip_report(
+    session: Session, trip_id: int, top: int = TOP_EXPENSES
+) -> TripReport:
+    """Compute the statistics report of a trip.
+
+    Raises:
+        ValueError: If the trip does not exist.
+    """
+    name = session.execute(
+        select(Trip.name).where(Trip.id == trip_id)
+    ).scalar_one_or_none()
+    if name is None:
+        raise ValueError(f"Trip {trip_id} not found.")
+
+    expenses = _trip_expenses(trip_id)
+    participants = _participant_stats(session, trip_id, expenses)
+    days, largest = _expense_stats(session, expenses, top)
+    return TripReport(
+        trip_id=trip_id,
+        trip_name=name,
+        total_rappen=sum(p.paid_rappen for p in participants),
+        expense_count=sum(p.expenses_paid for p in participants),
+        participants=participants,
+        days=days,
+        largest=largest,
+    )
+
+
+def report_to_dict(report: TripReport) -> dict:
+    """Return a JSON-serializable dict with CHF amounts as strings."""
+    return {
+        "trip_id": report.trip_id,
+        "trip": report.trip_name,
+        "total": format_chf(report.total_rappen),
+        "expense_count": report.expense_count,
+        "participants": [
+            {
+                "name": p.name,
+                "paid": format_chf(p.paid_rappen),
+                "owed": format_chf(p.owed_rappen),
+                "balance": format_chf(p.balance_rappen),
+                "expenses_paid": p.expenses_paid,
+                "paid_share": round(p.paid_share, 4),
+            }
+            for p in report.participants
+        ],
+        "days": [
+            {
+                "day": d.day.isoformat(),
+                "expense_count": d.expense_count,
+                "total": format_chf(d.total_rappen),
+                "running_total": format_chf(d.running_total_rappen),
+            }
+            for d in report.days
+        ],
+        "largest": [
+            {
+                **asdict(e),
+                "amount": format_chf(e.amount_rappen),
+                "created_at": e.created_at.isoformat(),
+            }
+            for e in report.largest
+        ],
+    }
+
+
+def write_report_csv(report: TripReport, f: IO[str]) -> None:
+    """Write the report as CSV sections, like the trip export."""
+    writer = csv.writer(f)
+    writer.writerow(["=== Participants ==="])
+    writer.writerow(["Name", "Paid (CHF)", "Owed (CHF)", "Balance (CHF)", "Expenses paid", "Share paid"])
+    for p in report.participants:
+        writer.writerow([
+            p.name,
+            format_chf(p.paid_rappen),
+            format_chf(p.owed_rappen),
+            format_chf(p.balance_rappen),
+            p.expenses_paid,
+            f"{p.paid_share:.4f}",
+        ])
+    writer.writerow([])
+    writer.writerow(["=== Spend per day ==="])
+    writer.writerow(["Day", "Expenses", "Total (CHF)", "Running total (CHF)"])
+    for d in report.days:
+        writer.writerow([
+            d.day.isoformat(),
+            d.expense_count,
+            format_chf(d.total_rappen),
+            format_chf(d.running_total_rappen),
+        ])
+    writer.writerow([])
+    writer.writerow(["=== Largest expenses ==="])
+    writer.writerow(["Rank", "ID", "Description", "Amount (CHF)", "Paid by", "Date"])
+    for e in report.largest:
+        writer.writerow([
+            e.rank,
+            e.id,
+            e.description,
+            format_chf(e.amount_rappen),
+            e.paid_by,
+            e.created_at.strftime("%Y-%m-%d %H:%M"),
+        ])
+
+
+def _trip_expenses(trip_id: int) -> Subquery:
+    """The trip's expenses from the hot and the archive tier."""
+    return union_all(*(
+        select(
+            expense.id,
+            expense.paid_by_id,
+            expense.description,
+            expense.amount_rappen,
+            expense.created_at,
+        ).where(expense.trip_id == trip_id)
+        for expense, _ in EXPENSE_TIERS
+    )).subquery()
+
+
+def _participant_stats(
+    session: Session, trip_id: int, expenses: Subquery
+) -> list[ParticipantStats]:
+    """Ledger totals, expense counts per payer and the trip total."""
+    counts = (
+        select(expenses.c.paid_by_id, func.count().label("n"))
+        .group_by(expenses.c.paid_by_id)
+        .subquery()
+    )
+    rows = session.execute(
+        select(
+            Participant.name,
+            Participant.paid_rappen,
+            Participant.owed_rappen,
+            func.coalesce(counts.c.n, 0),
+            cast(func.sum(Participant.paid_rappen).over(), BigInteger),
+        )
+        .outerjoin(counts, counts.c.paid_by_id == Participant.id)
+        .where(Participant.trip_id == trip_id)
+        .order_by(Participant.paid_rappen.desc(), Participant.id)
+    ).all()
+    return [
+        ParticipantStats(
+            name=name,
+            paid_rappen=paid,
+            owed_rappen=owed,
+            expenses_paid=count,
+            paid_share=paid / total if total else 0.0,
+        )
+        for name, paid, owed, count, total in rows
+    ]
+
+
+def _expense_stats(
+    session: Session, expenses: Subquery, top: int
+) -> tuple[list[DayStats], list[LargeExpense]]:
+    """Spend per day and the `top` largest expenses in one statement."""
+    # Both halves share one column layout: "extra" is the running total of
+    # a day row and the rank of a largest-expense row. The column types must
+    # match for PostgreSQL, and its SUM(bigint) is numeric, hence the casts.
+    day = func.date(expenses.c.created_at)
+    per_day = (
+        select(
+            literal("day").label("kind"),
+            day.label("day"),
+            func.count().label("n"),
+            cast(func.sum(expenses.c.amount_rappen), BigInteger).label("amount"),
+            cast(
+                func.sum(func.sum(expenses.c.amount_rappen)).over(order_by=day),
+                BigInteger,
+            ).label("extra"),
+            cast(None, Integer).label("expense_id"),
+            cast(None, String).label("description"),
+            cast(None, String).label("paid_by"),
+            cast(None, DateTime(timezone=True)).label("created_at"),
+        )
+        .group_by(day)
+    )
+    ranked = (
+        select(
+            expenses.c.id,
+            expenses.c.description,
+            expenses.c.amount_rappen,
+            expenses.c.created_at,
+            Participant.name,
+            func.row_number()
+            .over(order_by=(expenses.c.amount_rappen.desc(), expenses.c.id))
+            .label("rank"),
+        )
+        .join(Participant, Participant.id == expenses.c.paid_by_id)
+        .subquery()
+    )
+    largest = select(
+        literal("top"),
+        cast(None, Date),
+        literal(1),
+        ranked.c.amount_rappen,
+        cast(ranked.c.rank, BigInteger),
+        ranked.c.id,
+        ranked.c.description,
+        ranked.c.name,
+        ranked.c.created_at,
+    ).where(ranked.c.rank <= top)
+
+    days, top_expenses = [], []
+    for kind, d, n, amount, extra, exp_id, desc, paid_by, created in session.execute(
+        per_day.union_all(largest)
+    ):
+        if kind == "day":
+            days.append(DayStats(_as_date(d), n, amount, extra))
+        else:
+            top_expenses.append(LargeExpense(extra, exp_id, desc, amount, paid_by, created))
+    days.sort(key=lambda s: s.day)
+    top_expenses.sort(key=lambda e: e.rank)
+    return days, top_expenses
+
+
+def _as_date(value: object) -> date:
+    """SQLite returns date() as text, PostgreSQL as a date."""
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
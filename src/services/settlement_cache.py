@@ -0,0 +1,137 @@
+"""Settlement cache keyed by the trip revision counter.
+
+Every mutation of a trip's participants or expenses bumps `Trip.revision`,
+so a computed settlement stays valid for as long as the revision does. The
+cache keeps one bounded in-process LRU per database engine and, if
+KOSTENTEILER_CACHE_DIR is set, an on-disk copy shared between processes.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+CACHE_SIZE = int(os.getenv("KOSTENTEILER_CACHE_SIZE", "256"))
+CACHE_DIR = os.getenv("KOSTENTEILER_CACHE_DIR")
+
+Key = tuple[int, str, int, str]
+
+
+class SettlementCache:
+    """A bounded LRU of settlements with an optional on-disk layer."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, directory: Optional[str] = None):
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Key, list] = OrderedDict()
+
+    def get(self, key: Key) -> Optional[list]:
+        """Return the cached transfer rows for a key, or None."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        path = self._path(key)
+        if path is not None and path.exists():
+            rows = [tuple(row) for row in json.loads(path.read_text())]
+            self._store(key, rows)
+            self.hits += 1
+            return rows
+        self.misses += 1
+        return None
+
+    def put(self, key: Key, rows: list) -> None:
+        """Cache transfer rows (from name, to name, Rappen) for a key."""
+        self._store(key, rows)
+        path = self._path(key)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(rows))
+            os.replace(tmp, path)
+
+    def invalidate(self, trip_id: int) -> None:
+        """Drop every cached settlement of a trip."""
+        self.invalidate_trips([trip_id])
+
+    def invalidate_trips(self, trip_ids: Iterable[int]) -> None:
+        """Drop every cached settlement of several trips in one pass."""
+        trip_ids = set(trip_ids)
+        for key in [k for k in self._entries if k[0] in trip_ids]:
+            del self._entries[key]
+        if self.directory is not None and self.directory.exists():
+            for path in self.directory.glob("*.json"):
+                if int(path.name.split("_", 1)[0]) in trip_ids:
+                    path.unlink(missing_ok=True)
+
+    def _store(self, key: Key, rows: list) -> None:
+        self._entries[key] = rows
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: Key) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        trip_id, created, revision, strategy = key
+        stamp = hashlib.sha1(created.encode()).hexdigest()[:12]
+        return self.directory / f"{trip_id}_{stamp}_{revision}_{strategy}.json"
+
+
+_caches: "WeakKeyDictionary[Engine, SettlementCache]" = WeakKeyDictionary()
+
+
+def cache_for(session: Session) -> SettlementCache:
+    """Return the cache of the session's engine, creating it on first use."""
+    engine = session.get_bind()
+    cache = _caches.get(engine)
+    if cache is None:
+        directory = None
+        if CACHE_DIR and not _is_memory_db(engine):
+            url = engine.url.render_as_string(hide_password=True)
+            directory = Path(CACHE_DIR) / hashlib.sha1(url.encode()).hexdigest()[:12]
+        cache = _caches[engine] = SettlementCache(directory=directory)
+    return cache
+
+
+def make_key(
+    trip_id: int, created_at: object, revision: int, strategy: str
+) -> Key:
+    """Build a cache key; the creation timestamp guards against ID reuse."""
+    return trip_id, str(created_at), revision, strategy
+
+
+def invalidate(session: Session, trip_id: int) -> None:
+    """Drop cached settlements of a trip (e.g. after deleting it)."""
+    cache_for(session).invalidate(trip_id)
+
+
+def invalidate_trips(session: Session, trip_ids: Iterable[int]) -> None:
+    """Drop cached settlements of several trips (e.g. after a purge)."""
+    cache_for(session).invalidate_trips(trip_ids)
+
+
+def stats() -> dict[str, int]:
+    """Return hit and miss counters summed over all engines."""
+    caches = list(_caches.values())
+    return {
+        "hits": sum(c.hits for c in caches),
+        "misses": sum(c.misses for c in caches),
+        "entries": sum(len(c._entries) for c in caches),
+    }
+
+
+def _is_memory_db(engine: Engine) -> bool:
+    return engine.url.get_backend_name() == "sqlite" and engine.url.database in (
+        None,
+        "",
+        ":memory:",
+    )
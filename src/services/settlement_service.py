@@ -1,69 +1,358 @@
 """Settlement service -- calculates who owes whom."""
 
+import time
 from dataclasses import dataclass
 from decimal import Decimal
+from typing import Iterator, Optional
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from src.models import Expense, ExpenseSplit, Participant
-from src.services.expense_service import round_to_05
+from src.models import Participant, Trip, TripSnapshot
+from src.money import format_chf, from_rappen, round_rappen_to_05
+from src.services import settlement_cache
 
 
-@dataclass
+STRATEGIES = ("greedy", "exact", "auto")
+
+# The exact solver is O(n * 2^n) in the number of non-zero balances; "auto"
+# only tries it up to this size and within this time budget (seconds).
+EXACT_MAX_BALANCES = 14
+EXACT_TIME_BUDGET = 0.5
+
+
+class _BudgetExceeded(Exception):
+    """Raised when the exact solver runs past its deadline."""
+
+
+@dataclass(frozen=True)
 class Transfer:
     """A single transfer from debtor to creditor."""
 
     from_name: str
     to_name: str
-    amount: Decimal
+    amount_rappen: int
+
+    @property
+    def amount(self) -> Decimal:
+        """Return the amount in CHF."""
+        return from_rappen(self.amount_rappen)
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable representation."""
+        return {
+            "from": self.from_name,
+            "to": self.to_name,
+            "amount": format_chf(self.amount_rappen),
+        }
+
+
+@dataclass
+class TripSettlement:
+    """The transfers that settle one trip."""
+
+    trip_id: int
+    trip_name: str
+    transfers: list[Transfer]
 
 
 def calculate_settlements(
-    session: Session, trip_id: int
+    session: Session, trip_id: int, strategy: str = "greedy"
 ) -> list[Transfer]:
     """Calculate minimal transfers to settle all debts for a trip.
 
+    Args:
+        session: DB session.
+        trip_id: Trip ID.
+        strategy: "greedy", "exact" or "auto" (see `minimize_transfers`).
+
+    Closed trips are served from their frozen snapshot. For open trips the
+    result is cached per trip revision, so repeated calls on an unchanged
+    trip only cost the revision lookup.
+
     Returns:
         List of Transfer objects representing who pays whom.
     """
-    participants = list(
-        session.execute(
-            select(Participant).where(Participant.trip_id == trip_id)
-        ).scalars()
-    )
-
-    if not participants:
+    row = session.execute(
+        select(
+            Trip.revision,
+            Trip.created_at,
+            TripSnapshot.participants,
+            TripSnapshot.transfers,
+        )
+        .outerjoin(TripSnapshot, TripSnapshot.trip_id == Trip.id)
+        .where(Trip.id == trip_id)
+    ).one_or_none()
+    if row is None:
         return []
+    if row.transfers is not None:
+        return _from_snapshot(row.participants, row.transfers, strategy)
+
+    key = settlement_cache.make_key(trip_id, row.created_at, row.revision, strategy)
+    cache = settlement_cache.cache_for(session)
+    rows = cache.get(key)
+    if rows is None:
+        balances = calculate_balances(session, trip_id)
+        transfers = minimize_transfers(balances, strategy) if balances else []
+        rows = [(t.from_name, t.to_name, t.amount_rappen) for t in transfers]
+        cache.put(key, rows)
+    return [Transfer(*row) for row in rows]
+
 
-    balances: dict[str, Decimal] = {p.name: Decimal("0") for p in participants}
+def calculate_balances(session: Session, trip_id: int) -> dict[str, int]:
+    """Return the net balance (paid - owed) in Rappen per participant name.
 
-    expenses = list(
-        session.execute(
-            select(Expense).where(Expense.trip_id == trip_id)
-        ).scalars()
+    Balances are rounded to 5 Rappen.
+    Reads the per-participant ledger maintained by the expense service, so
+    the cost depends on the number of participants, not expenses.
+    """
+    rows = session.execute(
+        select(Participant.name, Participant.paid_rappen - Participant.owed_rappen)
+        .where(Participant.trip_id == trip_id)
+        .order_by(Participant.id)
     )
+    return {name: round_rappen_to_05(balance) for name, balance in rows}
+
+
+def settle_trips(
+    session: Session,
+    closed: Optional[bool] = None,
+    strategy: str = "greedy",
+    max_workers: Optional[int] = None,
+    chunk_size: int = 64,
+) -> Iterator[TripSettlement]:
+    """Settle many trips at once, yielding each result as it is ready.
 
-    for expense in expenses:
-        payer_name = expense.paid_by_participant.name
-        balances[payer_name] += expense.amount
+    Closed trips come from their snapshots and all other balances are read
+    in one query. Transfer minimisation then fans out over a process pool in
+    chunks of trips; with `max_workers=1` everything runs in this process.
 
-        splits = list(
-            session.execute(
-                select(ExpenseSplit).where(ExpenseSplit.expense_id == expense.id)
-            ).scalars()
+    Args:
+        session: DB session.
+        closed: True for closed trips only, False for open ones, None for all.
+        strategy: See `minimize_transfers`.
+        max_workers: Process pool size (default: number of CPUs).
+        chunk_size: Trips per pool task.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown settlement strategy '{strategy}'.")
+
+    trips = []
+    if closed is not False:
+        for trip_id, trip_name, participants, transfers in session.execute(
+            select(Trip.id, Trip.name, TripSnapshot.participants, TripSnapshot.transfers)
+            .join(TripSnapshot, TripSnapshot.trip_id == Trip.id)
+            .order_by(Trip.id)
+        ):
+            if strategy == "greedy":
+                yield TripSettlement(trip_id, trip_name, _from_snapshot(
+                    participants, transfers, strategy
+                ))
+            else:
+                trips.append((trip_id, trip_name, _snapshot_balances(participants)))
+    trips.extend(load_trip_balances(session, closed))
+    chunks = [trips[i:i + chunk_size] for i in range(0, len(trips), chunk_size)]
+    if max_workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from _settle_chunk(chunk, strategy)
+        return
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_settle_chunk, chunk, strategy) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def load_trip_balances(
+    session: Session, closed: Optional[bool] = None
+) -> list[tuple[int, str, dict[str, int]]]:
+    """Return (trip ID, trip name, balances) for selected trips.
+
+    Trips with a frozen snapshot are skipped; see `settle_trips`.
+    """
+    stmt = (
+        select(
+            Trip.id,
+            Trip.name,
+            Participant.name,
+            Participant.paid_rappen - Participant.owed_rappen,
         )
-        for split in splits:
-            balances[split.participant.name] -= split.share_amount
+        .outerjoin(Participant, Participant.trip_id == Trip.id)
+        .outerjoin(TripSnapshot, TripSnapshot.trip_id == Trip.id)
+        .where(TripSnapshot.trip_id.is_(None))
+        .order_by(Trip.id, Participant.id)
+    )
+    if closed is True:
+        stmt = stmt.where(Trip.closed_at.is_not(None))
+    elif closed is False:
+        stmt = stmt.where(Trip.closed_at.is_(None))
+
+    trips: list[tuple[int, str, dict[str, int]]] = []
+    for trip_id, trip_name, name, balance in session.execute(stmt):
+        if not trips or trips[-1][0] != trip_id:
+            trips.append((trip_id, trip_name, {}))
+        if name is not None:
+            trips[-1][2][name] = round_rappen_to_05(balance)
+    return trips
+
+
+def settle_trip_batch(
+    session: Session, trip_ids: list[int]
+) -> dict[int, list[Transfer]]:
+    """Greedy transfers of several trips in at most two statements.
 
-    # Round balances to 0.05
-    balances = {name: round_to_05(bal) for name, bal in balances.items()}
+    Trips with a snapshot return its frozen transfers; the others are
+    settled from one ledger query over all of them.
+    """
+    result: dict[int, list[Transfer]] = {}
+    for trip_id, transfers in session.execute(
+        select(TripSnapshot.trip_id, TripSnapshot.transfers)
+        .where(TripSnapshot.trip_id.in_(trip_ids))
+    ):
+        result[trip_id] = [Transfer(*row) for row in transfers]
+    unsnapshotted = [trip_id for trip_id in trip_ids if trip_id not in result]
+    if unsnapshotted:
+        balances: dict[int, dict[str, int]] = {t: {} for t in unsnapshotted}
+        for trip_id, name, balance in session.execute(
+            select(
+                Participant.trip_id,
+                Participant.name,
+                Participant.paid_rappen - Participant.owed_rappen,
+            )
+            .where(Participant.trip_id.in_(unsnapshotted))
+            .order_by(Participant.trip_id, Participant.id)
+        ):
+            balances[trip_id][name] = round_rappen_to_05(balance)
+        for trip_id, trip_balances in balances.items():
+            result[trip_id] = minimize_transfers(trip_balances) if trip_balances else []
+    return result
+
+
+def _from_snapshot(
+    participants: list, transfers: list, strategy: str
+) -> list[Transfer]:
+    """Return a snapshot's frozen transfers, or re-solve its balances."""
+    if strategy == "greedy":
+        return [Transfer(*row) for row in transfers]
+    balances = _snapshot_balances(participants)
+    return minimize_transfers(balances, strategy) if balances else []
 
-    return _minimize_transfers(balances)
 
+def _snapshot_balances(participants: list) -> dict[str, int]:
+    """Rounded balances from snapshot rows of [name, paid, owed]."""
+    return {
+        name: round_rappen_to_05(paid - owed) for name, paid, owed in participants
+    }
 
-def _minimize_transfers(balances: dict[str, Decimal]) -> list[Transfer]:
-    """Greedy algorithm to minimize number of transfers."""
+
+def _settle_chunk(
+    chunk: list[tuple[int, str, dict[str, int]]], strategy: str
+) -> list[TripSettlement]:
+    """Minimise transfers for a chunk of trips (runs in a worker process)."""
+    return [
+        TripSettlement(trip_id, trip_name, minimize_transfers(balances, strategy))
+        for trip_id, trip_name, balances in chunk
+    ]
+
+
+def minimize_transfers(
+    balances: dict[str, int], strategy: str = "greedy"
+) -> list[Transfer]:
+    """Turn balances into transfers using the given strategy.
+
+    "greedy" pays the largest debts to the largest credits first. "exact"
+    finds the true minimum number of transfers for up to EXACT_MAX_BALANCES
+    non-zero balances. "auto" uses the exact solver for small groups and
+    falls back to greedy above that size or when EXACT_TIME_BUDGET is
+    exceeded.
+
+    Raises:
+        ValueError: If the strategy is unknown, or if it is "exact" and
+            there are more than EXACT_MAX_BALANCES non-zero balances.
+    """
+    if strategy == "greedy":
+        return _minimize_transfers(balances)
+    nonzero = sum(1 for bal in balances.values() if bal)
+    if strategy == "exact":
+        if nonzero > EXACT_MAX_BALANCES:
+            raise ValueError(
+                f"The exact strategy supports at most {EXACT_MAX_BALANCES} "
+                f"non-zero balances, not {nonzero}; use 'auto' or 'greedy'."
+            )
+        return _minimize_transfers_exact(balances)
+    if strategy == "auto":
+        if nonzero > EXACT_MAX_BALANCES:
+            return _minimize_transfers(balances)
+        try:
+            deadline = time.perf_counter() + EXACT_TIME_BUDGET
+            return _minimize_transfers_exact(balances, deadline)
+        except _BudgetExceeded:
+            return _minimize_transfers(balances)
+    raise ValueError(f"Unknown settlement strategy '{strategy}'.")
+
+
+def _minimize_transfers_exact(
+    balances: dict[str, int], deadline: Optional[float] = None
+) -> list[Transfer]:
+    """Exact solver: partition balances into the most zero-sum groups.
+
+    A group of k people always needs k - 1 transfers, so maximising the
+    number of zero-sum groups minimises the total. dp[mask] holds the most
+    zero-sum groups that can be peeled off, in some order, from the subset
+    `mask`; each group is then settled with the greedy algorithm.
+    """
+    names = [name for name, bal in balances.items() if bal]
+    units = [balances[name] for name in names]
+    n = len(names)
+    full = (1 << n) - 1
+
+    sums = [0] * (full + 1)
+    dp = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        if (
+            deadline is not None
+            and not mask & 0xFFF
+            and time.perf_counter() > deadline
+        ):
+            raise _BudgetExceeded
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + units[low.bit_length() - 1]
+        best, rest = 0, mask
+        while rest:
+            bit = rest & -rest
+            best = max(best, dp[mask ^ bit])
+            rest ^= bit
+        dp[mask] = best + (sums[mask] == 0)
+
+    # Walk back from the full set, cutting a group at every zero-sum prefix.
+    groups: list[list[str]] = []
+    group: list[str] = []
+    mask = full
+    while mask:
+        rest = mask
+        while rest:
+            bit = rest & -rest
+            if dp[mask ^ bit] + (sums[mask] == 0) == dp[mask]:
+                break
+            rest ^= bit
+        group.append(names[bit.bit_length() - 1])
+        mask ^= bit
+        if sums[mask] == 0:
+            groups.append(group)
+            group = []
+
+    transfers: list[Transfer] = []
+    for group in groups:
+        transfers.extend(_minimize_transfers({name: balances[name] for name in group}))
+    return transfers
+
+
+def _minimize_transfers(balances: dict[str, int]) -> list[Transfer]:
+    """Greedy algorithm to minimize number of transfers.
+
+    Balances are multiples of 5 Rappen, so every transfer amount is too.
+    """
     debtors = sorted(
         [(name, -bal) for name, bal in balances.items() if bal < 0],
         key=lambda x: x[1],
@@ -83,13 +372,12 @@ def _minimize_transfers(balances: dict[str, Decimal]) -> list[Transfer]:
         creditor_name, credit = creditors[j]
 
         amount = min(debt, credit)
-        amount = round_to_05(amount)
 
         if amount > 0:
             transfers.append(Transfer(
                 from_name=debtor_name,
                 to_name=creditor_name,
-                amount=amount,
+                amount_rappen=amount,
             ))
 
         debtors[i] = (debtor_name, debt - amount)
@@ -0,0 +1,107 @@
+"""Snapshot service -- frozen settlements of closed trips."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.orm import Session
+
+from src.models import EXPENSE_TIERS, Trip, TripSnapshot
+from src.money import round_rappen_to_05
+from src.services.ledger_service import compute_totals
+from src.services.settlement_service import minimize_transfers
+
+
+@dataclass
+class SnapshotMismatch:
+    """A closed trip whose snapshot no longer matches the live data."""
+
+    trip_id: int
+    field: str
+    stored: object
+    actual: object
+
+
+def build_snapshot(session: Session, trip_id: int) -> TripSnapshot:
+    """Compute a snapshot of a trip from its live expenses and splits."""
+    participants = [list(row) for row in compute_totals(session, trip_id)]
+    balances = {
+        name: round_rappen_to_05(paid - owed) for name, paid, owed in participants
+    }
+    transfers = minimize_transfers(balances) if balances else []
+    expense_count, split_count, total = _counts(session, trip_id)
+    return TripSnapshot(
+        trip_id=trip_id,
+        expense_count=expense_count,
+        split_count=split_count,
+        total_rappen=total,
+        participants=participants,
+        transfers=[[t.from_name, t.to_name, t.amount_rappen] for t in transfers],
+    )
+
+
+def get_snapshot(session: Session, trip_id: int) -> Optional[TripSnapshot]:
+    """Return the snapshot of a closed trip, or None."""
+    return session.get(TripSnapshot, trip_id)
+
+
+def backfill_snapshots(session: Session) -> int:
+    """Create snapshots for closed trips that have none. Returns the count."""
+    trip_ids = session.execute(
+        select(Trip.id)
+        .outerjoin(TripSnapshot, TripSnapshot.trip_id == Trip.id)
+        .where(Trip.closed_at.is_not(None), TripSnapshot.trip_id.is_(None))
+        .order_by(Trip.id)
+    ).scalars().all()
+    for trip_id in trip_ids:
+        session.add(build_snapshot(session, trip_id))
+    session.commit()
+    return len(trip_ids)
+
+
+def verify_snapshots(
+    session: Session, trip_id: Optional[int] = None
+) -> list[SnapshotMismatch]:
+    """Recompute snapshots from live data and report differing fields."""
+    stmt = select(TripSnapshot).order_by(TripSnapshot.trip_id)
+    if trip_id is not None:
+        stmt = stmt.where(TripSnapshot.trip_id == trip_id)
+
+    mismatches = []
+    for stored in session.execute(stmt).scalars():
+        actual = build_snapshot(session, stored.trip_id)
+        for field in (
+            "expense_count", "split_count", "total_rappen", "participants", "transfers"
+        ):
+            if getattr(stored, field) != getattr(actual, field):
+                mismatches.append(SnapshotMismatch(
+                    trip_id=stored.trip_id,
+                    field=field,
+                    stored=getattr(stored, field),
+                    actual=getattr(actual, field),
+                ))
+    return mismatches
+
+
+def _counts(session: Session, trip_id: int) -> tuple[int, int, int]:
+    """Return (expense count, split count, total Rappen) in one query.
+
+    A trip's rows are in exactly one tier, so the tiers' counts are added.
+    """
+    columns = []
+    for expense, split in EXPENSE_TIERS:
+        columns += [
+            select(func.count())
+            .where(expense.trip_id == trip_id)
+            .scalar_subquery(),
+            select(func.count())
+            .select_from(split)
+            .join(expense, expense.id == split.expense_id)
+            .where(expense.trip_id == trip_id)
+            .scalar_subquery(),
+            select(cast(func.coalesce(func.sum(expense.amount_rappen), 0), BigInteger))
+            .where(expense.trip_id == trip_id)
+            .scalar_subquery(),
+        ]
+    tiers = session.execute(select(*columns)).one()
+    return sum(tiers[0::3]), sum(tiers[1::3]), sum(tiers[2::3])
@@ -1,12 +1,29 @@
 """Trip service for CRUD operations."""
 
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    BigInteger,
+    Select,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, aliased
 
-from src.models import Trip
+from src.models import ArchivedExpense, Expense, Participant, Trip
+from src.services import settlement_cache
+from src.services.snapshot_service import build_snapshot
+
+PURGE_BATCH_SIZE = 500
 
 
 def create_trip(
@@ -30,25 +47,196 @@ def get_trip(session: Session, trip_id: int) -> Optional[Trip]:
     return session.get(Trip, trip_id)
 
 
+@dataclass
+class TripSummary:
+    """A trip with its participant and expense counts and total spend."""
+
+    id: int
+    name: str
+    description: Optional[str]
+    created_at: datetime
+    closed_at: Optional[datetime]
+    participant_count: int
+    expense_count: int
+    total_rappen: int
+
+    @property
+    def is_open(self) -> bool:
+        """Return True if the trip is still open."""
+        return self.closed_at is None
+
+
+def summarize_trips(
+    session: Session,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+) -> list[TripSummary]:
+    """Return trip summaries, newest first, one page at a time.
+
+    Pages use keyset pagination on (created_at, id): pass the ID of the
+    last trip of a page as `after` to get the next one. Counts and totals
+    are correlated subqueries, so only the trips of the page are
+    aggregated; the total spend is the sum of the participants' ledger.
+
+    Args:
+        session: DB session.
+        status: "open", "closed" or None for all trips.
+        limit: Maximum number of trips; None for all.
+        after: ID of the trip after which the page starts.
+
+    Raises:
+        ValueError: If `after` is not an existing trip.
+    """
+    stmt = _summary_query().order_by(Trip.created_at.desc(), Trip.id.desc())
+    if status == "open":
+        stmt = stmt.where(Trip.closed_at.is_(None))
+    elif status == "closed":
+        stmt = stmt.where(Trip.closed_at.is_not(None))
+    if after is not None:
+        if session.execute(select(Trip.id).where(Trip.id == after)).first() is None:
+            raise ValueError(f"Trip {after} not found.")
+        # Compared in SQL: a timestamp round-tripped through Python may not
+        # compare equal to the stored value (e.g. SQLite text formats).
+        anchor = aliased(Trip)
+        created_at = (
+            select(anchor.created_at).where(anchor.id == after).scalar_subquery()
+        )
+        stmt = stmt.where(or_(
+            Trip.created_at < created_at,
+            and_(Trip.created_at == created_at, Trip.id < after),
+        ))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return [TripSummary(*row) for row in session.execute(stmt)]
+
+
+def get_trip_summary(session: Session, trip_id: int) -> Optional[TripSummary]:
+    """Return the summary of one trip, or None."""
+    row = session.execute(_summary_query().where(Trip.id == trip_id)).one_or_none()
+    return TripSummary(*row) if row else None
+
+
+def bump_revision(session: Session, trip_id: int) -> None:
+    """Increment the trip revision in the caller's transaction.
+
+    Called by every mutation of a trip's participants or expenses so that
+    cached settlements of the previous revision are no longer used.
+    """
+    session.execute(
+        update(Trip).where(Trip.id == trip_id).values(revision=Trip.revision + 1)
+    )
+
+
 def close_trip(session: Session, trip_id: int) -> Trip:
-    """Close a trip. Raises ValueError if already closed."""
+    """Close a trip and freeze its settlement snapshot.
+
+    Raises ValueError if already closed.
+    """
     trip = session.get(Trip, trip_id)
     if not trip:
         raise ValueError(f"Trip {trip_id} not found.")
     if not trip.is_open:
         raise ValueError(f"Trip '{trip.name}' is already closed.")
     trip.closed_at = datetime.now(timezone.utc)
+    session.add(build_snapshot(session, trip_id))
     session.commit()
     session.refresh(trip)
     return trip
 
 
 def delete_trip(session: Session, trip_id: int) -> str:
-    """Delete a trip and all related data. Returns trip name."""
+    """Delete a trip and all related data. Returns trip name.
+
+    Participants, expenses, splits and the snapshot are removed by the
+    database's ON DELETE CASCADE within the single DELETE of the trip.
+    """
     trip = session.get(Trip, trip_id)
     if not trip:
         raise ValueError(f"Trip {trip_id} not found.")
     name = trip.name
     session.delete(trip)
     session.commit()
+    settlement_cache.invalidate(session, trip_id)
     return name
+
+
+@dataclass
+class PurgeResult:
+    """Outcome of a bulk purge of closed trips."""
+
+    trips: int
+    batches: int
+    elapsed: float
+
+
+def purge_trips(
+    session: Session, closed_before: datetime, batch_size: int = PURGE_BATCH_SIZE
+) -> PurgeResult:
+    """Delete all trips closed before a point in time, in batches.
+
+    Each batch selects up to `batch_size` trip IDs and deletes them with one
+    statement (children go with the database cascade), then commits, so no
+    transaction holds its locks for more than one batch.
+    """
+    start = time.perf_counter()
+    trips = batches = 0
+    while True:
+        trip_ids = list(session.scalars(
+            select(Trip.id)
+            .where(Trip.closed_at.is_not(None), Trip.closed_at < closed_before)
+            .order_by(Trip.id)
+            .limit(batch_size)
+        ))
+        if not trip_ids:
+            break
+        session.execute(
+            delete(Trip).where(Trip.id.in_(trip_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        session.commit()
+        settlement_cache.invalidate_trips(session, trip_ids)
+        trips += len(trip_ids)
+        batches += 1
+    return PurgeResult(trips, batches, time.perf_counter() - start)
+
+
+def _summary_query() -> Select:
+    """Select the TripSummary fields of trips in one statement."""
+    participant_count = (
+        select(func.count())
+        .where(Participant.trip_id == Trip.id)
+        .correlate(Trip)
+        .scalar_subquery()
+    )
+    # SUM(bigint) is numeric on PostgreSQL; keep the total an int.
+    total = (
+        select(cast(func.coalesce(func.sum(Participant.paid_rappen), 0), BigInteger))
+        .where(Participant.trip_id == Trip.id)
+        .correlate(Trip)
+        .scalar_subquery()
+    )
+    # Only the tier that holds the trip's expenses is counted.
+    expense_count = case(
+        (
+            Trip.archived_at.is_(None),
+            select(func.count())
+            .where(Expense.trip_id == Trip.id)
+            .correlate(Trip)
+            .scalar_subquery(),
+        ),
+        else_=select(func.count())
+        .where(ArchivedExpense.trip_id == Trip.id)
+        .correlate(Trip)
+        .scalar_subquery(),
+    )
+    return select(
+        Trip.id,
+        Trip.name,
+        Trip.description,
+        Trip.created_at,
+        Trip.closed_at,
+        participant_count,
+        expense_count,
+        total,
+    )
@@ -0,0 +1,132 @@
+"""Vectorized settlement engine for large groups (requires NumPy).
+
+Balances are computed from the raw expenses and splits (of both tiers) with
+`numpy.bincount` over the payer and beneficiary index arrays instead of
+per-row Python arithmetic. The transfer matching reproduces
+`settlement_service._minimize_transfers` exactly, so both engines return
+identical transfers for the same trip.
+"""
+
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import Session
+
+from src.models import EXPENSE_TIERS, Participant
+from src.services.settlement_service import Transfer
+
+_CHUNK_SIZE = 50_000
+
+
+def calculate_settlements_vectorized(
+    session: Session, trip_id: int
+) -> list[Transfer]:
+    """Calculate greedy settlement transfers for a trip with NumPy.
+
+    Raises:
+        RuntimeError: If NumPy is not installed.
+    """
+    np = _import_numpy()
+
+    participants = session.execute(
+        select(Participant.id, Participant.name)
+        .where(Participant.trip_id == trip_id)
+        .order_by(Participant.id)
+    ).all()
+    if not participants:
+        return []
+    ids = np.array([pid for pid, _ in participants], dtype=np.int64)
+    names = [name for _, name in participants]
+
+    paid = _load_columns(
+        np,
+        session,
+        union_all(*(
+            select(expense.paid_by_id, expense.amount_rappen)
+            .where(expense.trip_id == trip_id)
+            for expense, _ in EXPENSE_TIERS
+        )),
+    )
+    owed = _load_columns(
+        np,
+        session,
+        union_all(*(
+            select(split.participant_id, split.share_rappen)
+            .join(expense, expense.id == split.expense_id)
+            .where(expense.trip_id == trip_id)
+            for expense, split in EXPENSE_TIERS
+        )),
+    )
+
+    # Float64 bincount is exact for integer Rappen sums below 2**53.
+    size = len(ids)
+    balances = np.rint(
+        np.bincount(np.searchsorted(ids, paid[0]), weights=paid[1], minlength=size)
+        - np.bincount(np.searchsorted(ids, owed[0]), weights=owed[1], minlength=size)
+    ).astype(np.int64)
+    balances = round_rappen_to_05(np, balances)
+
+    return _match_transfers(np, names, balances)
+
+
+def round_rappen_to_05(np, rappen):
+    """Round integer Rappen to the nearest 5 Rappen, halves away from zero.
+
+    Array equivalent of `money.round_rappen_to_05`.
+    """
+    return np.sign(rappen) * ((np.abs(rappen) * 2 + 5) // 10) * 5
+
+
+def _match_transfers(np, names: list[str], balances) -> list[Transfer]:
+    """Largest debtor pays largest creditor, on integer Rappen.
+
+    Debtors and creditors are ordered once with a stable descending sort,
+    like the `sorted(..., reverse=True)` in the pure Python path, and then
+    walked with two pointers.
+    """
+    debtor_idx = np.flatnonzero(balances < 0)
+    creditor_idx = np.flatnonzero(balances > 0)
+    debtor_idx = debtor_idx[np.argsort(balances[debtor_idx], kind="stable")]
+    creditor_idx = creditor_idx[np.argsort(-balances[creditor_idx], kind="stable")]
+
+    debtors = [[names[i], -int(balances[i])] for i in debtor_idx]
+    creditors = [[names[i], int(balances[i])] for i in creditor_idx]
+
+    transfers: list[Transfer] = []
+    i, j = 0, 0
+    while i < len(debtors) and j < len(creditors):
+        amount = min(debtors[i][1], creditors[j][1])
+        if amount > 0:
+            transfers.append(Transfer(
+                from_name=debtors[i][0],
+                to_name=creditors[j][0],
+                amount_rappen=amount,
+            ))
+        debtors[i][1] -= amount
+        creditors[j][1] -= amount
+        if debtors[i][1] <= 0:
+            i += 1
+        if creditors[j][1] <= 0:
+            j += 1
+
+    return transfers
+
+
+def _load_columns(np, session: Session, stmt):
+    """Read a two-column integer query into a pair of int64 arrays in chunks."""
+    result = session.execute(stmt.execution_options(yield_per=_CHUNK_SIZE))
+    chunks = [np.array(part, dtype=np.int64) for part in result.partitions()]
+    if not chunks:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    data = np.concatenate(chunks)
+    return data[:, 0], data[:, 1]
+
+
+def _import_numpy():
+    """Import NumPy or raise a helpful error."""
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError(
+            "The large-group engine requires NumPy: pip install numpy"
+        ) from None
+    return numpy
@@ -0,0 +1,188 @@
+"""Interactive shell that runs CLI commands in one warm process.
+
+The shell keeps the process-wide engine (and its connection pool) alive
+between commands and caches the active trip and its participant
+name -> ID map (per trip revision), so a command only pays for its own SQL.
+"""
+
+import shlex
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+import click
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+# Commands whose first argument is a trip ID; the shell fills it in from
+# the active trip when it is omitted.
+TRIP_COMMANDS = {
+    ("trip", "show"),
+    ("trip", "close"),
+    ("participant", "add"),
+    ("participant", "list"),
+    ("expense", "add"),
+    ("expense", "import"),
+    ("expense", "list"),
+    ("settle",),
+    ("export",),
+}
+
+# Commands after which the cached trip and participants may be stale.
+_INVALIDATING = {"trip", "participant", "snapshot", "ledger"}
+
+
+@dataclass
+class ShellState:
+    """The active trip of a shell session and its cached participants."""
+
+    trip_id: Optional[int] = None
+    trip_name: Optional[str] = None
+    _participant_ids: Optional[dict[str, int]] = field(default=None, repr=False)
+    _revision: Optional[int] = field(default=None, repr=False)
+
+    def use(self, session: "Session", trip_id: int) -> None:
+        """Make a trip the active one and load its participants.
+
+        Raises:
+            ValueError: If the trip does not exist.
+        """
+        from src.models import Trip
+
+        trip = session.get(Trip, trip_id)
+        if not trip:
+            raise ValueError(f"Trip {trip_id} not found.")
+        self.trip_id = trip.id
+        self.trip_name = trip.name
+        self._participant_ids = None
+        self.participant_ids(session)
+
+    def participant_ids(self, session: "Session") -> dict[str, int]:
+        """Return the active trip's name -> ID map.
+
+        The map is cached per `Trip.revision`, which every participant or
+        expense change bumps, also when made by another process. Checking it
+        loads the trip into `session`, where the command finds it again.
+
+        Raises:
+            ValueError: If the trip no longer exists.
+        """
+        from src.models import Trip
+
+        trip = session.get(Trip, self.trip_id)
+        if not trip:
+            raise ValueError(f"Trip {self.trip_id} not found.")
+        if self._participant_ids is None or trip.revision != self._revision:
+            from sqlalchemy import select
+
+            from src.models import Participant
+
+            rows = session.execute(
+                select(Participant.name, Participant.id)
+                .where(Participant.trip_id == self.trip_id)
+                .order_by(Participant.id)
+            ).all()
+            self._participant_ids = {name: pid for name, pid in rows}
+            self._revision = trip.revision
+        return self._participant_ids
+
+    def invalidate(self) -> None:
+        """Forget the cached participants; they are reloaded on next use."""
+        self._participant_ids = None
+
+    @property
+    def prompt(self) -> str:
+        if self.trip_id is None:
+            return "kostenteiler> "
+        return f"kostenteiler [#{self.trip_id} {self.trip_name}]> "
+
+
+def with_active_trip(args: list[str], trip_id: Optional[int]) -> list[str]:
+    """Insert the active trip ID into a command that omits it.
+
+    `expense add --paid-by Anna ...` becomes `expense add 3 --paid-by Anna
+    ...`; commands that already name a trip (or `settle --all`) are left
+    unchanged.
+    """
+    if trip_id is None:
+        return args
+    for path in TRIP_COMMANDS:
+        if tuple(args[:len(path)]) != path:
+            continue
+        rest = args[len(path):]
+        if "--help" in rest or "--all" in rest:
+            return args
+        if rest and rest[0].isdigit():
+            return args
+        return [*path, str(trip_id), *rest]
+    return args
+
+
+def run_shell(cli: click.Group, trip_id: Optional[int] = None) -> None:
+    """Read commands until EOF or `exit` and run them against `cli`."""
+    from src.db import get_session
+
+    try:
+        import readline  # noqa: F401 -- line editing and history
+    except ImportError:
+        pass
+
+    state = ShellState()
+    if trip_id is not None:
+        with get_session() as session:
+            try:
+                state.use(session, trip_id)
+            except ValueError as e:
+                click.echo(f"Error: {e}")
+
+    click.echo('Kostenteiler shell. "use TRIP_ID" selects a trip, "exit" quits.')
+    while True:
+        try:
+            line = input(state.prompt)
+        except EOFError:
+            click.echo()
+            return
+        except KeyboardInterrupt:
+            click.echo()
+            continue
+
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            click.echo(f"Error: {e}")
+            continue
+        if not args:
+            continue
+        if args[0] in ("exit", "quit"):
+            return
+        if args[0] == "shell":
+            click.echo("Error: Already in the shell.")
+            continue
+        if args[0] == "use":
+            if len(args) != 2 or not args[1].isdigit():
+                click.echo("Usage: use TRIP_ID")
+                continue
+            with get_session() as session:
+                try:
+                    state.use(session, int(args[1]))
+                except ValueError as e:
+                    click.echo(f"Error: {e}")
+            continue
+        if args[0] == "help":
+            args = ["--help"]
+
+        _run(cli, with_active_trip(args, state.trip_id), state)
+        if args[0] in _INVALIDATING:
+            state.invalidate()
+
+
+def _run(cli: click.Group, args: list[str], state: ShellState) -> None:
+    """Run one CLI command in-process, reporting errors instead of exiting."""
+    try:
+        cli.main(args, prog_name="kostenteiler", standalone_mode=False, obj=state)
+    except click.exceptions.Abort:
+        click.echo("Aborted.")
+    except click.ClickException as e:
+        e.show()
+    except SystemExit:
+        pass
@@ -1,7 +1,10 @@
 """Test fixtures with in-memory SQLite database."""
 
+from contextlib import contextmanager
+from typing import Callable, ContextManager
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
 from src.db import Base
@@ -17,3 +20,35 @@ def session() -> Session:
     yield session
     session.close()
     engine.dispose()
+
+
+@pytest.fixture
+def sql_statements(session: Session) -> Callable[..., ContextManager[list]]:
+    """Record the SQL statements the session's engine runs in a block.
+
+        with sql_statements() as statements:
+            service.call(session)
+        assert len(statements) == 1
+
+    With `parameters=True` the list holds (statement, parameters) pairs of
+    single executions (executemany batches are skipped).
+    """
+    engine = session.get_bind()
+
+    @contextmanager
+    def record(parameters: bool = False):
+        statements: list = []
+
+        def listener(conn, cursor, statement, params, context, executemany):
+            if not parameters:
+                statements.append(statement)
+            elif not executemany:
+                statements.append((statement, params))
+
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+    return record
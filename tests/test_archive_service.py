@@ -0,0 +1,150 @@
+"""Tests for archive service."""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from src.models import (
+    ArchivedExpense,
+    ArchivedExpenseSplit,
+    Expense,
+    ExpenseSplit,
+    Trip,
+)
+from src.services import (
+    archive_service,
+    expense_service,
+    export_service,
+    ledger_service,
+    participant_service,
+    report_service,
+    settlement_service,
+    snapshot_service,
+    trip_service,
+)
+from src.services.dump_service import dump_trips, settle_dump
+
+
+def _trip(session: Session, name: str, closed_days_ago: int | None = None) -> int:
+    trip_id = trip_service.create_trip(session, name).id
+    for participant in ("Anna", "Ben", "Clara"):
+        participant_service.add_participant(session, trip_id, participant)
+    expense_service.add_expense(session, trip_id, "Anna", Decimal("90"), "Hotel")
+    expense_service.add_expense(session, trip_id, "Ben", Decimal("31.10"), "Taxi")
+    expense_service.add_expense(
+        session, trip_id, "Clara", Decimal("12"), "Ice", for_names=["Anna", "Ben"]
+    )
+    if closed_days_ago is not None:
+        trip_service.close_trip(session, trip_id)
+        session.execute(
+            update(Trip)
+            .where(Trip.id == trip_id)
+            .values(closed_at=datetime.now(timezone.utc) - timedelta(days=closed_days_ago))
+        )
+        session.commit()
+    return trip_id
+
+
+def _count(session: Session, model) -> int:
+    return session.scalar(select(func.count()).select_from(model))
+
+
+def _reads(session: Session, trip_id: int) -> dict:
+    return {
+        "summary": trip_service.get_trip_summary(session, trip_id),
+        "rows": list(export_service.iter_expense_rows(session, trip_id)),
+        "ndjson": list(export_service.iter_ndjson_records(session, [trip_id])),
+        "totals": ledger_service.compute_totals(session, trip_id),
+        "balances": settlement_service.calculate_balances(session, trip_id),
+        "settlement": settlement_service.calculate_settlements(session, trip_id),
+        "report": report_service.report_to_dict(
+            report_service.trip_report(session, trip_id)
+        ),
+    }
+
+
+def test_archive_moves_old_closed_trips(session: Session) -> None:
+    old = _trip(session, "Old", closed_days_ago=40)
+    recent = _trip(session, "Recent", closed_days_ago=5)
+    _trip(session, "Open")
+
+    result = archive_service.archive_trips(session, older_than_days=30)
+
+    assert (result.trips, result.expenses, result.splits) == (1, 3, 8)
+    assert _count(session, Expense) == 6
+    assert _count(session, ExpenseSplit) == 16
+    assert _count(session, ArchivedExpense) == 3
+    assert _count(session, ArchivedExpenseSplit) == 8
+    assert session.get(Trip, old).archived_at is not None
+    assert session.get(Trip, recent).archived_at is None
+    assert archive_service.archive_trips(session, older_than_days=30).trips == 0
+
+
+def test_archived_trip_reads_are_unchanged(session: Session, tmp_path) -> None:
+    trip_id = _trip(session, "Old", closed_days_ago=40)
+    before = _reads(session, trip_id)
+
+    archive_service.archive_trips(session, older_than_days=30, batch_size=1)
+    session.expunge_all()
+
+    assert _reads(session, trip_id) == before
+    assert ledger_service.verify_ledger(session, trip_id) == []
+    assert snapshot_service.verify_snapshots(session, trip_id) == []
+
+    dump_trips(session, [trip_id], str(tmp_path / "trip.ktd"))
+    (settled,) = settle_dump(str(tmp_path / "trip.ktd"))
+    assert settled.transfers == before["settlement"]
+
+
+def test_archive_backfills_missing_snapshots(session: Session) -> None:
+    from src.models import TripSnapshot
+
+    trip_id = _trip(session, "Old", closed_days_ago=40)
+    session.delete(session.get(TripSnapshot, trip_id))
+    session.commit()
+
+    archive_service.archive_trips(session, older_than_days=30)
+
+    assert snapshot_service.get_snapshot(session, trip_id).expense_count == 3
+    assert snapshot_service.verify_snapshots(session, trip_id) == []
+
+
+def test_archived_trip_rejects_writes(session: Session) -> None:
+    trip_id = _trip(session, "Old", closed_days_ago=40)
+    expense_id = expense_service.list_expenses(session, trip_id)[0].id
+    archive_service.archive_trips(session, older_than_days=30)
+
+    with pytest.raises(ValueError, match="closed"):
+        expense_service.add_expense(session, trip_id, "Anna", Decimal("5"), "Late")
+    with pytest.raises(ValueError, match="not found"):
+        expense_service.delete_expense(session, expense_id)
+
+
+def test_archived_ids_are_not_reused(session: Session) -> None:
+    trip_id = _trip(session, "Old", closed_days_ago=40)
+    archive_service.archive_trips(session, older_than_days=30)
+
+    new_trip = _trip(session, "New")
+    archived = session.scalars(
+        select(ArchivedExpense.id).where(ArchivedExpense.trip_id == trip_id)
+    ).all()
+    hot = [e.id for e in expense_service.list_expenses(session, new_trip)]
+    assert min(hot) > max(archived)
+
+
+def test_delete_archived_trip_cascades(session: Session) -> None:
+    trip_id = _trip(session, "Old", closed_days_ago=40)
+    archive_service.archive_trips(session, older_than_days=30)
+
+    trip_service.delete_trip(session, trip_id)
+
+    assert _count(session, ArchivedExpense) == 0
+    assert _count(session, ArchivedExpenseSplit) == 0
+
+
+def test_archive_rejects_negative_age(session: Session) -> None:
+    with pytest.raises(ValueError, match="negative"):
+        archive_service.archive_trips(session, older_than_days=-1)
@@ -0,0 +1,27 @@
+"""Smoke tests for the benchmark suite, so it does not rot."""
+
+from sqlalchemy import create_engine
+
+from benchmarks.bench_suite import run_suite
+from benchmarks.generator import TripSize, expense_records
+from src.db import Base
+
+TINY = TripSize("tiny", 4, 20, 0.5)
+
+
+def test_generator_is_deterministic() -> None:
+    assert list(expense_records(TINY, seed=1)) == list(expense_records(TINY, seed=1))
+    assert list(expense_records(TINY, seed=1)) != list(expense_records(TINY, seed=2))
+    _, record = next(expense_records(TINY))
+    assert len(record["for"]) == 2
+
+
+def test_run_suite_measures_every_operation(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    Base.metadata.create_all(engine)
+    results = run_suite(engine, "sqlite", TINY, repeats=2)
+    assert [r.operation for r in results] == ["settle", "export", "list", "add", "delete"]
+    assert all(r.statements > 0 and r.median_ms > 0 for r in results)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM trips").scalar() == 0
+    engine.dispose()
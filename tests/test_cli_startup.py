@@ -0,0 +1,62 @@
+"""Startup budget of the CLI, measured with `python -X importtime`."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from src.db import Base
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Generous cumulative import budgets in microseconds; eager imports of
+# SQLAlchemy and every service took about 400 ms for `--help` alone.
+HELP_BUDGET_US = 200_000
+READ_BUDGET_US = 1_500_000
+
+
+def _import_times(args: list[str], tmp_path: Path) -> dict[str, int]:
+    """Run the CLI with -X importtime; return cumulative µs per module."""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'cli.db'}")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "src", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_help_does_not_import_sqlalchemy(tmp_path):
+    times = _import_times(["--help"], tmp_path)
+    assert "sqlalchemy" not in times
+    assert not any(name.startswith("src.services") for name in times)
+    assert times["src.cli"] < HELP_BUDGET_US
+
+
+def test_read_command_imports_only_its_service(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cli.db'}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    times = _import_times(["trip", "list"], tmp_path)
+    assert "src.services.trip_service" in times
+    for heavy in (
+        "numpy",
+        "src.services.export_service",
+        "src.services.import_service",
+        "src.services.vector_settlement",
+        "concurrent.futures.process",
+    ):
+        assert heavy not in times
+    assert times["src.services.trip_service"] < READ_BUDGET_US
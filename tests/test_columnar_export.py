@@ -0,0 +1,66 @@
+"""Tests for the Parquet/Arrow dataset export."""
+
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.services import trip_service, participant_service, expense_service
+
+pytest.importorskip("pyarrow")
+
+import pyarrow.dataset as ds  # noqa: E402
+
+from src.services.columnar_export import export_columnar  # noqa: E402
+
+
+def _trip(session: Session, name: str, expenses: int) -> int:
+    trip = trip_service.create_trip(session, name)
+    for n in ["Anna", "Ben", "Clara"]:
+        participant_service.add_participant(session, trip.id, n)
+    for i in range(expenses):
+        expense_service.add_expense(
+            session, trip.id, "Anna", Decimal("10.10"), f"E{i}", ["Ben", "Clara"]
+        )
+    return trip.id
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_export_normalized_tables(session: Session, tmp_path: Path, fmt: str) -> None:
+    trip_id = _trip(session, "Bern", 3)
+    summary = export_columnar(session, str(tmp_path), fmt, trip_ids=[trip_id], chunk_size=2)
+
+    assert summary.rows == {"expenses": 3, "splits": 6, "transfers": 2}
+    assert (tmp_path / "expenses" / f"trip_id={trip_id}").is_dir()
+    fmt = "parquet" if fmt == "parquet" else "ipc"
+    expenses = ds.dataset(tmp_path / "expenses", format=fmt, partitioning="hive").to_table()
+    assert expenses.column("amount_rappen").to_pylist() == [1010] * 3
+    assert str(expenses.schema.field("created_at").type) == "timestamp[us, tz=UTC]"
+    splits = ds.dataset(tmp_path / "splits", format=fmt, partitioning="hive").to_table()
+    assert sorted(set(splits.column("participant").to_pylist())) == ["Ben", "Clara"]
+    assert sum(splits.column("share_rappen").to_pylist()) == 3030
+    transfers = ds.dataset(tmp_path / "transfers", format=fmt, partitioning="hive").to_table()
+    assert transfers.column("to_name").to_pylist() == ["Anna", "Anna"]
+
+
+def test_export_closed_trips_partitioned(session: Session, tmp_path: Path) -> None:
+    ids = [_trip(session, f"T{i}", i) for i in range(4)]
+    for trip_id in ids[1:]:
+        trip_service.close_trip(session, trip_id)
+
+    summary = export_columnar(session, str(tmp_path))
+
+    assert summary.trips == 3
+    assert summary.rows["expenses"] == 1 + 2 + 3
+    partitions = sorted(p.name for p in (tmp_path / "expenses").iterdir())
+    assert partitions == [f"trip_id={t}" for t in ids[1:]]
+    table = ds.dataset(tmp_path / "transfers", partitioning="hive").to_table()
+    assert set(table.column("trip_id").to_pylist()) == set(ids[1:])
+
+
+def test_export_errors(session: Session, tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Unknown format"):
+        export_columnar(session, str(tmp_path), "csv")
+    with pytest.raises(ValueError, match="Trip 99 not found"):
+        export_columnar(session, str(tmp_path), trip_ids=[99])
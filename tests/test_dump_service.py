@@ -0,0 +1,132 @@
+"""Tests for binary trip dumps, restore and offline settlement."""
+
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.models import Expense, ExpenseSplit, TripSnapshot
+from src.services import trip_service, participant_service, expense_service
+from src.services.dump_service import TripDump, dump_trips, restore_dump, settle_dump
+from src.services.export_service import iter_expense_rows
+from src.services.settlement_service import calculate_settlements
+
+
+def _trip(session: Session, name: str) -> int:
+    trip = trip_service.create_trip(session, name, "Ferien ☀")
+    for n in ["Anna", "Ben", "Clara"]:
+        participant_service.add_participant(session, trip.id, n)
+    expense_service.add_expense(session, trip.id, "Anna", Decimal("90"), "Dinner")
+    expense_service.add_expense(
+        session, trip.id, "Ben", Decimal("30.05"), "Taxi", ["Ben", "Clara"]
+    )
+    expense_service.add_expense(session, trip.id, "Clara", Decimal("12"), "Dinner")
+    return trip.id
+
+
+def _rows(session: Session, trip_id: int) -> list[tuple]:
+    return [
+        (r.description, r.amount_rappen, r.paid_by, r.split_among, r.shares)
+        for r in iter_expense_rows(session, trip_id)
+    ]
+
+
+def test_dump_restore_round_trip(
+    session: Session, tmp_path: Path, sql_statements
+) -> None:
+    first, second = _trip(session, "Bern"), _trip(session, "Chur")
+    trip_service.close_trip(session, second)
+    path = str(tmp_path / "trips.ktdump")
+
+    summary = dump_trips(session, [first, second], path)
+    assert (summary.trips, summary.participants, summary.expenses, summary.splits) == (2, 6, 6, 16)
+    assert summary.size == Path(path).stat().st_size
+
+    with TripDump(path) as dump:
+        # "Dinner", "Anna", ... are stored once.
+        assert sorted(
+            dump.string(i) for i in range(dump.rows("strings"))
+        ) == sorted({"Bern", "Chur", "Ferien ☀", "Anna", "Ben", "Clara", "Dinner", "Taxi"})
+
+    with sql_statements() as statements:
+        trip_map = restore_dump(session, path)
+    # Splits need no RETURNING and go out as one multi-row INSERT.
+    assert sum(s.startswith("INSERT INTO expense_splits") for s in statements) == 1
+
+    assert set(trip_map) == {first, second}
+    for old, new in trip_map.items():
+        assert new not in (first, second)
+        assert _rows(session, new) == _rows(session, old)
+        assert calculate_settlements(session, new) == calculate_settlements(session, old)
+    restored = trip_service.get_trip(session, trip_map[second])
+    assert restored.description == "Ferien ☀"
+    assert restored.closed_at is not None
+    assert session.get(TripSnapshot, trip_map[second]) is not None
+    assert session.scalar(select(func.count()).select_from(Expense)) == 12
+    assert session.scalar(select(func.count()).select_from(ExpenseSplit)) == 32
+
+
+def test_settle_from_dump_matches_database(session: Session, tmp_path: Path) -> None:
+    first, second = _trip(session, "Bern"), _trip(session, "Chur")
+    expense_service.add_expense(session, second, "Ben", Decimal("7.33"), "Coffee", ["Anna"])
+    path = str(tmp_path / "trips.ktdump")
+    dump_trips(session, [first, second], path)
+
+    results = {r.trip_id: r for r in settle_dump(path)}
+    assert results[second].trip_name == "Chur"
+    for trip_id in (first, second):
+        assert results[trip_id].transfers == calculate_settlements(session, trip_id)
+    exact = list(settle_dump(path, second, "exact"))
+    assert [r.trip_id for r in exact] == [second]
+    assert exact[0].transfers == calculate_settlements(session, second, "exact")
+
+
+def test_dump_errors(session: Session, tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Trip 99 not found"):
+        dump_trips(session, [99], str(tmp_path / "x.ktdump"))
+    bogus = tmp_path / "bogus.ktdump"
+    bogus.write_bytes(b"not a dump at all")
+    with pytest.raises(ValueError, match="not a kostenteiler dump"):
+        list(settle_dump(str(bogus)))
+    empty = tmp_path / "empty.ktdump"
+    empty.write_bytes(b"")
+    with pytest.raises(ValueError, match="not a kostenteiler dump"):
+        restore_dump(session, str(empty))
+    trip_id = _trip(session, "Bern")
+    path = str(tmp_path / "one.ktdump")
+    dump_trips(session, [trip_id], path)
+    with pytest.raises(ValueError, match="Trip 5 not in dump"):
+        list(settle_dump(path, 5))
+
+
+@pytest.mark.parametrize("keep", [8, 20, 100, 0.5, -1])
+def test_truncated_dump_is_rejected(
+    session: Session, tmp_path: Path, keep: float
+) -> None:
+    path = tmp_path / "full.ktdump"
+    dump_trips(session, [_trip(session, "Bern")], str(path))
+    data = path.read_bytes()
+    cut = tmp_path / "cut.ktdump"
+    cut.write_bytes(data[:int(len(data) * keep) if isinstance(keep, float) else keep])
+
+    with pytest.raises(ValueError, match="Truncated|not a kostenteiler dump"):
+        list(settle_dump(str(cut)))
+    with pytest.raises(ValueError, match="Truncated|not a kostenteiler dump"):
+        restore_dump(session, str(cut))
+
+
+def test_dump_with_broken_references_is_rejected(
+    session: Session, tmp_path: Path
+) -> None:
+    path = tmp_path / "full.ktdump"
+    dump_trips(session, [_trip(session, "Bern")], str(path))
+    with TripDump(str(path)) as dump:
+        offset, _ = dump._sections["splits"]
+    data = bytearray(path.read_bytes())
+    data[offset:offset + 8] = (10**9).to_bytes(8, "little")  # first split's expense_id
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="splits.expense_id references missing"):
+        list(settle_dump(str(path)))
@@ -6,6 +6,7 @@ import pytest
 from sqlalchemy.orm import Session
 
 from src.services import trip_service, participant_service, expense_service
+from src.services import ledger_service
 
 
 def _setup_trip(session: Session) -> tuple[int, list[str]]:
@@ -60,6 +61,53 @@ def test_edit_expense(session: Session) -> None:
     assert updated.splits[0].share_amount == Decimal("40")
 
 
+def test_edit_expenses_by_filter_resplits(session: Session) -> None:
+    trip_id, _ = _setup_trip(session)
+    for i in range(4):
+        payer = "Anna" if i % 2 else "Ben"
+        expense_service.add_expense(session, trip_id, payer, Decimal("30"), f"Taxi {i}")
+    expense_service.add_expense(session, trip_id, "Ben", Decimal("30"), "Dinner")
+
+    count = expense_service.edit_expenses(
+        session,
+        trip_id=trip_id,
+        paid_by_name="Ben",
+        description_like="taxi%",
+        amount=Decimal("10"),
+        split_among=["Ben", "Clara"],
+    )
+
+    assert count == 2
+    edited = [
+        e for e in expense_service.list_expenses(session, trip_id)
+        if e.paid_by_participant.name == "Ben" and e.description.startswith("Taxi")
+    ]
+    assert [e.amount for e in edited] == [Decimal("10"), Decimal("10")]
+    assert {s.participant.name for e in edited for s in e.splits} == {"Ben", "Clara"}
+    assert all(s.share_amount == Decimal("5") for e in edited for s in e.splits)
+    assert ledger_service.verify_ledger(session, trip_id) == []
+
+
+def test_edit_expenses_statement_count_is_constant(
+    session: Session, sql_statements
+) -> None:
+    trip_id, _ = _setup_trip(session)
+    ids = [
+        expense_service.add_expense(session, trip_id, "Anna", Decimal("9"), f"E{i}").id
+        for i in range(20)
+    ]
+    with sql_statements() as statements:
+        expense_service.edit_expenses(
+            session, ids, amount=Decimal("12"), description="Fixed", split_among=[]
+        )
+    assert len(statements) <= 8
+    assert ledger_service.verify_ledger(session, trip_id) == []
+    with pytest.raises(ValueError, match="Expense 999 not found"):
+        expense_service.edit_expenses(session, [ids[0], 999], description="x")
+    with pytest.raises(ValueError, match="Nothing to change"):
+        expense_service.edit_expenses(session, ids)
+
+
 def test_delete_expense(session: Session) -> None:
     trip_id, _ = _setup_trip(session)
     exp = expense_service.add_expense(
@@ -77,3 +125,16 @@ def test_expense_on_closed_trip(session: Session) -> None:
         expense_service.add_expense(
             session, trip_id, "Anna", Decimal("50"), "Nope"
         )
+
+
+def test_oversized_amount_is_rejected(session: Session) -> None:
+    trip_id, _ = _setup_trip(session)
+    exp = expense_service.add_expense(session, trip_id, "Anna", Decimal("9"), "Ice")
+    with pytest.raises(ValueError, match="exceeds the maximum"):
+        expense_service.add_expense(session, trip_id, "Anna", Decimal("1e30"), "Huge")
+    with pytest.raises(ValueError, match="exceeds the maximum"):
+        expense_service.edit_expenses(session, [exp.id], amount=Decimal("1e30"))
+    assert [e.amount for e in expense_service.list_expenses(session, trip_id)] == [
+        Decimal("9")
+    ]
+    assert ledger_service.verify_ledger(session, trip_id) == []
@@ -5,10 +5,17 @@ import tempfile
 from decimal import Decimal
 from pathlib import Path
 
+import pytest
 from sqlalchemy.orm import Session
 
 from src.services import trip_service, participant_service, expense_service
-from src.services.export_service import export_trip_csv
+from src.services.export_service import (
+    export_trip_csv,
+    export_trips,
+    iter_ndjson_records,
+    trip_file_name,
+    write_ndjson,
+)
 
 
 def test_export_csv(session: Session) -> None:
@@ -41,3 +48,122 @@ def test_export_csv(session: Session) -> None:
     assert len(rows) >= 5  # headers + 2 expenses + blank + settlement header + transfers
 
     Path(result).unlink()
+
+
+def test_export_streams_in_one_query(
+    session: Session, tmp_path: Path, sql_statements
+) -> None:
+    """Expense rows are read in one query and written gzip-compressed."""
+    import gzip
+
+    trip = trip_service.create_trip(session, "Trip")
+    for n in ["Anna", "Ben", "Clara"]:
+        participant_service.add_participant(session, trip.id, n)
+    for i in range(30):
+        expense_service.add_expense(
+            session, trip.id, "Anna", Decimal("10"), f"Coffee {i}", ["Ben", "Clara"]
+        )
+
+    trip_id = trip.id
+    with sql_statements() as statements:
+        result = export_trip_csv(session, trip_id, str(tmp_path / "trip.csv.gz"))
+
+    assert len(statements) == 3  # expense rows, trip revision, balances
+    with gzip.open(result, "rt", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[2][1:5] == ["Coffee 0", "10.00", "Anna", "Ben, Clara"]
+    assert len(rows) == 2 + 30 + 1 + 2 + 2
+
+
+def test_export_all_closed_trips(
+    session: Session, tmp_path: Path, sql_statements
+) -> None:
+    """Closed trips are exported in batched queries to a directory or zip."""
+    import zipfile
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import delete
+
+    from src.models import TripSnapshot
+
+    trip_ids = []
+    for i in range(5):
+        trip = trip_service.create_trip(session, f"Trip {i}")
+        for n in ["Anna", "Ben"]:
+            participant_service.add_participant(session, trip.id, n)
+        for j in range(i):
+            expense_service.add_expense(session, trip.id, "Anna", Decimal("10"), f"E{j}")
+        trip_ids.append(trip.id)
+    for trip_id in trip_ids[:4]:
+        trip_service.close_trip(session, trip_id)
+    # A closed trip without a snapshot is settled from the ledger.
+    session.execute(delete(TripSnapshot).where(TripSnapshot.trip_id == trip_ids[3]))
+    session.commit()
+
+    with sql_statements() as statements:
+        summary = export_trips(session, str(tmp_path / "out"), batch_size=2, max_workers=2)
+
+    # 0+1+2+3 expenses plus one transfer for each trip with expenses.
+    assert (summary.trips, summary.rows) == (4, 6 + 3)
+    # Trip list, then per batch of two: expense rows, snapshots, [balances].
+    assert len(statements) == 1 + 2 + 3
+    files = sorted(p.name for p in (tmp_path / "out").iterdir())
+    assert files == [trip_file_name(t, f"Trip {i}") for i, t in enumerate(trip_ids[:4])]
+    with open(tmp_path / "out" / files[3], newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[-1] == ["Ben", "Anna", "15.00"]
+
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    assert export_trips(session, str(tmp_path / "none"), closed_since=future).trips == 0
+
+    summary = export_trips(session, str(tmp_path / "trips.zip"))
+    with zipfile.ZipFile(summary.path) as zf:
+        assert sorted(zf.namelist()) == files
+        assert zf.read(files[2]).decode().count("E1") == 1
+
+
+def test_ndjson_records_stream(session: Session) -> None:
+    """Expense, split and transfer records are produced lazily, one per line."""
+    import io
+    import json
+
+    trip = trip_service.create_trip(session, "Trip")
+    for n in ["Anna", "Ben", "Clara"]:
+        participant_service.add_participant(session, trip.id, n)
+    expense_service.add_expense(session, trip.id, "Anna", Decimal("90"), "Dinner")
+    expense_service.add_expense(
+        session, trip.id, "Ben", Decimal("30"), "Taxi", ["Ben", "Clara"]
+    )
+
+    records = iter_ndjson_records(session, [trip.id])
+    first = next(records)
+    assert first.pop("created_at")
+    assert first == {
+        "type": "expense", "trip_id": trip.id, "id": 1, "description": "Dinner",
+        "amount": "90.00", "paid_by": "Anna",
+    }
+
+    out = io.StringIO()
+    assert write_ndjson(records, out, flush_every=2) == 3 + 1 + 2 + 2
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["type"] for r in lines] == ["split"] * 3 + ["expense"] + ["split"] * 2 + ["transfer"] * 2
+    assert lines[4] == {
+        "type": "split", "trip_id": trip.id, "expense_id": 2, "participant": "Ben", "share": "15.00",
+    }
+    assert {(r["from"], r["to"], r["amount"]) for r in lines[-2:]} == {
+        ("Ben", "Anna", "15.00"), ("Clara", "Anna", "45.00"),
+    }
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["1", "-o", "-"], ["--all"], ["1", "--format", "ndjson"]],
+)
+def test_export_rejects_gzip_where_it_cannot_apply(args: list[str]) -> None:
+    from click.testing import CliRunner
+
+    from src.cli import cli
+
+    result = CliRunner().invoke(cli, ["export", *args, "--gzip"])
+    assert result.exit_code == 2
+    assert "--gzip only applies to a single-trip CSV file" in result.output
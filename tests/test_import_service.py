@@ -0,0 +1,140 @@
+"""Tests for bulk import service."""
+
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.services import trip_service, participant_service, expense_service
+from src.services import import_service, ledger_service
+from src.services.settlement_service import calculate_settlements
+
+
+def _setup_trip(session: Session) -> int:
+    """Create a trip with 3 participants."""
+    trip = trip_service.create_trip(session, "Trip")
+    for n in ["Anna", "Ben", "Clara"]:
+        participant_service.add_participant(session, trip.id, n)
+    return trip.id
+
+
+def test_import_csv(session: Session, tmp_path: Path) -> None:
+    trip_id = _setup_trip(session)
+    path = tmp_path / "expenses.csv"
+    path.write_text(
+        "paid_by,amount,description,for,date\n"
+        "Anna,90,Dinner,,2026-05-01T19:00:00\n"
+        'Ben,30,Taxi,"Ben,Clara",2026-05-02\n'
+        "Nobody,10,Ghost,,\n"
+        "Anna,abc,Broken,,\n"
+    )
+
+    result = import_service.import_expenses(
+        session, trip_id, import_service.read_rows(str(path)), batch_size=1
+    )
+
+    assert result.imported == 2
+    assert [r.line for r in result.rejected] == [4, 5]
+    expenses = expense_service.list_expenses(session, trip_id)
+    assert [e.description for e in expenses] == ["Dinner", "Taxi"]
+    assert [s.share_amount for s in expenses[1].splits] == [Decimal("15")] * 2
+    assert ledger_service.verify_ledger(session, trip_id) == []
+    assert sum(t.amount for t in calculate_settlements(session, trip_id)) == Decimal("60")
+
+
+def test_import_jsonl(session: Session, tmp_path: Path) -> None:
+    trip_id = _setup_trip(session)
+    path = tmp_path / "expenses.jsonl"
+    path.write_text(
+        '{"paid_by": "Clara", "amount": "12.50", "description": "Coffee", "for": ["Anna"]}\n'
+        "not json\n"
+        '{"paid_by": "Clara", "amount": 1.234, "description": "Too precise"}\n'
+        "\n"
+        '{"paid_by": "Anna", "amount": 20, "description": "Lunch", "for": "all"}\n'
+    )
+
+    result = import_service.import_expenses(
+        session, trip_id, import_service.read_rows(str(path))
+    )
+
+    assert result.imported == 2
+    assert [r.line for r in result.rejected] == [2, 3]
+    assert len(expense_service.list_expenses(session, trip_id)) == 2
+    assert ledger_service.verify_ledger(session, trip_id) == []
+
+
+def test_import_closed_trip(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    trip_service.close_trip(session, trip_id)
+    with pytest.raises(ValueError, match="closed"):
+        import_service.import_expenses(session, trip_id, [])
+
+
+@pytest.mark.parametrize(
+    "record, error",
+    [
+        ({"paid_by": 5, "amount": "10", "description": "Id"}, "'paid_by' must be a string"),
+        ({"paid_by": "Anna", "amount": "10", "description": ["x"]}, "'description' must be"),
+        ({"paid_by": "Anna", "amount": "1e30", "description": "Huge"}, "exceeds the maximum"),
+        (
+            {"paid_by": "Anna", "amount": "99999999999999999999", "description": "Big"},
+            "exceeds the maximum",
+        ),
+        ({"paid_by": "Anna", "amount": True, "description": "Bool"}, "must be a string or"),
+        ({"paid_by": "Anna", "amount": "5", "description": "X", "for": [1]}, "'for' must be"),
+        ({"paid_by": "Anna", "amount": "5", "description": "X", "date": 1}, "'date' must be"),
+    ],
+)
+def test_import_rejects_bad_field_types_and_amounts(
+    session: Session, record: dict, error: str
+) -> None:
+    trip_id = _setup_trip(session)
+    rows = [
+        (1, record),
+        (2, {"paid_by": "Anna", "amount": "30", "description": "Lunch"}),
+    ]
+
+    result = import_service.import_expenses(session, trip_id, rows)
+
+    assert result.imported == 1
+    assert [r.line for r in result.rejected] == [1]
+    assert error in result.rejected[0].error
+
+
+@pytest.mark.parametrize(
+    "name, content, errors",
+    [
+        (
+            "expenses.csv",
+            b"paid_by,amount,description\n"
+            b"Anna,30,Lunch\n"
+            b"Ben,5,Caf\xe9\n"
+            b'Clara,5,"' + b"x" * 200_000 + b'"\n'
+            b"Clara,12,Museum\n",
+            {3: "Line is not valid UTF-8.", 4: "Invalid CSV: field larger than"},
+        ),
+        (
+            "expenses.jsonl",
+            b'{"paid_by": "Anna", "amount": 30, "description": "Lunch"}\n'
+            b'{"paid_by": "Ben", "amount": 5, "description": "Caf\xe9"}\n'
+            b'{"paid_by": "Clara", "amount": 12, "description": "Museum"}\n',
+            {2: "Line is not valid UTF-8."},
+        ),
+    ],
+)
+def test_import_rejects_unreadable_lines(
+    session: Session, tmp_path: Path, name: str, content: bytes, errors: dict
+) -> None:
+    trip_id = _setup_trip(session)
+    path = tmp_path / name
+    path.write_bytes(content)
+
+    result = import_service.import_expenses(
+        session, trip_id, import_service.read_rows(str(path)), batch_size=1
+    )
+
+    assert result.imported == 2
+    assert {r.line: r.error[: len(errors[r.line])] for r in result.rejected} == errors
+    expenses = expense_service.list_expenses(session, trip_id)
+    assert [e.description for e in expenses] == ["Lunch", "Museum"]
@@ -0,0 +1,70 @@
+"""Tests for ledger service."""
+
+from decimal import Decimal
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from src.models import Participant
+from src.services import trip_service, participant_service, expense_service
+from src.services import ledger_service
+
+
+def _setup_trip(session: Session) -> int:
+    """Create a trip with 3 participants."""
+    trip = trip_service.create_trip(session, "Trip")
+    for n in ["Anna", "Ben", "Clara"]:
+        participant_service.add_participant(session, trip.id, n)
+    return trip.id
+
+
+def _ledger(session: Session, trip_id: int) -> dict[str, tuple[Decimal, Decimal]]:
+    return {
+        p.name: (p.total_paid, p.total_owed)
+        for p in participant_service.list_participants(session, trip_id)
+    }
+
+
+def test_add_expense_updates_ledger(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    expense_service.add_expense(session, trip_id, "Anna", Decimal("90"), "Dinner")
+    assert _ledger(session, trip_id) == {
+        "Anna": (Decimal("90"), Decimal("30")),
+        "Ben": (Decimal("0"), Decimal("30")),
+        "Clara": (Decimal("0"), Decimal("30")),
+    }
+
+
+def test_edit_and_delete_update_ledger(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    exp = expense_service.add_expense(
+        session, trip_id, "Ben", Decimal("30"), "Taxi", ["Ben", "Clara"]
+    )
+    expense_service.edit_expense(session, exp.id, amount=Decimal("50"))
+    assert _ledger(session, trip_id)["Ben"] == (Decimal("50"), Decimal("25"))
+    assert _ledger(session, trip_id)["Clara"] == (Decimal("0"), Decimal("25"))
+
+    expense_service.delete_expense(session, exp.id)
+    assert all(
+        totals == (Decimal("0"), Decimal("0"))
+        for totals in _ledger(session, trip_id).values()
+    )
+    assert ledger_service.verify_ledger(session, trip_id) == []
+
+
+def test_verify_and_rebuild(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    expense_service.add_expense(session, trip_id, "Anna", Decimal("90"), "Dinner")
+    session.execute(
+        update(Participant)
+        .where(Participant.name == "Ben")
+        .values(owed_rappen=9900)
+    )
+    session.commit()
+
+    drifts = ledger_service.verify_ledger(session, trip_id)
+    assert [d.name for d in drifts] == ["Ben"]
+    assert drifts[0].actual_owed == 3000
+
+    assert ledger_service.rebuild_ledger(session, trip_id) == 3
+    assert ledger_service.verify_ledger(session) == []
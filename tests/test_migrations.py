@@ -0,0 +1,71 @@
+"""Tests for the Alembic migrations on SQLite."""
+
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+ROOT = Path(__file__).resolve().parents[1]
+TABLES = ("trips", "participants", "expenses", "expense_splits")
+
+
+def _counts(url: str) -> dict[str, int]:
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        counts = {
+            table: conn.scalar(text(f"SELECT count(*) FROM {table}"))
+            for table in TABLES
+        }
+    engine.dispose()
+    return counts
+
+
+@pytest.fixture
+def alembic_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Config:
+    """An Alembic config for a fresh SQLite file, without its logging setup."""
+    url = f"sqlite:///{tmp_path / 'kostenteiler.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    config = Config()
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def test_upgrade_and_downgrade_keep_rows(alembic_config: Config) -> None:
+    url = alembic_config.get_main_option("sqlalchemy.url")
+    command.upgrade(alembic_config, "3f9c2d7e1b54")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO trips (id, name, created_at) VALUES (1, 'Trip', '2026-07-01')"
+        ))
+        conn.execute(text(
+            "INSERT INTO participants (id, trip_id, name, total_paid, total_owed) "
+            "VALUES (1, 1, 'Anna', 12.50, 6.25), (2, 1, 'Ben', 0, 6.25)"
+        ))
+        conn.execute(text(
+            "INSERT INTO expenses (id, trip_id, paid_by_id, description, amount, "
+            "created_at) VALUES (1, 1, 1, 'Ice', 12.50, '2026-07-01')"
+        ))
+        conn.execute(text(
+            "INSERT INTO expense_splits (id, expense_id, participant_id, share_amount) "
+            "VALUES (1, 1, 1, 6.25), (2, 1, 2, 6.25)"
+        ))
+    engine.dispose()
+    seeded = _counts(url)
+    assert seeded == {"trips": 1, "participants": 2, "expenses": 1, "expense_splits": 2}
+
+    command.upgrade(alembic_config, "head")
+    assert _counts(url) == seeded
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert conn.scalar(text("SELECT amount_rappen FROM expenses")) == 1250
+        assert conn.scalars(
+            text("SELECT share_rappen FROM expense_splits ORDER BY id")
+        ).all() == [625, 625]
+    engine.dispose()
+
+    command.downgrade(alembic_config, "3f9c2d7e1b54")
+    assert _counts(url) == seeded
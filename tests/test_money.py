@@ -0,0 +1,47 @@
+"""Tests for money helpers."""
+
+from decimal import Decimal
+
+import pytest
+
+from src.money import (
+    MAX_AMOUNT,
+    format_chf,
+    from_rappen,
+    round_rappen_to_05,
+    split_rappen,
+    to_rappen,
+)
+from src.services.expense_service import round_to_05
+
+
+def test_to_and_from_rappen() -> None:
+    assert to_rappen(Decimal("120")) == 12000
+    assert to_rappen("33.335") == 3334
+    assert to_rappen(7) == 700
+    assert from_rappen(3335) == Decimal("33.35")
+    with pytest.raises(ValueError, match="not a valid amount"):
+        to_rappen("abc")
+
+
+@pytest.mark.parametrize("amount", ["1e30", "-1000000000.01", Decimal("1E+10")])
+def test_to_rappen_rejects_oversized_amounts(amount) -> None:
+    with pytest.raises(ValueError, match="exceeds the maximum of 1000000000 CHF"):
+        to_rappen(amount)
+    assert to_rappen(MAX_AMOUNT) == 100_000_000_000
+
+
+def test_format_chf() -> None:
+    assert format_chf(3335) == "33.35"
+    assert format_chf(5) == "0.05"
+    assert format_chf(-120) == "-1.20"
+
+
+def test_split_matches_decimal_rounding() -> None:
+    """Integer splitting agrees with round_to_05(amount / parts)."""
+    for total in range(-3000, 3001, 7):
+        for parts in range(1, 11):
+            expected = round_to_05(from_rappen(total) / parts)
+            assert from_rappen(split_rappen(total, parts)) == expected
+    assert round_rappen_to_05(3333) == 3335
+    assert round_rappen_to_05(-3338) == -3340
@@ -42,3 +42,12 @@ def test_list_participants(session: Session) -> None:
     parts = participant_service.list_participants(session, trip.id)
     assert len(parts) == 2
     assert parts[0].name == "Anna"  # sorted
+
+
+def test_configurable_participant_cap(session: Session, monkeypatch) -> None:
+    monkeypatch.setattr(participant_service, "MAX_PARTICIPANTS", 2)
+    trip = trip_service.create_trip(session, "Trip")
+    participant_service.add_participant(session, trip.id, "Anna")
+    participant_service.add_participant(session, trip.id, "Ben")
+    with pytest.raises(ValueError, match="Maximum of 2"):
+        participant_service.add_participant(session, trip.id, "Clara")
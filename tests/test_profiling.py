@@ -0,0 +1,39 @@
+"""Tests for the --profile instrumentation."""
+
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from src.profiling import Profiler, normalize_sql
+from src.services import expense_service, participant_service, trip_service
+
+
+def test_normalize_sql_groups_by_shape() -> None:
+    assert normalize_sql("SELECT *\n  FROM t WHERE id = 5 AND n = 'x'") == (
+        "SELECT * FROM t WHERE id = ? AND n = ?"
+    )
+    assert normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?)") == (
+        normalize_sql("SELECT * FROM t WHERE id IN (%(id_1)s, %(id_2)s)")
+    )
+    assert normalize_sql("SELECT anon_1.x FROM t") == "SELECT anon_1.x FROM t"
+
+
+def test_profiler_counts_statements_and_loads(session: Session) -> None:
+    trip = trip_service.create_trip(session, "Trip")
+    trip_id = trip.id
+    for name in ("Anna", "Ben"):
+        participant_service.add_participant(session, trip_id, name)
+    expense_service.add_expense(session, trip_id, "Anna", Decimal("10"), "Ice")
+    session.expunge_all()
+
+    profiler = Profiler(cprofile=True, memory=True)
+    profiler.start()
+    expenses = expense_service.list_expenses(session, trip_id)
+    assert expenses[0].paid_by_participant.name == "Anna"
+    profiler.stop()
+
+    assert sum(s.count for s in profiler.statements.values()) == 2
+    assert profiler.loads == {"Expense": 1, "Participant": 1}
+    report = profiler.report()
+    assert "SQL: 2 statements" in report
+    assert "cProfile" in report and "Memory: peak" in report
@@ -0,0 +1,109 @@
+"""EXPLAIN QUERY PLAN checks: per-trip queries must not scan whole tables."""
+
+import re
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.services import (
+    archive_service,
+    expense_service,
+    export_service,
+    ledger_service,
+    participant_service,
+    report_service,
+    settlement_service,
+    snapshot_service,
+    trip_service,
+)
+
+# SQLite reports a full table (or full index) scan as "SCAN <table> ...";
+# index lookups are "SEARCH <table> USING ...".
+FULL_SCAN = re.compile(
+    r"^SCAN (trips|participants|expenses|expense_splits|trip_snapshots"
+    r"|archived_expenses|archived_expense_splits)\b"
+)
+
+
+def _trip(session: Session, name: str) -> int:
+    trip_id = trip_service.create_trip(session, name).id
+    for participant in ("Anna", "Ben", "Clara"):
+        participant_service.add_participant(session, trip_id, participant)
+    for i in range(3):
+        expense_service.add_expense(session, trip_id, "Anna", Decimal("30"), f"E{i}")
+    return trip_id
+
+
+@pytest.fixture
+def full_scans(session: Session, sql_statements):
+    """Run a callable and return the full scans in the plans of its queries."""
+    _trip(session, "Other")
+    engine = session.get_bind()
+
+    def run(fn) -> list[str]:
+        session.expunge_all()
+        with sql_statements(parameters=True) as statements:
+            fn()
+
+        scans = []
+        with engine.connect() as conn:
+            for statement, parameters in statements:
+                plan = conn.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                ).all()
+                scans += [
+                    f"{detail} <- {' '.join(statement.split())[:80]}"
+                    for *_, detail in plan
+                    if FULL_SCAN.match(detail)
+                ]
+        return scans
+
+    return run
+
+
+def test_read_paths_use_indexes(session: Session, full_scans) -> None:
+    trip_id = _trip(session, "Hot")
+
+    def reads() -> None:
+        expense_service.list_expenses(session, trip_id)
+        list(export_service.iter_expense_rows(session, trip_id))
+        ledger_service.compute_totals(session, trip_id)
+        ledger_service.verify_ledger(session, trip_id)
+        settlement_service.calculate_balances(session, trip_id)
+        settlement_service.calculate_settlements(session, trip_id, "exact")
+        snapshot_service.build_snapshot(session, trip_id)
+        trip_service.get_trip_summary(session, trip_id)
+
+    assert full_scans(reads) == []
+
+
+def test_archived_read_paths_use_indexes(session: Session, full_scans) -> None:
+    trip_id = _trip(session, "Cold")
+    trip_service.close_trip(session, trip_id)
+    archive_service.archive_trips(session, older_than_days=0)
+
+    def reads() -> None:
+        list(export_service.iter_expense_rows(session, trip_id))
+        ledger_service.compute_totals(session, trip_id)
+        ledger_service.verify_ledger(session, trip_id)
+        ledger_service.rebuild_ledger(session, trip_id)
+        report_service.trip_report(session, trip_id)
+        snapshot_service.build_snapshot(session, trip_id)
+        trip_service.get_trip_summary(session, trip_id)
+
+    assert full_scans(reads) == []
+
+
+def test_write_paths_use_indexes(session: Session, full_scans) -> None:
+    trip_id = _trip(session, "Hot")
+    expense_id = expense_service.list_expenses(session, trip_id)[0].id
+
+    def writes() -> None:
+        expense_service.edit_expense(session, expense_id, amount=Decimal("12"))
+        expense_service.delete_expense(session, expense_id)
+        ledger_service.rebuild_ledger(session, trip_id)
+        trip_service.close_trip(session, trip_id)
+        trip_service.delete_trip(session, trip_id)
+
+    assert full_scans(writes) == []
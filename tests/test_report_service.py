@@ -0,0 +1,96 @@
+"""Tests for report service."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.db import Base
+from src.services import participant_service, report_service, trip_service
+from src.services.import_service import import_expenses
+
+
+def _setup_trip(session: Session) -> int:
+    trip_id = trip_service.create_trip(session, "Bern").id
+    for name in ("Anna", "Ben", "Clara"):
+        participant_service.add_participant(session, trip_id, name)
+    rows = [
+        {"paid_by": "Anna", "amount": "90", "description": "Hotel", "date": "2026-07-01T18:00:00"},
+        {"paid_by": "Ben", "amount": "30", "description": "Taxi", "date": "2026-07-01T22:00:00", "for": "Ben,Clara"},
+        {"paid_by": "Anna", "amount": "15", "description": "Coffee", "date": "2026-07-02T09:00:00"},
+        {"paid_by": "Clara", "amount": "60", "description": "Dinner", "date": "2026-07-03T20:00:00"},
+    ]
+    result = import_expenses(session, trip_id, enumerate(rows, start=1))
+    assert result.imported == 4
+    return trip_id
+
+
+def test_trip_report(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    report = report_service.trip_report(session, trip_id, top=2)
+
+    assert report.total_rappen == 19500
+    assert report.expense_count == 4
+    anna = report.participants[0]
+    assert (anna.name, anna.paid_rappen, anna.expenses_paid) == ("Anna", 10500, 2)
+    assert anna.paid_share == pytest.approx(105 / 195)
+    assert [(d.day, d.total_rappen, d.running_total_rappen) for d in report.days] == [
+        (date(2026, 7, 1), 12000, 12000),
+        (date(2026, 7, 2), 1500, 13500),
+        (date(2026, 7, 3), 6000, 19500),
+    ]
+    assert [(e.rank, e.description, e.paid_by) for e in report.largest] == [
+        (1, "Hotel", "Anna"), (2, "Dinner", "Clara"),
+    ]
+    data = report_service.report_to_dict(report)
+    assert data["total"] == "195.00"
+    assert data["days"][0]["day"] == "2026-07-01"
+
+
+def test_report_uses_three_statements_and_no_orm_objects(
+    session: Session, sql_statements
+) -> None:
+    trip_id = _setup_trip(session)
+    loads = []
+
+    def on_load(target, context) -> None:
+        loads.append(target)
+
+    event.listen(Base, "load", on_load, propagate=True)
+    try:
+        with sql_statements() as statements:
+            report_service.trip_report(session, trip_id)
+    finally:
+        event.remove(Base, "load", on_load)
+    assert len(statements) == 3
+    assert loads == []
+
+
+def test_report_unknown_trip(session: Session) -> None:
+    with pytest.raises(ValueError, match="not found"):
+        report_service.trip_report(session, 999)
+
+
+def test_report_sql_types_match_on_postgres(session: Session, monkeypatch) -> None:
+    from sqlalchemy.dialects import postgresql
+
+    trip_id = _setup_trip(session)
+    statements = []
+    execute = session.execute
+
+    def record(stmt, *args, **kwargs):
+        statements.append(stmt)
+        return execute(stmt, *args, **kwargs)
+
+    monkeypatch.setattr(session, "execute", record)
+    report_service.trip_report(session, trip_id)
+
+    participants, expenses = (
+        str(s.compile(dialect=postgresql.dialect())) for s in statements[1:]
+    )
+    assert "CAST(sum(participants.paid_rappen) OVER () AS BIGINT)" in participants
+    # UNION ALL arms must agree on types: date(...) pairs with a DATE NULL.
+    assert "CAST(NULL AS DATE)" in expenses
+    assert "CAST(sum(anon_1.amount_rappen) AS BIGINT)" in expenses
+    assert "CAST(sum(sum(anon_1.amount_rappen)) OVER" in expenses
@@ -0,0 +1,188 @@
+"""Tests for the async service layer and the JSON HTTP API (aiosqlite)."""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from src.db import Base  # noqa: E402
+from src.server import dispatch, serve  # noqa: E402
+from src.services import async_service  # noqa: E402
+
+
+@pytest.fixture
+def factory(tmp_path):
+    """Async session factory on a fresh SQLite file."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}")
+
+    async def create() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+def _call(factory, method: str, target: str, body: object = None):
+    raw = json.dumps(body).encode() if body is not None else b""
+    return asyncio.run(dispatch(factory, method, target, raw))
+
+
+def test_async_services_round_trip(factory) -> None:
+    async def scenario() -> list[dict]:
+        async with factory() as session:
+            trip = await async_service.create_trip(session, "Bern")
+            for name in ("Anna", "Ben", "Clara"):
+                await async_service.add_participant(session, trip["id"], name)
+            expense = await async_service.add_expense(
+                session, trip["id"], "Anna", 90, "Dinner"
+            )
+            assert expense["split_among"] == ["Anna", "Ben", "Clara"]
+            return await async_service.calculate_settlements(session, trip["id"])
+
+    transfers = asyncio.run(scenario())
+    assert transfers == [
+        {"from": "Ben", "to": "Anna", "amount": "30.00"},
+        {"from": "Clara", "to": "Anna", "amount": "30.00"},
+    ]
+
+
+def test_api_endpoints(factory) -> None:
+    status, trip = _call(factory, "POST", "/trips", {"name": "Bern"})
+    assert status == 201
+    base = f"/trips/{trip['id']}"
+    for name in ("Anna", "Ben"):
+        assert _call(factory, "POST", f"{base}/participants", {"name": name})[0] == 201
+    status, expense = _call(factory, "POST", f"{base}/expenses", {
+        "paid_by": "Ben", "amount": "30", "description": "Taxi", "for": "Anna, Ben",
+    })
+    assert status == 201
+    assert expense["amount"] == "30.00"
+
+    status, data = _call(factory, "GET", f"{base}/settlement?strategy=exact")
+    assert status == 200
+    assert data["transfers"] == [{"from": "Anna", "to": "Ben", "amount": "15.00"}]
+
+    status, data = _call(factory, "GET", f"{base}/export")
+    assert [e["description"] for e in data["expenses"]] == ["Taxi"]
+    assert len(data["settlements"]) == 1
+
+    status, participants = _call(factory, "GET", f"{base}/participants")
+    assert [(p["name"], p["paid"], p["owed"]) for p in participants] == [
+        ("Anna", "0.00", "15.00"), ("Ben", "30.00", "15.00"),
+    ]
+
+
+def test_api_errors(factory) -> None:
+    assert _call(factory, "GET", "/trips/99")[0] == 404
+    assert _call(factory, "GET", "/nope")[0] == 404
+    assert _call(factory, "PUT", "/trips")[0] == 405
+    assert _call(factory, "POST", "/trips", {})[1] == {"error": "Missing field 'name'."}
+    status, body = _call(factory, "POST", "/trips/99/participants", {"name": "Anna"})
+    assert status == 400
+    assert body == {"error": "Trip 99 not found."}
+    status, _ = asyncio.run(dispatch(factory, "POST", "/trips", b"{not json"))
+    assert status == 400
+
+
+@pytest.mark.parametrize(
+    "path, body, error",
+    [
+        ("/trips", {"name": ["x"]}, "Field 'name' must be a string."),
+        ("/trips", {"name": "x", "description": 5},
+         "Field 'description' must be a string."),
+        ("/trips/1/expenses", {"paid_by": "Anna", "amount": "1e30", "description": "x"},
+         "'1E+30' exceeds the maximum of 1000000000 CHF."),
+        ("/trips/1/expenses", {"paid_by": "Anna", "amount": True, "description": "x"},
+         "Field 'amount' must be a string or a number."),
+        ("/trips/1/expenses", {"paid_by": 1, "amount": "5", "description": "x"},
+         "Field 'paid_by' must be a string."),
+        ("/trips/1/expenses",
+         {"paid_by": "Anna", "amount": "5", "description": "x", "for": [1]},
+         "Field 'for' must be a list of names."),
+    ],
+)
+def test_api_rejects_wrong_field_types(factory, path, body, error) -> None:
+    _call(factory, "POST", "/trips", {"name": "Bern"})
+    _call(factory, "POST", "/trips/1/participants", {"name": "Anna"})
+    assert _call(factory, "POST", path, body) == (400, {"error": error})
+
+
+def test_server_answers_bad_requests_and_crashes(factory, monkeypatch) -> None:
+    async def crash(session):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(async_service, "list_trips", crash)
+
+    async def scenario() -> list[bytes]:
+        started = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(
+            serve(port=0, session_factory=factory, ready=started.set_result)
+        )
+        server = await started
+        port = server.sockets[0].getsockname()[1]
+
+        async def request(head: str) -> bytes:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(head.encode() + b"\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+        try:
+            return [
+                await request("POST /trips HTTP/1.1\r\nContent-Length: ten"),
+                await request("POST /trips HTTP/1.1\r\nContent-Length: -1"),
+                await request("GET /trips HTTP/1.1"),
+            ]
+        finally:
+            task.cancel()
+
+    non_numeric, negative, crashed = asyncio.run(scenario())
+    assert non_numeric.startswith(b"HTTP/1.1 400 Bad Request")
+    assert b"Invalid Content-Length header." in non_numeric
+    assert negative.startswith(b"HTTP/1.1 400 Bad Request")
+    assert crashed.startswith(b"HTTP/1.1 500 Internal Server Error")
+    assert crashed.endswith(b'{"error": "Internal server error."}')
+
+
+def test_concurrent_requests_over_http(factory) -> None:
+    async def scenario() -> list[bytes]:
+        started = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(
+            serve(port=0, session_factory=factory, ready=started.set_result)
+        )
+        server = await started
+        port = server.sockets[0].getsockname()[1]
+
+        async def request(method: str, path: str, body: bytes = b"") -> bytes:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                f"{method} {path} HTTP/1.1\r\nHost: x\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+        try:
+            created = await asyncio.gather(*(
+                request("POST", "/trips", json.dumps({"name": f"T{i}"}).encode())
+                for i in range(10)
+            ))
+            listing = await request("GET", "/trips")
+        finally:
+            task.cancel()
+        return [*created, listing]
+
+    responses = asyncio.run(scenario())
+    assert all(r.startswith(b"HTTP/1.1 201 Created") for r in responses[:-1])
+    trips = json.loads(responses[-1].split(b"\r\n\r\n", 1)[1])
+    assert sorted(t["name"] for t in trips) == sorted(f"T{i}" for i in range(10))
@@ -0,0 +1,58 @@
+"""Tests for the settlement cache."""
+
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from src.services import trip_service, participant_service, expense_service
+from src.services import settlement_cache
+from src.services.settlement_service import calculate_settlements
+
+
+def _setup_trip(session: Session) -> int:
+    """Create a trip with 3 participants and one expense."""
+    trip = trip_service.create_trip(session, "Trip")
+    for n in ["Anna", "Ben", "Clara"]:
+        participant_service.add_participant(session, trip.id, n)
+    expense_service.add_expense(session, trip.id, "Anna", Decimal("90"), "Dinner")
+    return trip.id
+
+
+def test_mutations_bump_revision(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    assert trip_service.get_trip(session, trip_id).revision == 4
+    exp = expense_service.add_expense(session, trip_id, "Ben", Decimal("30"), "Taxi")
+    expense_service.edit_expense(session, exp.id, description="Cab")
+    expense_service.delete_expense(session, exp.id)
+    assert trip_service.get_trip(session, trip_id).revision == 7
+
+
+def test_cache_hit_until_revision_changes(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    cache = settlement_cache.cache_for(session)
+
+    first = calculate_settlements(session, trip_id)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert calculate_settlements(session, trip_id) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    expense_service.add_expense(session, trip_id, "Ben", Decimal("30"), "Taxi")
+    second = calculate_settlements(session, trip_id)
+    assert second != first
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_disk_cache_and_invalidation(session: Session, tmp_path: Path) -> None:
+    trip_id = _setup_trip(session)
+    cache = settlement_cache.SettlementCache(maxsize=1, directory=str(tmp_path))
+    key = settlement_cache.make_key(trip_id, "2026-01-01", 4, "greedy")
+
+    cache.put(key, [("Ben", "Anna", 3000)])
+    cache.put((99, "", 0, "greedy"), [])  # evicts the first key from memory
+    assert cache.get(key) == [("Ben", "Anna", 3000)]  # served from disk
+    assert cache.hits == 1
+
+    cache.invalidate(trip_id)
+    assert cache.get(key) is None
+    assert list(tmp_path.glob(f"{trip_id}_*")) == []
@@ -2,6 +2,8 @@
 
 from decimal import Decimal
 
+import pytest
+
 from sqlalchemy.orm import Session
 
 from src.services import trip_service, participant_service, expense_service
@@ -70,3 +72,98 @@ def test_multiple_expenses(session: Session) -> None:
     assert len(transfers) >= 1
     total = sum(t.amount for t in transfers)
     assert total == Decimal("80")
+
+
+def test_balances_single_query(session: Session, sql_statements) -> None:
+    """Balances are aggregated in one query regardless of expense count."""
+    from src.services.settlement_service import calculate_balances
+
+    trip = trip_service.create_trip(session, "Trip")
+    for n in ["Anna", "Ben", "Clara"]:
+        participant_service.add_participant(session, trip.id, n)
+    for _ in range(20):
+        expense_service.add_expense(
+            session, trip.id, "Anna", Decimal("10"), "Coffee", ["Ben", "Clara"]
+        )
+
+    trip_id = trip.id
+    with sql_statements() as statements:
+        balances = calculate_balances(session, trip_id)
+
+    assert len(statements) == 1
+    assert balances == {"Anna": 20000, "Ben": -10000, "Clara": -10000}
+
+
+def test_exact_strategy_beats_greedy() -> None:
+    """Greedy needs 4 transfers here, the exact solver finds 3."""
+    from src.services.settlement_service import minimize_transfers
+
+    balances = {"Anna": 600, "Ben": 400, "Clara": -400, "Dario": -300, "Eva": -300}
+    greedy = minimize_transfers(balances, "greedy")
+    exact = minimize_transfers(balances, "exact")
+    assert len(greedy) == 4
+    assert len(exact) == 3
+    net = dict.fromkeys(balances, 0)
+    for t in exact:
+        net[t.from_name] -= t.amount_rappen
+        net[t.to_name] += t.amount_rappen
+    assert net == balances
+
+
+def test_auto_strategy_falls_back_to_greedy(monkeypatch) -> None:
+    from src.services import settlement_service
+
+    balances = {"Anna": 600, "Ben": 400, "Clara": -400, "Dario": -300, "Eva": -300}
+    assert len(settlement_service.minimize_transfers(balances, "auto")) == 3
+    monkeypatch.setattr(settlement_service, "EXACT_MAX_BALANCES", 4)
+    assert len(settlement_service.minimize_transfers(balances, "auto")) == 4
+    with pytest.raises(ValueError, match="Unknown"):
+        settlement_service.minimize_transfers(balances, "magic")
+
+
+def test_exact_strategy_rejects_large_groups(
+    session: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from click.testing import CliRunner
+
+    from src import cli
+    from src.services import settlement_service
+
+    size = settlement_service.EXACT_MAX_BALANCES + 1
+    balances = {f"P{i}": 100 if i % 2 else -100 for i in range(size + 1)}
+    with pytest.raises(ValueError, match="at most 14 non-zero balances, not 16"):
+        settlement_service.minimize_transfers(balances, "exact")
+    assert len(settlement_service.minimize_transfers(balances, "auto")) == 8
+
+    monkeypatch.setattr(participant_service, "MAX_PARTICIPANTS", size)
+    trip = trip_service.create_trip(session, "Big")
+    for i in range(size):
+        participant_service.add_participant(session, trip.id, f"P{i}")
+    expense_service.add_expense(session, trip.id, "P0", Decimal("150"), "Hut")
+    monkeypatch.setattr(cli, "get_session", lambda: Session(session.get_bind()))
+    result = CliRunner().invoke(
+        cli.cli, ["settle", str(trip.id), "--strategy", "exact"]
+    )
+    assert result.exit_code == 0
+    assert result.output.startswith("Error: The exact strategy supports at most 14")
+
+
+def test_settle_trips_batch(session: Session) -> None:
+    """All trips are settled from one balance query, in-process and in a pool."""
+    from src.services.settlement_service import settle_trips
+
+    expected = {}
+    for i, amount in enumerate(["90", "30", "60"]):
+        trip = trip_service.create_trip(session, f"Trip {i}")
+        for n in ["Anna", "Ben", "Clara"]:
+            participant_service.add_participant(session, trip.id, n)
+        expense_service.add_expense(session, trip.id, "Anna", Decimal(amount), "Dinner")
+        expected[trip.id] = calculate_settlements(session, trip.id)
+    empty = trip_service.create_trip(session, "Empty")
+    trip_service.close_trip(session, empty.id)
+
+    inline = {r.trip_id: r.transfers for r in settle_trips(session, max_workers=1)}
+    assert inline == {**expected, empty.id: []}
+
+    pooled = settle_trips(session, closed=False, max_workers=2, chunk_size=1)
+    assert {r.trip_id: r.transfers for r in pooled} == expected
@@ -0,0 +1,76 @@
+"""Tests for the interactive shell."""
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.services import expense_service, participant_service, trip_service
+from src.shell import ShellState, with_active_trip
+
+
+def test_with_active_trip_inserts_trip_id() -> None:
+    args = ["expense", "add", "--paid-by", "Anna", "--amount", "5", "-d", "Ice"]
+    assert with_active_trip(args, 3) == ["expense", "add", "3", *args[2:]]
+    assert with_active_trip(["settle"], 3) == ["settle", "3"]
+
+
+def test_with_active_trip_keeps_explicit_arguments() -> None:
+    assert with_active_trip(["expense", "list", "7"], 3) == ["expense", "list", "7"]
+    assert with_active_trip(["settle", "--all"], 3) == ["settle", "--all"]
+    assert with_active_trip(["trip", "list"], 3) == ["trip", "list"]
+    assert with_active_trip(["expense", "edit", "4"], 3) == ["expense", "edit", "4"]
+    assert with_active_trip(["settle"], None) == ["settle"]
+
+
+def test_participant_map_is_cached(session: Session, sql_statements) -> None:
+    trip = trip_service.create_trip(session, "Trip")
+    trip_id = trip.id
+    participant_service.add_participant(session, trip_id, "Anna")
+    state = ShellState()
+    state.use(session, trip_id)
+
+    with sql_statements() as statements:
+        assert list(state.participant_ids(session)) == ["Anna"]
+    assert statements == []
+
+    participant_service.add_participant(session, trip_id, "Ben")
+    state.invalidate()
+    assert list(state.participant_ids(session)) == ["Anna", "Ben"]
+
+
+def test_participant_map_follows_other_writers(session: Session) -> None:
+    trip_id = trip_service.create_trip(session, "Trip").id
+    participant_service.add_participant(session, trip_id, "Anna")
+    state = ShellState()
+    state.use(session, trip_id)
+
+    # Another connection adds a participant; the shell never sees the command.
+    with Session(session.get_bind()) as other:
+        participant_service.add_participant(other, trip_id, "Ben")
+    session.expire_all()
+
+    ids = state.participant_ids(session)
+    assert list(ids) == ["Anna", "Ben"]
+    exp = expense_service.add_expense(
+        session, trip_id, "Anna", Decimal("10"), "Ice", participant_ids=ids
+    )
+    assert len(exp.splits) == 2
+
+
+def test_add_expense_with_participant_map(session: Session) -> None:
+    trip_id = trip_service.create_trip(session, "Trip").id
+    for name in ("Anna", "Ben", "Clara"):
+        participant_service.add_participant(session, trip_id, name)
+    state = ShellState()
+    state.use(session, trip_id)
+    ids = state.participant_ids(session)
+    exp = expense_service.add_expense(
+        session, trip_id, "Ben", Decimal("30"), "Taxi", ["Ben", "Clara"], ids
+    )
+    assert exp.paid_by_id == ids["Ben"]
+    assert sorted(s.participant_id for s in exp.splits) == [ids["Ben"], ids["Clara"]]
+    with pytest.raises(ValueError, match="not found"):
+        expense_service.add_expense(
+            session, trip_id, "Zoe", Decimal("5"), "Ice", participant_ids=ids
+        )
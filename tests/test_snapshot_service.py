@@ -0,0 +1,94 @@
+"""Tests for snapshot service."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from src.models import Trip, TripSnapshot
+from src.services import trip_service, participant_service, expense_service
+from src.services import snapshot_service
+from src.services.settlement_service import calculate_settlements, settle_trips
+
+
+def _setup_trip(session: Session) -> int:
+    """Create a trip with 3 participants and two expenses."""
+    trip = trip_service.create_trip(session, "Trip")
+    for n in ["Anna", "Ben", "Clara"]:
+        participant_service.add_participant(session, trip.id, n)
+    expense_service.add_expense(session, trip.id, "Anna", Decimal("120"), "Dinner")
+    expense_service.add_expense(
+        session, trip.id, "Ben", Decimal("30"), "Taxi", ["Ben", "Clara"]
+    )
+    return trip.id
+
+
+def test_close_creates_snapshot(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    live = calculate_settlements(session, trip_id)
+    trip_service.close_trip(session, trip_id)
+
+    snap = snapshot_service.get_snapshot(session, trip_id)
+    assert snap.expense_count == 2
+    assert snap.split_count == 5
+    assert snap.total_rappen == 15000
+    assert snap.participants == [
+        ["Anna", 12000, 4000],
+        ["Ben", 3000, 5500],
+        ["Clara", 0, 5500],
+    ]
+    assert calculate_settlements(session, trip_id) == live
+    assert [r.transfers for r in settle_trips(session, closed=True)] == [live]
+    assert len(calculate_settlements(session, trip_id, "exact")) == len(live)
+    assert snapshot_service.verify_snapshots(session) == []
+
+
+def test_backfill_and_verify(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    # A trip closed before snapshots existed.
+    session.execute(
+        update(Trip)
+        .where(Trip.id == trip_id)
+        .values(closed_at=datetime.now(timezone.utc))
+    )
+    session.commit()
+    assert snapshot_service.backfill_snapshots(session) == 1
+    assert snapshot_service.backfill_snapshots(session) == 0
+
+    session.execute(
+        update(TripSnapshot)
+        .where(TripSnapshot.trip_id == trip_id)
+        .values(expense_count=99)
+    )
+    session.commit()
+    mismatches = snapshot_service.verify_snapshots(session, trip_id)
+    assert [(m.field, m.stored, m.actual) for m in mismatches] == [
+        ("expense_count", 99, 2)
+    ]
+
+
+def test_delete_closed_trip_removes_snapshot(session: Session) -> None:
+    trip_id = _setup_trip(session)
+    trip_service.close_trip(session, trip_id)
+    trip_service.delete_trip(session, trip_id)
+    assert snapshot_service.get_snapshot(session, trip_id) is None
+
+
+def test_snapshot_values_are_int(session: Session) -> None:
+    from sqlalchemy.dialects import postgresql
+
+    from src.services import ledger_service
+
+    trip_id = _setup_trip(session)
+    trip_service.close_trip(session, trip_id)
+    snap = snapshot_service.get_snapshot(session, trip_id)
+
+    values = [snap.expense_count, snap.split_count, snap.total_rappen]
+    values += [v for _, paid, owed in snap.participants for v in (paid, owed)]
+    values += [amount for *_, amount in snap.transfers]
+    assert all(type(v) is int for v in values)
+    # SUM(bigint) is numeric (Decimal) on PostgreSQL unless cast back.
+    for column in (ledger_service._raw_paid(), ledger_service._raw_owed()):
+        sql = str(column.compile(dialect=postgresql.dialect()))
+        assert sql.startswith("CAST(") and sql.endswith("AS BIGINT)")
@@ -44,3 +44,117 @@ def test_delete_trip(session: Session) -> None:
 def test_delete_nonexistent(session: Session) -> None:
     with pytest.raises(ValueError, match="not found"):
         trip_service.delete_trip(session, 999)
+
+
+def test_summarize_trips_pages_without_gaps(session: Session) -> None:
+    ids = [trip_service.create_trip(session, f"T{i}").id for i in range(7)]
+    trip_service.close_trip(session, ids[2])
+
+    seen, after = [], None
+    while True:
+        page = trip_service.summarize_trips(session, limit=3, after=after)
+        if not page:
+            break
+        seen += [t.id for t in page]
+        after = page[-1].id
+    assert seen == sorted(ids, reverse=True)
+
+    closed = trip_service.summarize_trips(session, status="closed")
+    assert [t.id for t in closed] == [ids[2]]
+    assert len(trip_service.summarize_trips(session, status="open")) == 6
+    with pytest.raises(ValueError, match="not found"):
+        trip_service.summarize_trips(session, after=999)
+
+
+def test_trip_list_limit(session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    from click.testing import CliRunner
+
+    from src import cli
+
+    for name in ("Bern", "Chur"):
+        trip_service.create_trip(session, name)
+    monkeypatch.setattr(cli, "get_session", lambda: Session(session.get_bind()))
+
+    result = CliRunner().invoke(cli.cli, ["trip", "list", "--limit", "0"])
+    assert "Chur" in result.output and "Bern" in result.output
+    result = CliRunner().invoke(cli.cli, ["trip", "list", "--limit", "-1"])
+    assert result.exit_code == 2
+    assert "-1 is not in the range x>=0" in result.output
+
+
+def test_trip_summary_aggregates(session: Session) -> None:
+    from decimal import Decimal
+
+    from src.services import expense_service, participant_service
+
+    trip_id = trip_service.create_trip(session, "Bern").id
+    for name in ("Anna", "Ben"):
+        participant_service.add_participant(session, trip_id, name)
+    expense_service.add_expense(session, trip_id, "Anna", Decimal("30"), "Taxi")
+    expense_service.add_expense(session, trip_id, "Ben", Decimal("12.50"), "Ice")
+
+    summary = trip_service.get_trip_summary(session, trip_id)
+    assert (summary.participant_count, summary.expense_count) == (2, 2)
+    assert summary.total_rappen == 4250
+    assert summary.is_open
+    assert trip_service.get_trip_summary(session, 999) is None
+
+
+def _trip_with_expenses(session: Session, name: str) -> int:
+    from decimal import Decimal
+
+    from src.services import expense_service, participant_service
+
+    trip = trip_service.create_trip(session, name)
+    for n in ["Anna", "Ben"]:
+        participant_service.add_participant(session, trip.id, n)
+    for i in range(3):
+        expense_service.add_expense(session, trip.id, "Anna", Decimal("10"), f"E{i}")
+    return trip.id
+
+
+def _row_counts(session: Session) -> tuple[int, ...]:
+    from sqlalchemy import func, select
+
+    from src.models import Expense, ExpenseSplit, Participant, Trip, TripSnapshot
+
+    return tuple(
+        session.scalar(select(func.count()).select_from(model))
+        for model in (Trip, Participant, Expense, ExpenseSplit, TripSnapshot)
+    )
+
+
+def test_delete_trip_uses_database_cascade(session: Session, sql_statements) -> None:
+    trip_id = _trip_with_expenses(session, "Trip")
+    trip_service.close_trip(session, trip_id)
+    session.expunge_all()
+
+    with sql_statements() as statements:
+        trip_service.delete_trip(session, trip_id)
+
+    # Load the trip, delete it; no child rows are selected or deleted by the ORM.
+    assert [s.split()[0] for s in statements] == ["SELECT", "DELETE"]
+    assert _row_counts(session) == (0, 0, 0, 0, 0)
+
+
+def test_purge_trips_in_batches(session: Session) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    ids = [_trip_with_expenses(session, f"T{i}") for i in range(5)]
+    for trip_id in ids[:4]:
+        trip_service.close_trip(session, trip_id)
+    tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+
+    assert trip_service.purge_trips(session, tomorrow - timedelta(days=2)).trips == 0
+    result = trip_service.purge_trips(session, tomorrow, batch_size=3)
+
+    assert (result.trips, result.batches) == (4, 2)
+    assert [t.id for t in trip_service.list_trips(session)] == [ids[4]]
+    assert _row_counts(session) == (1, 2, 3, 6, 0)
+
+
+def test_summary_total_is_bigint_on_postgres() -> None:
+    from sqlalchemy.dialects import postgresql
+
+    sql = str(trip_service._summary_query().compile(dialect=postgresql.dialect()))
+    assert "CAST(coalesce(sum(participants.paid_rappen)" in sql
@@ -0,0 +1,45 @@
+"""Tests for the vectorized settlement engine."""
+
+import random
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.services import trip_service, participant_service, expense_service
+from src.services.settlement_service import calculate_settlements
+
+pytest.importorskip("numpy")
+
+from src.services.vector_settlement import (  # noqa: E402
+    calculate_settlements_vectorized,
+)
+
+
+def test_matches_decimal_engine(session: Session, monkeypatch) -> None:
+    """Random trips give identical transfers on both engines."""
+    monkeypatch.setattr(participant_service, "MAX_PARTICIPANTS", 40)
+    rng = random.Random(7)
+    trip = trip_service.create_trip(session, "Company event")
+    names = [f"Person{i:02d}" for i in range(40)]
+    for n in names:
+        participant_service.add_participant(session, trip.id, n)
+    for i in range(150):
+        beneficiaries = rng.sample(names, rng.randint(1, len(names)))
+        amount = Decimal(rng.randint(1, 50_000)) / 100
+        expense_service.add_expense(
+            session, trip.id, rng.choice(names), amount, f"Item {i}", beneficiaries
+        )
+
+    expected = calculate_settlements(session, trip.id)
+    actual = calculate_settlements_vectorized(session, trip.id)
+    assert expected
+    assert actual == expected
+
+
+def test_empty_trip(session: Session) -> None:
+    trip = trip_service.create_trip(session, "Trip")
+    assert calculate_settlements_vectorized(session, trip.id) == []
+    participant_service.add_participant(session, trip.id, "Anna")
+    assert calculate_settlements_vectorized(session, trip.id) == []
+